@@ -20,7 +20,7 @@ config.set_main_option("sqlalchemy.url", settings.postgres_url)
 
 # Import Base and all models so metadata is populated
 from app.db.pg import Base
-from app.models import department, doctor, patient, appointment, faq, admin, kiosk_device, audit_log
+from app.models import department, doctor, patient, appointment, faq, admin, kiosk_device, audit_log, usage_rollup
 
 target_metadata = Base.metadata
 
@@ -0,0 +1,36 @@
+"""patients full_name trigram index
+
+Revision ID: 7c1e4b2a9d10
+Revises: 323af881ad99
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e4b2a9d10'
+down_revision: Union[str, None] = '323af881ad99'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # pg_trgm backs substring LIKE and similarity() on lower(full_name);
+    # the existing B-tree ix_patients_full_name cannot serve '%term%'.
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_patients_full_name_trgm',
+        'patients',
+        [sa.text('lower(full_name) gin_trgm_ops')],
+        unique=False,
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_patients_full_name_trgm', table_name='patients')
+    # Leave the pg_trgm extension installed; other objects may depend on it.
@@ -0,0 +1,45 @@
+"""usage rollups
+
+Revision ID: a4d2f6c81b37
+Revises: 7c1e4b2a9d10
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d2f6c81b37'
+down_revision: Union[str, None] = '7c1e4b2a9d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('appointment_daily_rollups',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('department_id', sa.UUID(), nullable=False),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('refreshed_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'department_id', 'status')
+    )
+    op.create_index('ix_appt_rollups_department_day', 'appointment_daily_rollups', ['department_id', 'day'], unique=False)
+    op.create_table('usage_counters',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('value', sa.BigInteger(), server_default=sa.text('0'), nullable=False),
+    sa.Column('refreshed_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # Day-range scans over all doctors (rollup refresher)
+    op.create_index('ix_appt_start_time', 'appointments', ['start_time'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_appt_start_time', table_name='appointments')
+    op.drop_table('usage_counters')
+    op.drop_index('ix_appt_rollups_department_day', table_name='appointment_daily_rollups')
+    op.drop_table('appointment_daily_rollups')
@@ -0,0 +1,25 @@
+"""admin token version
+
+Revision ID: c91f0d3e5a27
+Revises: a4d2f6c81b37
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c91f0d3e5a27'
+down_revision: Union[str, None] = 'a4d2f6c81b37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('admin_users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('admin_users', 'token_version')
@@ -0,0 +1,31 @@
+"""appointment reminders
+
+Revision ID: d5a8e2c47f19
+Revises: c91f0d3e5a27
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a8e2c47f19'
+down_revision: Union[str, None] = 'c91f0d3e5a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('appointments', sa.Column('reminder_sent_at', postgresql.TIMESTAMP(timezone=True), nullable=True))
+    op.create_index(
+        'ix_appt_reminder_due', 'appointments', ['start_time'], unique=False,
+        postgresql_where=sa.text('reminder_sent_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_appt_reminder_due', table_name='appointments')
+    op.drop_column('appointments', 'reminder_sent_at')
@@ -0,0 +1,29 @@
+"""appointments external id
+
+Revision ID: e2b7c9a04d63
+Revises: d5a8e2c47f19
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7c9a04d63'
+down_revision: Union[str, None] = 'd5a8e2c47f19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('appointments', sa.Column('external_appointment_id', sa.String(length=120), nullable=True))
+    op.create_unique_constraint(
+        'appointments_external_appointment_id_key', 'appointments', ['external_appointment_id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('appointments_external_appointment_id_key', 'appointments', type_='unique')
+    op.drop_column('appointments', 'external_appointment_id')
@@ -0,0 +1,29 @@
+"""kiosk device code
+
+Revision ID: f7c3a9e1b2d4
+Revises: e2b7c9a04d63
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7c3a9e1b2d4'
+down_revision: Union[str, None] = 'e2b7c9a04d63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('kiosk_devices', sa.Column('device_code_hash', sa.String(length=64), nullable=True))
+    op.create_unique_constraint(
+        'kiosk_devices_device_code_hash_key', 'kiosk_devices', ['device_code_hash']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('kiosk_devices_device_code_hash_key', 'kiosk_devices', type_='unique')
+    op.drop_column('kiosk_devices', 'device_code_hash')
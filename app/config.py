@@ -13,6 +13,17 @@ class Settings(BaseSettings):
     PG_DATABASE: str = "hospital"
     PG_USERNAME: str = "postgres"
     PG_PASSWORD: str = "secret"
+    PG_ASYNC_CONNECTION: str = "postgresql+psycopg"  # psycopg 3 also ships the asyncio driver
+    # Pool settings apply to the sync and the async engine separately, so one
+    # worker can hold up to 2 * (PG_POOL_SIZE + PG_MAX_OVERFLOW) connections
+    PG_POOL_SIZE: int = 10
+    PG_MAX_OVERFLOW: int = 10
+    PG_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    PG_POOL_RECYCLE: int = 1800  # seconds; -1 disables
+    PG_POOL_PRE_PING: bool = True  # ping on checkout; off relies on recycle + retry
+    PG_POOL_WARM: int = 2  # connections opened per engine at startup
+    PG_STATEMENT_TIMEOUT_MS: int = 0  # 0 = server default
+    PG_ECHO: bool = False  # log SQL (noisy; was implied by APP_ENV=dev)
 
     # MongoDB
     MONGO_CONNECTION: str = "mongodb"  # e.g. mongodb or mongodb+srv
@@ -22,6 +33,114 @@ class Settings(BaseSettings):
     MONGO_USERNAME: Optional[str] = None
     MONGO_PASSWORD: Optional[str] = None
     MONGO_AUTHSOURCE: Optional[str] = "admin"  # set to the DB where the user was created
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 0  # kept open (and opened at startup) by the driver
+    MONGO_MAX_IDLE_TIME_MS: Optional[int] = None
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 3000  # fail fast if unreachable
+    MONGO_COMPRESSORS: Optional[str] = None  # e.g. zstd,snappy,zlib (zstd/snappy need extra packages)
+
+    # Redis (optional; shared backend for caches in multi-worker deployments)
+    REDIS_URL: Optional[str] = None  # e.g. redis://127.0.0.1:6379/0
+
+    # Chat session cache
+    SESSION_CACHE_BACKEND: str = "memory"  # memory | redis
+    SESSION_CACHE_MAX_ENTRIES: int = 10000
+    SESSION_CACHE_TTL_SECONDS: int = 300
+
+    # Chat appointment lookups per (token, upcoming_only); appointment writes invalidate
+    APPOINTMENT_CACHE_MAX_ENTRIES: int = 5000
+    APPOINTMENT_CACHE_TTL_SECONDS: int = 30
+
+    # Public directory cache (/info); admin writes invalidate it immediately
+    DIRECTORY_CACHE_MAX_AGE_SECONDS: int = 300
+
+    # Chat message retention (app/services/chat_archive.py)
+    MESSAGE_TTL_DAYS: Optional[int] = None  # TTL index on messages.timestamp; unset = keep
+    MESSAGE_ARCHIVE_ENABLED: bool = False  # move ended sessions into messages_YYYYMM
+    MESSAGE_ARCHIVE_AFTER_HOURS: int = 24
+    MESSAGE_ARCHIVE_INTERVAL_SECONDS: int = 600
+    MESSAGE_ARCHIVE_RETENTION_MONTHS: Optional[int] = None  # drop older monthly archives
+
+    # Intent engine: FAQ phrases are recompiled on admin writes and on this interval
+    NLU_FAQ_REFRESH_SECONDS: int = 60
+
+    # Usage report rollups
+    REPORT_TIMEZONE: str = "UTC"  # day boundaries for the daily rollups
+    ROLLUP_REFRESH_SECONDS: int = 300
+    ROLLUP_WINDOW_PAST_DAYS: int = 35
+    ROLLUP_WINDOW_FUTURE_DAYS: int = 90
+
+    # Admin identity cache (get_current_admin); role changes/deletes write through
+    ADMIN_IDENTITY_CACHE_MAX_ENTRIES: int = 1000
+    ADMIN_IDENTITY_CACHE_TTL_SECONDS: int = 30
+    ADMIN_TOKEN_TRUST_CLAIMS: bool = False  # fill a cold cache from token claims, no DB read
+
+    # Password hashing (process pool; 429 once MAX_PENDING calls are queued)
+    BCRYPT_ROUNDS: int = 12  # raising it rehashes each admin's password on next login
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 16
+
+    # Audit log writer (batched in the background unless AUDIT_MODE=sync)
+    AUDIT_MODE: str = "batched"  # batched | sync
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL_MS: int = 200
+    AUDIT_MAX_QUEUE: int = 10000  # beyond this log_action writes synchronously
+
+    # Appointment reminders (app/services/reminders.py)
+    REMINDERS_ENABLED: bool = False
+    REMINDER_SENDER: str = "log"  # log | fake | package.module:factory
+    REMINDER_LEAD_MINUTES: int = 1440  # remind this long before start_time
+    REMINDER_WINDOW_SECONDS: int = 600  # how far past the lead each load looks ahead
+    REMINDER_BATCH_SIZE: int = 200
+
+    # Readiness checks (background; /readyz serves the cached result)
+    HEALTH_CHECK_INTERVAL_SECONDS: float = 5
+    HEALTH_CHECK_TIMEOUT_SECONDS: float = 2
+    HEALTH_MAX_STALENESS_SECONDS: float = 30
+
+    # Bulk import (scripts/import_his.py, POST /admin/imports/{entity})
+    IMPORT_CHUNK_SIZE: int = 10000  # rows per COPY + merge + commit
+    IMPORT_MAX_UPLOAD_MB: int = 2048
+    IMPORT_SPOOL_MEMORY_MB: int = 16  # uploads beyond this spill to a temp file
+
+    # Slot availability (app/services/availability.py); doctors share clinic hours
+    CLINIC_TIMEZONE: str = "UTC"
+    CLINIC_DAY_START: str = "08:00"
+    CLINIC_DAY_END: str = "17:00"
+    CLINIC_WORKDAYS: str = "0,1,2,3,4"  # Monday=0
+    SLOT_MINUTES: int = 15  # slot grid, counted from opening time
+    APPOINTMENT_DEFAULT_MINUTES: int = 15  # busy length when end_time is NULL
+    AVAILABILITY_HORIZON_DAYS: int = 14  # busy intervals cached this far ahead
+    AVAILABILITY_CACHE_TTL_SECONDS: int = 60
+    AVAILABILITY_CACHE_MAX_DOCTORS: int = 5000
+
+    # Responses (app/services/fast_json.py); needs the orjson package
+    FAST_JSON_RESPONSES: bool = False  # orjson encoding, trusted rows skip response_model
+
+    # Kiosk devices (app/services/devices.py); devices send X-Device-Code
+    DEVICE_AUTH_REQUIRED: bool = False  # chat sessions need a registered device
+    DEVICE_HEARTBEAT_SECONDS: int = 10  # interval suggested to kiosks
+    DEVICE_FLUSH_INTERVAL_SECONDS: float = 5  # last_seen_at writes are batched this often
+    DEVICE_OFFLINE_AFTER_SECONDS: int = 45
+    DEVICE_REGISTRY_REFRESH_SECONDS: int = 30  # reload devices and other workers' last_seen_at
+
+    # Rate limits (app/services/rate_limit.py): "tokens per second,burst" per client key
+    # Off until kiosks send a registered X-Device-Code: behind one NAT every
+    # unregistered kiosk shares an address bucket outside its chat session
+    RATE_LIMIT_ENABLED: bool = False
+    RATE_LIMIT_BACKEND: str = "memory"  # memory | redis (shared across workers)
+    RATE_LIMIT_DEFAULT: str = "10,40"
+    RATE_LIMIT_CHAT: str = "1,10"  # chat messages (HTTP, SSE, WebSocket) and session starts
+    RATE_LIMIT_LOOKUP: str = "2,20"  # /appointments, /availability
+    RATE_LIMIT_LOGIN: str = "0.2,5"  # admin login
+    RATE_LIMIT_MAX_KEYS: int = 50000  # memory backend
+    RATE_LIMIT_TRUST_PROXY: bool = False  # key anonymous clients by the last X-Forwarded-For hop
+
+    # Admission control: requests in flight per worker before shedding with 503
+    ADMISSION_ENABLED: bool = True
+    MAX_CONCURRENT_REQUESTS: int = 0  # 0 = PG_POOL_SIZE + PG_MAX_OVERFLOW
+    ADMISSION_QUEUE_TIMEOUT_MS: int = 100  # wait this long for a slot before 503
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
 
     # App
     APP_ENV: str = "dev"
@@ -35,11 +154,35 @@ class Settings(BaseSettings):
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
-    @property
-    def postgres_url(self) -> str:
+    def _pg_url(self, connection: str) -> str:
         user = quote_plus(self.PG_USERNAME)
         pwd = quote_plus(self.PG_PASSWORD)
-        return f"{self.PG_CONNECTION}://{user}:{pwd}@{self.PG_HOST}:{self.PG_PORT}/{self.PG_DATABASE}"
+        return f"{connection}://{user}:{pwd}@{self.PG_HOST}:{self.PG_PORT}/{self.PG_DATABASE}"
+
+    @property
+    def postgres_url(self) -> str:
+        return self._pg_url(self.PG_CONNECTION)
+
+    @property
+    def postgres_async_url(self) -> str:
+        """URL for create_async_engine (must name an asyncio-capable driver)."""
+        return self._pg_url(self.PG_ASYNC_CONNECTION)
+
+    def pg_connect_args(self) -> dict:
+        if self.PG_STATEMENT_TIMEOUT_MS > 0:
+            return {"options": f"-c statement_timeout={self.PG_STATEMENT_TIMEOUT_MS}"}
+        return {}
+
+    def pg_pool_kwargs(self) -> dict:
+        return {
+            "pool_size": self.PG_POOL_SIZE,
+            "max_overflow": self.PG_MAX_OVERFLOW,
+            "pool_timeout": self.PG_POOL_TIMEOUT,
+            "pool_recycle": self.PG_POOL_RECYCLE,
+            "pool_pre_ping": self.PG_POOL_PRE_PING,
+            "echo": self.PG_ECHO,
+            "connect_args": self.pg_connect_args(),
+        }
 
     @property
     def mongo_url(self) -> str:
@@ -1,25 +1,86 @@
 from typing import Optional
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
-from pymongo import ASCENDING, DESCENDING
+from pymongo import ASCENDING, DESCENDING, monitoring
+from pymongo.errors import OperationFailure
 from app.config import settings
+from app.services.metrics import MongoCommandMetrics
 
 _client: Optional[AsyncIOMotorClient] = None
 
+# Chat history pages on (timestamp, _id) within a session (hot and archive collections)
+MESSAGE_HISTORY_INDEX = [("sessionId", ASCENDING), ("timestamp", ASCENDING), ("_id", ASCENDING)]
+
+
+class MongoPoolStats(monitoring.ConnectionPoolListener):
+    """Open / in-use connection counts across the client's pools (for /readyz)."""
+
+    def __init__(self) -> None:
+        self.open = 0
+        self.in_use = 0
+        self.checkout_failures = 0
+
+    def connection_created(self, event) -> None:
+        self.open += 1
+
+    def connection_closed(self, event) -> None:
+        self.open -= 1
+
+    def connection_checked_out(self, event) -> None:
+        self.in_use += 1
+
+    def connection_checked_in(self, event) -> None:
+        self.in_use -= 1
+
+    def connection_check_out_failed(self, event) -> None:
+        self.checkout_failures += 1
+
+    # Not needed for the counts
+    def pool_created(self, event) -> None: pass
+    def pool_ready(self, event) -> None: pass
+    def pool_cleared(self, event) -> None: pass
+    def pool_closed(self, event) -> None: pass
+    def connection_ready(self, event) -> None: pass
+    def connection_check_out_started(self, event) -> None: pass
+
+
+mongo_pool_stats = MongoPoolStats()
+
 def get_mongo() -> AsyncIOMotorDatabase:
     if _client is None:
         raise RuntimeError("Mongo client not initialized. Call connect_mongo() on startup.")
     return _client[settings.MONGO_DATABASE]
 
+def _client_options() -> dict:
+    opts = {
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "event_listeners": [MongoCommandMetrics(), mongo_pool_stats],
+    }
+    if settings.MONGO_MAX_IDLE_TIME_MS:
+        opts["maxIdleTimeMS"] = settings.MONGO_MAX_IDLE_TIME_MS
+    if settings.MONGO_COMPRESSORS:
+        opts["compressors"] = settings.MONGO_COMPRESSORS
+    return opts
+
 async def connect_mongo() -> None:
     """Create client and verify connectivity with a ping."""
     global _client
-    _client = AsyncIOMotorClient(
-        settings.mongo_url,
-        serverSelectionTimeoutMS=3000,  # fail fast if unreachable
-    )
-    # Verify connection
+    _client = AsyncIOMotorClient(settings.mongo_url, **_client_options())
+    # Verify connection (minPoolSize connections are then opened in the background)
     await _client.admin.command("ping")
 
+def pool_status() -> dict:
+    max_size = settings.MONGO_MAX_POOL_SIZE
+    return {
+        "max_size": max_size,
+        "open": mongo_pool_stats.open,
+        "in_use": mongo_pool_stats.in_use,
+        "checkout_failures": mongo_pool_stats.checkout_failures,
+        # per server pool; with one primary this is the saturation that matters
+        "saturation": round(mongo_pool_stats.in_use / max_size, 3) if max_size else None,
+    }
+
 async def close_mongo() -> None:
     global _client
     if _client:
@@ -32,7 +93,20 @@ async def ensure_mongo_indexes() -> None:
     # Sessions: by device & recency, and status
     await db.chat_sessions.create_index([("deviceId", ASCENDING), ("startedAt", DESCENDING)])
     await db.chat_sessions.create_index([("status", ASCENDING)])
-    # Messages: by session & time
-    await db.messages.create_index([("sessionId", ASCENDING), ("timestamp", DESCENDING)])
-    # Optional TTL on messages (e.g., 30 days). Uncomment if desired.
-    # await db.messages.create_index([("timestamp", ASCENDING)], expireAfterSeconds=30*24*60*60)
+    # Archiver: ended sessions by end time
+    await db.chat_sessions.create_index([("status", ASCENDING), ("endedAt", ASCENDING)])
+    # Messages: by session & time (+ _id so history cursors are an index range);
+    # supersedes the older (sessionId, timestamp desc) index
+    await db.messages.create_index(MESSAGE_HISTORY_INDEX)
+    if "sessionId_1_timestamp_-1" in await db.messages.index_information():
+        await db.messages.drop_index("sessionId_1_timestamp_-1")
+    # Optional TTL on messages (MESSAGE_TTL_DAYS)
+    if settings.MESSAGE_TTL_DAYS:
+        seconds = settings.MESSAGE_TTL_DAYS * 24 * 60 * 60
+        try:
+            await db.messages.create_index(
+                [("timestamp", ASCENDING)], name="ttl_timestamp", expireAfterSeconds=seconds
+            )
+        except OperationFailure:
+            # Exists with another expireAfterSeconds: retune in place
+            await db.command("collMod", "messages", index={"name": "ttl_timestamp", "expireAfterSeconds": seconds})
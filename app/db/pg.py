@@ -1,6 +1,8 @@
-from collections.abc import Generator
+import asyncio
+from collections.abc import AsyncGenerator, Generator
 from sqlalchemy.orm import DeclarativeBase, sessionmaker, Session
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from app.config import settings
 
 class Base(DeclarativeBase):
@@ -8,9 +10,8 @@ class Base(DeclarativeBase):
 
 engine = create_engine(
     settings.postgres_url,
-    pool_pre_ping=True,
-    echo=(settings.APP_ENV == "dev"),
     future=True,
+    **settings.pg_pool_kwargs(),
 )
 
 SessionLocal = sessionmaker(
@@ -21,6 +22,21 @@ SessionLocal = sessionmaker(
     class_=Session,
 )
 
+# Async engine for the kiosk hot paths (chat, info, appointments) so a slow
+# query awaits instead of blocking the event loop. Admin routers stay on the
+# sync engine above; FastAPI runs those in its threadpool.
+async_engine = create_async_engine(
+    settings.postgres_async_url,
+    **settings.pg_pool_kwargs(),
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+    class_=AsyncSession,
+)
+
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
     try:
@@ -28,6 +44,43 @@ def get_db() -> Generator[Session, None, None]:
     finally:
         db.close()
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def pool_status(eng: Engine) -> dict:
+    """Occupancy of a QueuePool; saturation 1.0 means new checkouts wait."""
+    pool = eng.pool
+    capacity = pool.size() + max(settings.PG_MAX_OVERFLOW, 0)
+    checked_out = pool.checkedout()
+    return {
+        "size": pool.size(),
+        "capacity": capacity,
+        "checked_out": checked_out,
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "saturation": round(checked_out / capacity, 3) if capacity else None,
+    }
+
+def _warm_sync(n: int) -> None:
+    conns = [engine.connect() for _ in range(n)]
+    for conn in conns:
+        conn.close()
+
+async def _warm_async(n: int) -> None:
+    conns = [await async_engine.connect() for _ in range(n)]
+    for conn in conns:
+        await conn.close()
+
+async def warm_pools(n: int) -> None:
+    """Open n connections per engine so the first requests skip the connect handshake."""
+    n = min(n, settings.PG_POOL_SIZE)
+    if n > 0:
+        await asyncio.gather(asyncio.to_thread(_warm_sync, n), _warm_async(n))
+
 def dispose_engine() -> None:
     """Optional: call on shutdown in tests to fully close the pool."""
     engine.dispose()
+
+async def dispose_async_engine() -> None:
+    await async_engine.dispose()
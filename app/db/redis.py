@@ -0,0 +1,25 @@
+from typing import Any, Optional
+from app.config import settings
+
+# Optional shared backend for caches / limiters in multi-worker deployments.
+# The `redis` package is only needed when a *_BACKEND setting is "redis".
+_client: Optional[Any] = None
+
+def get_redis() -> Any:
+    """Lazily create a redis.asyncio client from REDIS_URL."""
+    global _client
+    if _client is None:
+        if not settings.REDIS_URL:
+            raise RuntimeError("REDIS_URL is not configured.")
+        try:
+            from redis import asyncio as aioredis
+        except ImportError as e:
+            raise RuntimeError("Redis backend requires the 'redis' package (pip install redis).") from e
+        _client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _client
+
+async def close_redis() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
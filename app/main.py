@@ -1,69 +1,144 @@
-from fastapi import FastAPI
+import asyncio
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from starlette.middleware.trustedhost import TrustedHostMiddleware
 
-from sqlalchemy import text
 from app.config import settings
-from app.db.pg import engine
-from app.db.mongo import connect_mongo, close_mongo, ensure_mongo_indexes, get_mongo
+from app.db.pg import async_engine, engine, dispose_async_engine, pool_status, warm_pools
+from app.db.mongo import connect_mongo, close_mongo, ensure_mongo_indexes
+from app.db.mongo import pool_status as mongo_pool_status
+from app.db.redis import close_redis
+from app.services.audit import audit_writer
+from app.services.chat_archive import archive_forever
+from app.services.devices import device_registry
+from app.services.diagnostics import cache_stats
+from app.services.fast_json import default_response_class
+from app.services.health import health_checker
+from app.services.metrics import MetricsMiddleware, instrument_engine, render_latest
+from app.services.nlu import refresh_faqs_forever
+from app.services.passwords import password_hasher
+from app.services.rate_limit import (
+    AdmissionMiddleware,
+    RateLimitMiddleware,
+    admission_controller,
+    rate_limiter,
+)
+from app.services.reminders import schedule_reminders
+from app.services.rollups import refresh_rollups_forever
 
-from app.routers import info, appointments, chat
+from app.routers import info, appointments, availability, chat, devices
 from app.routers.admin import (
     auth as admin_auth,
+    devices as admin_devices,
     doctors as admin_doctors,
+    exports as admin_exports,
     departments as admin_departments,
     faqs as admin_faqs,
+    imports as admin_imports,
     reports as admin_reports,
 )
 
-app = FastAPI(title="AI Kiosk API")
+app = FastAPI(
+    title="AI Kiosk API",
+    default_response_class=default_response_class(),
+)
 
 # Middlewares
+# Innermost first: admission after the rate limit, both inside CORS so
+# browsers can read the 429/503
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware, controller=admission_controller)
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins() or ["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "Retry-After"],
 )
 app.add_middleware(GZipMiddleware, minimum_size=1024)
+# Outermost, so latency includes the other middlewares
+app.add_middleware(MetricsMiddleware)
 # Tighten in prod: put your kiosk/admin hostnames/IPs here
 # app.add_middleware(TrustedHostMiddleware, allowed_hosts=["localhost", "127.0.0.1", "*.your-hospital.local"])
 
 # Routers
 app.include_router(info.router, prefix=settings.API_PREFIX)
 app.include_router(appointments.router, prefix=settings.API_PREFIX)
+app.include_router(availability.router, prefix=settings.API_PREFIX)
 app.include_router(chat.router, prefix=settings.API_PREFIX)
+app.include_router(devices.router, prefix=settings.API_PREFIX)
 
 app.include_router(admin_auth.router, prefix=settings.API_PREFIX)
+app.include_router(admin_devices.router, prefix=settings.API_PREFIX)
 app.include_router(admin_doctors.router, prefix=settings.API_PREFIX)
 app.include_router(admin_departments.router, prefix=settings.API_PREFIX)
 app.include_router(admin_faqs.router, prefix=settings.API_PREFIX)
+app.include_router(admin_imports.router, prefix=settings.API_PREFIX)
+app.include_router(admin_exports.router, prefix=settings.API_PREFIX)
 app.include_router(admin_reports.router, prefix=settings.API_PREFIX)
 
+instrument_engine("sync", engine)
+instrument_engine("async", async_engine.sync_engine)
+
+# Long-running background loops, cancelled on shutdown
+_background_tasks: list[asyncio.Task] = []
+
 @app.on_event("startup")
 async def on_start():
     await connect_mongo()
     await ensure_mongo_indexes()
+    await warm_pools(settings.PG_POOL_WARM)
+    # First round before traffic so /readyz does not start out "not checked yet"
+    await health_checker.check_now()
+    _background_tasks.append(asyncio.create_task(health_checker.run_forever()))
+    # First iteration loads the FAQ intents before traffic arrives
+    _background_tasks.append(asyncio.create_task(refresh_faqs_forever(settings.NLU_FAQ_REFRESH_SECONDS)))
+    _background_tasks.append(asyncio.create_task(refresh_rollups_forever(settings.ROLLUP_REFRESH_SECONDS)))
+    _background_tasks.append(asyncio.create_task(audit_writer.run_forever()))
+    _background_tasks.append(asyncio.create_task(device_registry.run_forever()))
+    if settings.MESSAGE_ARCHIVE_ENABLED:
+        _background_tasks.append(asyncio.create_task(archive_forever(settings.MESSAGE_ARCHIVE_INTERVAL_SECONDS)))
+    if settings.REMINDERS_ENABLED:
+        scheduler = await schedule_reminders()
+        _background_tasks.append(asyncio.create_task(scheduler.run()))
 
 @app.on_event("shutdown")
 async def on_stop():
+    for task in _background_tasks:
+        task.cancel()
+    await asyncio.gather(*_background_tasks, return_exceptions=True)
+    _background_tasks.clear()
+    await audit_writer.flush()  # before the engine is disposed
+    await device_registry.flush()
     await close_mongo()
+    await dispose_async_engine()
+    await close_redis()
+    password_hasher.shutdown()
 
 @app.get("/healthz")
 def health():
     # Liveness: app is up
     return {"ok": True}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    body, content_type = render_latest()
+    return Response(content=body, media_type=content_type)
+
 @app.get("/readyz")
-async def ready():
-    # Readiness: verify PG + Mongo connectivity
-    try:
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
-        db = get_mongo()
-        await db.command("ping")
-        return {"ready": True}
-    except Exception as e:
-        return {"ready": False, "error": str(e)}
+async def ready(response: Response):
+    # Readiness: last background check of PG + Mongo (no I/O here); pools and caches for diagnostics
+    report = health_checker.report()
+    report["pools"] = {
+        "postgres": {"sync": pool_status(engine), "async": pool_status(async_engine.sync_engine)},
+        "mongo": mongo_pool_status(),
+    }
+    report["caches"] = cache_stats()
+    if not report["ready"]:
+        response.status_code = 503
+    return report
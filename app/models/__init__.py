@@ -10,6 +10,7 @@ from app.models.faq import Faq
 from app.models.admin import AdminUser
 from app.models.kiosk_device import KioskDevice
 from app.models.audit_log import AuditLog
+from app.models.usage_rollup import AppointmentDailyRollup, UsageCounter
 
 __all__ = [
     "Department",
@@ -20,4 +21,6 @@ __all__ = [
     "AdminUser",
     "KioskDevice",
     "AuditLog",
+    "AppointmentDailyRollup",
+    "UsageCounter",
 ]
\ No newline at end of file
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Index, CheckConstraint, text
+from sqlalchemy import Column, Integer, String, Index, CheckConstraint, text
 from sqlalchemy.dialects.postgresql import UUID, TIMESTAMP
 from app.db.pg import Base
 
@@ -12,6 +12,7 @@ class AdminUser(Base):
     email = Column(String(254), nullable=False, index=True)        # 254 per RFC max
     password_hash = Column(String(255), nullable=False)            # bcrypt/argon2 fit
     role = Column(String(20), nullable=False, server_default="STAFF")  # SUPERADMIN | STAFF
+    token_version = Column(Integer, nullable=False, server_default="0")  # bumped to revoke issued tokens
 
     last_login_at = Column(TIMESTAMP(timezone=True))
     created_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"), nullable=False)
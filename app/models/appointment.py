@@ -35,6 +35,8 @@ class Appointment(Base):
         nullable=False,
         index=True,
     )
+    # Appointment id in the HIS extract; upsert key for app/services/bulk_import.py
+    external_appointment_id = Column(String(120), unique=True)
     start_time = Column(TIMESTAMP(timezone=True), nullable=False)
     end_time   = Column(TIMESTAMP(timezone=True), nullable=True)
 
@@ -51,11 +53,14 @@ class Appointment(Base):
         nullable=True,
     )
     created_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"), nullable=False)
+    reminder_sent_at = Column(TIMESTAMP(timezone=True), nullable=True)  # set by app/services/reminders.py
     # Optional but useful:
     # updated_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"), onupdate=text("now()"), nullable=False)
 
-    patient = relationship("Patient", lazy="joined")
-    doctor  = relationship("Doctor", lazy="joined")
+    # Loaded per query (joinedload/selectinload) when needed; the kiosk paths
+    # select columns instead (app/services/appointment_queries.py)
+    patient = relationship("Patient", lazy="raise_on_sql")
+    doctor  = relationship("Doctor", lazy="raise_on_sql")
 
     __table_args__ = (
         # Ensure end_time is not before start_time
@@ -66,6 +71,14 @@ class Appointment(Base):
         Index("ix_appt_patient_start_time", "patient_id", "start_time"),
         # Helpful for dashboards/exports
         Index("ix_appt_created_at", "created_at"),
+        # Day-range scans across all doctors (usage rollups)
+        Index("ix_appt_start_time", "start_time"),
+        # Reminder scheduler window scans: only appointments still awaiting a reminder
+        Index(
+            "ix_appt_reminder_due",
+            "start_time",
+            postgresql_where=text("reminder_sent_at IS NULL"),
+        ),
         # Optional: prevent exact duplicate slot for a doctor (soft guard)
         # Index("uq_appt_doctor_start", "doctor_id", "start_time", unique=True),
     )
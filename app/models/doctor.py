@@ -21,9 +21,8 @@ class Doctor(Base):
     is_active = Column(Boolean, server_default=text("true"), nullable=False)
     created_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"), nullable=False)
 
-    # If you later add Department.doctors back_populates, set this to match:
-    # department = relationship("Department", back_populates="doctors", lazy="joined")
-    department = relationship("Department", lazy="joined")
+    # Not eager: the admin list and the directory snapshot only need department_id
+    department = relationship("Department", lazy="raise_on_sql")
 
     __table_args__ = (
         # Common query patterns: active doctors in a department, sorted by name
@@ -14,8 +14,8 @@ class KioskDevice(Base):
     # Where the device is installed (Ward A, Lobby, 2F Wing B, etc.)
     location = Column(String(160))
 
-    # Optional unique registration code/API key for device auth (add when you’re ready)
-    # device_code = Column(String(64), unique=True, index=True)
+    # SHA-256 of the device code (X-Device-Code); the code itself is shown once at registration
+    device_code_hash = Column(String(64), unique=True)
 
     is_active = Column(Boolean, nullable=False, server_default=text("true"))
     last_seen_at = Column(TIMESTAMP(timezone=True))
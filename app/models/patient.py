@@ -17,8 +17,12 @@ class Patient(Base):
 
     __table_args__ = (
         Index("ix_patients_created_at", created_at),
-        # Optional: case-insensitive search on name (functional index)
-        # Index("ix_patients_full_name_lower", text("lower(full_name)")),
+        # Substring / fuzzy name search (app/services/patient_search.py); needs pg_trgm
+        Index(
+            "ix_patients_full_name_trgm",
+            text("lower(full_name) gin_trgm_ops"),
+            postgresql_using="gin",
+        ),
     )
 
     def __repr__(self) -> str:
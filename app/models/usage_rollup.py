@@ -0,0 +1,34 @@
+from sqlalchemy import Column, String, Integer, BigInteger, Date, Index, text
+from sqlalchemy.dialects.postgresql import UUID, TIMESTAMP
+from app.db.pg import Base
+
+class AppointmentDailyRollup(Base):
+    """Appointments per (day, department, status); maintained by app/services/rollups.py."""
+    __tablename__ = "appointment_daily_rollups"
+
+    # Day of Appointment.start_time in settings.REPORT_TIMEZONE
+    day = Column(Date, primary_key=True)
+    # Doctor's department at refresh time; no FK, this is derived data
+    department_id = Column(UUID(as_uuid=True), primary_key=True)
+    status = Column(String(16), primary_key=True)
+    count = Column(Integer, nullable=False, server_default=text("0"))
+    refreshed_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"), nullable=False)
+
+    __table_args__ = (
+        Index("ix_appt_rollups_department_day", department_id, day),
+    )
+
+    def __repr__(self) -> str:
+        return f"<AppointmentDailyRollup {self.day} dep={self.department_id} {self.status}={self.count}>"
+
+
+class UsageCounter(Base):
+    """Named totals (e.g. patients, doctors) refreshed alongside the rollups."""
+    __tablename__ = "usage_counters"
+
+    name = Column(String(64), primary_key=True)
+    value = Column(BigInteger, nullable=False, server_default=text("0"))
+    refreshed_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<UsageCounter {self.name}={self.value}>"
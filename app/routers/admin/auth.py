@@ -1,14 +1,17 @@
 from uuid import UUID
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from passlib.hash import bcrypt
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
 
-from app.db.pg import get_db
+from app.db.pg import get_async_db, get_db
 from app.models.admin import AdminUser
-from app.security.deps import create_token, get_current_admin, require_superadmin
+from app.security.deps import create_admin_token, get_current_admin, require_superadmin
+from app.services.admin_cache import AdminIdentity, admin_identity_cache
+from app.services.passwords import hash_password, needs_rehash, verify_password
+from app.services.pagination import CURSOR_DESCRIPTION, apply_keyset, page_rows, set_next_cursor
 from app.schemas.auth import (
     LoginRequest, TokenResponse,
     AdminCreate, AdminOut, ChangePasswordRequest, AdminUpdateRole
@@ -17,14 +20,24 @@ from app.schemas.auth import (
 router = APIRouter(prefix="/admin/auth", tags=["admin-auth"])
 
 
+# Password endpoints are async: bcrypt runs in the hashing process pool
+# (app/services/passwords.py), not on the shared threadpool.
+
 # --- LOGIN ---
 @router.post("/login", response_model=TokenResponse)
-def admin_login(payload: LoginRequest, db: Session = Depends(get_db)):
+async def admin_login(payload: LoginRequest, db: AsyncSession = Depends(get_async_db)):
     email = payload.email.strip().lower()
-    admin = db.query(AdminUser).filter(func.lower(AdminUser.email) == email).first()
-    if not admin or not bcrypt.verify(payload.password, admin.password_hash):
+    admin = (
+        await db.execute(select(AdminUser).where(func.lower(AdminUser.email) == email))
+    ).scalars().first()
+    if not admin or not await verify_password(payload.password, admin.password_hash):
         raise HTTPException(status_code=401, detail="Invalid email or password")
-    token = create_token(str(admin.id))
+    if needs_rehash(admin.password_hash):
+        # Upgrade to the current BCRYPT_ROUNDS while we have the plaintext
+        admin.password_hash = await hash_password(payload.password)
+        await db.commit()
+    token = create_admin_token(admin)
+    admin_identity_cache.put(AdminIdentity.from_row(admin))
     # Optionally update last_login_at:
     # from sqlalchemy import text
     # admin.last_login_at = text("now()"); db.commit()
@@ -33,56 +46,69 @@ def admin_login(payload: LoginRequest, db: Session = Depends(get_db)):
 
 # --- WHO AM I ---
 @router.get("/me", response_model=AdminOut)
-def me(current: AdminUser = Depends(get_current_admin)):
+def me(current: AdminIdentity = Depends(get_current_admin)):
     return current
 
 
 # --- CHANGE PASSWORD (self) ---
 @router.post("/change-password", status_code=status.HTTP_204_NO_CONTENT)
-def change_password(
+async def change_password(
     payload: ChangePasswordRequest,
-    current: AdminUser = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    current: AdminIdentity = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    if not bcrypt.verify(payload.old_password, current.password_hash):
-        raise HTTPException(status_code=400, detail="Old password is incorrect")
+    row = await db.get(AdminUser, current.id)
+    if not row:
+        raise HTTPException(status_code=401, detail="Invalid token")
     if payload.old_password == payload.new_password:
         raise HTTPException(status_code=400, detail="New password must be different")
-    current.password_hash = bcrypt.hash(payload.new_password)
-    db.commit()
+    if not await verify_password(payload.old_password, row.password_hash):
+        raise HTTPException(status_code=400, detail="Old password is incorrect")
+    row.password_hash = await hash_password(payload.new_password)
+    await db.commit()
+    admin_identity_cache.invalidate(row.id)
     return None
 
 
 # --- CREATE ADMIN (SUPERADMIN only) ---
 @router.post("/admins", response_model=AdminOut, status_code=status.HTTP_201_CREATED)
-def create_admin(
+async def create_admin(
     payload: AdminCreate,
-    _: AdminUser = Depends(require_superadmin),
-    db: Session = Depends(get_db),
+    _: AdminIdentity = Depends(require_superadmin),
+    db: AsyncSession = Depends(get_async_db),
 ):
     email = payload.email.strip().lower()
-    dup = db.query(AdminUser).filter(func.lower(AdminUser.email) == email).first()
+    dup = (
+        await db.execute(select(AdminUser.id).where(func.lower(AdminUser.email) == email))
+    ).first()
     if dup:
         raise HTTPException(status_code=409, detail="Email already exists")
-    row = AdminUser(email=email, password_hash=bcrypt.hash(payload.password), role=payload.role)
-    db.add(row); db.commit(); db.refresh(row)
+    row = AdminUser(email=email, password_hash=await hash_password(payload.password), role=payload.role)
+    db.add(row); await db.commit(); await db.refresh(row)
     return row
 
 
 # --- LIST ADMINS (SUPERADMIN only) ---
 @router.get("/admins", response_model=List[AdminOut])
 def list_admins(
+    response: Response,
     q: str | None = Query(None, description="Search by email"),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
-    _: AdminUser = Depends(require_superadmin),
+    cursor: str | None = Query(None, description=CURSOR_DESCRIPTION),
+    _: AdminIdentity = Depends(require_superadmin),
     db: Session = Depends(get_db),
 ):
     query = db.query(AdminUser)
     if q:
         like = f"%{q.lower()}%"
         query = query.filter(func.lower(AdminUser.email).like(like))
-    rows = query.order_by(AdminUser.created_at.desc()).limit(limit).offset(offset).all()
+    query = apply_keyset(
+        query, [AdminUser.created_at, AdminUser.id],
+        cursor=cursor, limit=limit, offset=offset, descending=True,
+    )
+    rows, next_cursor = page_rows(query.all(), limit, key=lambda r: (r.created_at, r.id))
+    set_next_cursor(response, next_cursor)
     return rows
 
 
@@ -91,14 +117,17 @@ def list_admins(
 def update_admin_role(
     admin_id: UUID,
     payload: AdminUpdateRole,
-    _: AdminUser = Depends(require_superadmin),
+    _: AdminIdentity = Depends(require_superadmin),
     db: Session = Depends(get_db),
 ):
     row = db.get(AdminUser, admin_id)
     if not row:
         raise HTTPException(status_code=404, detail="Admin not found")
-    row.role = payload.role
-    db.commit(); db.refresh(row)
+    if row.role != payload.role:
+        row.role = payload.role
+        row.token_version = AdminUser.token_version + 1  # revokes tokens carrying the old role
+        db.commit(); db.refresh(row)
+        admin_identity_cache.put(AdminIdentity.from_row(row), pin=True)
     return row
 
 
@@ -106,7 +135,7 @@ def update_admin_role(
 @router.delete("/admins/{admin_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_admin(
     admin_id: UUID,
-    _: AdminUser = Depends(require_superadmin),
+    _: AdminIdentity = Depends(require_superadmin),
     db: Session = Depends(get_db),
 ):
     row = db.get(AdminUser, admin_id)
@@ -114,4 +143,5 @@ def delete_admin(
         raise HTTPException(status_code=404, detail="Admin not found")
     db.delete(row)
     db.commit()
+    admin_identity_cache.forget(admin_id)
     return None
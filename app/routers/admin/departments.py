@@ -1,10 +1,12 @@
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 
 from app.db.pg import get_db
 from app.security.deps import require_admin_token
+from app.services.directory_cache import directory_cache
+from app.services.pagination import CURSOR_DESCRIPTION, apply_keyset, page_rows, set_next_cursor
 from app.models.department import Department
 from app.schemas.department import DepartmentCreate, DepartmentUpdate, DepartmentOut
 
@@ -13,15 +15,19 @@ router = APIRouter(prefix="/admin/departments", tags=["admin-departments"])
 
 @router.get("/", response_model=list[DepartmentOut], dependencies=[Depends(require_admin_token)])
 def list_departments(
+    response: Response,
     db: Session = Depends(get_db),
     q: str | None = Query(None, description="Search by name"),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None, description=CURSOR_DESCRIPTION),
 ):
     query = db.query(Department)
     if q:
         query = query.filter(func.lower(Department.name).like(f"%{q.lower()}%"))
-    rows = query.order_by(Department.name).limit(limit).offset(offset).all()
+    query = apply_keyset(query, [Department.name, Department.id], cursor=cursor, limit=limit, offset=offset)
+    rows, next_cursor = page_rows(query.all(), limit, key=lambda r: (r.name, r.id))
+    set_next_cursor(response, next_cursor)
     return rows
 
 
@@ -48,6 +54,7 @@ def create_department(payload: DepartmentCreate, db: Session = Depends(get_db)):
     )
     db.add(row)
     db.commit()
+    directory_cache.invalidate()
     db.refresh(row)
     return row
 
@@ -67,6 +74,7 @@ def update_department(dep_id: UUID, payload: DepartmentUpdate, db: Session = Dep
     for k, v in payload.model_dump(exclude_unset=True).items():
         setattr(row, k, v)
     db.commit()
+    directory_cache.invalidate()
     db.refresh(row)
     return row
 
@@ -78,4 +86,5 @@ def delete_department(dep_id: UUID, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Department not found")
     db.delete(row)
     db.commit()
+    directory_cache.invalidate()
     return None
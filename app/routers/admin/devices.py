@@ -0,0 +1,112 @@
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func
+
+from app.db.pg import get_async_db, get_db
+from app.security.deps import require_admin_token
+from app.services.devices import device_registry, hash_device_code, new_device_code
+from app.services.pagination import CURSOR_DESCRIPTION, apply_keyset, page_rows, set_next_cursor
+from app.models.kiosk_device import KioskDevice
+from app.schemas.device import DeviceCreate, DeviceUpdate, DeviceOut, DeviceRegistered
+
+router = APIRouter(prefix="/admin/devices", tags=["admin-devices"])
+
+
+def _registered(row: KioskDevice, code: str) -> DeviceRegistered:
+    return DeviceRegistered.model_validate(
+        {**DeviceOut.model_validate(row).model_dump(), "device_code": code}
+    )
+
+
+@router.get("/", response_model=list[DeviceOut], dependencies=[Depends(require_admin_token)])
+def list_devices(
+    response: Response,
+    db: Session = Depends(get_db),
+    q: str | None = Query(None, description="Search by name or location"),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None, description=CURSOR_DESCRIPTION),
+):
+    query = db.query(KioskDevice)
+    if q:
+        like = f"%{q.lower()}%"
+        query = query.filter(func.lower(KioskDevice.name).like(like) | func.lower(KioskDevice.location).like(like))
+    query = apply_keyset(query, [KioskDevice.name, KioskDevice.id], cursor=cursor, limit=limit, offset=offset)
+    rows, next_cursor = page_rows(query.all(), limit, key=lambda r: (r.name, r.id))
+    set_next_cursor(response, next_cursor)
+    return rows
+
+
+@router.get("/fleet", dependencies=[Depends(require_admin_token)])
+async def fleet_status(db: AsyncSession = Depends(get_async_db)):
+    """
+    Every device with online/offline and its last heartbeat report, served
+    from this worker's registry (no DB read unless the registry is stale).
+    """
+    await device_registry.ensure_loaded(db)
+    return device_registry.fleet()
+
+
+@router.get("/{device_id}", response_model=DeviceOut, dependencies=[Depends(require_admin_token)])
+def get_device(device_id: UUID, db: Session = Depends(get_db)):
+    row = db.get(KioskDevice, device_id)
+    if not row:
+        raise HTTPException(status_code=404, detail="Device not found")
+    return row
+
+
+@router.post("/", response_model=DeviceRegistered, status_code=status.HTTP_201_CREATED, dependencies=[Depends(require_admin_token)])
+def register_device(payload: DeviceCreate, db: Session = Depends(get_db)):
+    # The code is returned once; only its hash is stored
+    code = new_device_code()
+    row = KioskDevice(
+        name=payload.name,
+        location=payload.location,
+        is_active=payload.is_active,
+        device_code_hash=hash_device_code(code),
+    )
+    db.add(row)
+    db.commit()
+    device_registry.invalidate()
+    db.refresh(row)
+    return _registered(row, code)
+
+
+@router.post("/{device_id}/code", response_model=DeviceRegistered, dependencies=[Depends(require_admin_token)])
+def rotate_device_code(device_id: UUID, db: Session = Depends(get_db)):
+    """Issue a new code; the old one stops working immediately on this worker."""
+    row = db.get(KioskDevice, device_id)
+    if not row:
+        raise HTTPException(status_code=404, detail="Device not found")
+    code = new_device_code()
+    row.device_code_hash = hash_device_code(code)
+    db.commit()
+    device_registry.invalidate()
+    db.refresh(row)
+    return _registered(row, code)
+
+
+@router.patch("/{device_id}", response_model=DeviceOut, dependencies=[Depends(require_admin_token)])
+def update_device(device_id: UUID, payload: DeviceUpdate, db: Session = Depends(get_db)):
+    row = db.get(KioskDevice, device_id)
+    if not row:
+        raise HTTPException(status_code=404, detail="Device not found")
+    for k, v in payload.model_dump(exclude_unset=True).items():
+        setattr(row, k, v)
+    db.commit()
+    device_registry.invalidate()
+    db.refresh(row)
+    return row
+
+
+@router.delete("/{device_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(require_admin_token)])
+def delete_device(device_id: UUID, db: Session = Depends(get_db)):
+    row = db.get(KioskDevice, device_id)
+    if not row:
+        raise HTTPException(status_code=404, detail="Device not found")
+    db.delete(row)
+    db.commit()
+    device_registry.invalidate()
+    return None
@@ -1,10 +1,12 @@
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 
 from app.db.pg import get_db
 from app.security.deps import require_admin_token
+from app.services.directory_cache import directory_cache
+from app.services.pagination import CURSOR_DESCRIPTION, apply_keyset, page_rows, set_next_cursor
 from app.models.doctor import Doctor
 from app.models.department import Department
 from app.schemas.doctor import DoctorCreate, DoctorUpdate, DoctorOut
@@ -14,11 +16,13 @@ router = APIRouter(prefix="/admin/doctors", tags=["admin-doctors"])
 
 @router.get("/", response_model=list[DoctorOut], dependencies=[Depends(require_admin_token)])
 def list_doctors(
+    response: Response,
     db: Session = Depends(get_db),
     department_id: UUID | None = Query(None, description="Filter by department UUID"),
     q: str | None = Query(None, description="Search by name or specialty"),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None, description=CURSOR_DESCRIPTION),
 ):
     query = db.query(Doctor)
     if department_id:
@@ -26,7 +30,9 @@ def list_doctors(
     if q:
         like = f"%{q.lower()}%"
         query = query.filter(func.lower(Doctor.name).like(like) | func.lower(Doctor.specialty).like(like))
-    rows = query.order_by(Doctor.name).limit(limit).offset(offset).all()
+    query = apply_keyset(query, [Doctor.name, Doctor.id], cursor=cursor, limit=limit, offset=offset)
+    rows, next_cursor = page_rows(query.all(), limit, key=lambda r: (r.name, r.id))
+    set_next_cursor(response, next_cursor)
     return rows
 
 
@@ -46,6 +52,7 @@ def create_doctor(payload: DoctorCreate, db: Session = Depends(get_db)):
     row = Doctor(**payload.model_dump())
     db.add(row)
     db.commit()
+    directory_cache.invalidate()
     db.refresh(row)
     return row
 
@@ -61,6 +68,7 @@ def update_doctor(doc_id: UUID, payload: DoctorUpdate, db: Session = Depends(get
     for k, v in payload.model_dump(exclude_unset=True).items():
         setattr(row, k, v)
     db.commit()
+    directory_cache.invalidate()
     db.refresh(row)
     return row
 
@@ -72,4 +80,5 @@ def delete_doctor(doc_id: UUID, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Doctor not found")
     db.delete(row)
     db.commit()
+    directory_cache.invalidate()
     return None
@@ -0,0 +1,118 @@
+import csv
+import io
+import json
+from datetime import date, datetime, time, timedelta, timezone
+from typing import AsyncIterator, Literal, Sequence
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, cast, select, String
+
+from app.db.pg import AsyncSessionLocal
+from app.models.appointment import Appointment
+from app.models.audit_log import AuditLog
+from app.models.doctor import Doctor
+from app.models.patient import Patient
+from app.security.deps import require_admin_token
+
+router = APIRouter(prefix="/admin/exports", tags=["admin-exports"])
+
+# Rows fetched per server-side cursor round trip, and rows per body chunk
+YIELD_PER = 2000
+FLUSH_ROWS = 500
+
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+def _created_range(stmt: Select, column, start: date | None, end: date | None) -> Select:
+    """[start, end] in whole UTC days, as a range on the created_at index."""
+    if start and end and end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    if start:
+        stmt = stmt.where(column >= datetime.combine(start, time.min, tzinfo=timezone.utc))
+    if end:
+        stmt = stmt.where(column < datetime.combine(end + timedelta(days=1), time.min, tzinfo=timezone.utc))
+    return stmt
+
+
+def _value(v):
+    if isinstance(v, datetime):
+        return v.isoformat()
+    return v if v is None or isinstance(v, (int, float, bool, dict, list)) else str(v)
+
+
+async def _stream_rows(stmt: Select, columns: Sequence[str], fmt: str) -> AsyncIterator[str]:
+    # Own session: yield-dependencies are closed before a streamed body is sent
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(stmt.execution_options(yield_per=YIELD_PER))
+        buf = io.StringIO()
+        writer = csv.writer(buf) if fmt == "csv" else None
+        if writer:
+            writer.writerow(columns)
+        n = 0
+        async for row in result:
+            values = [_value(v) for v in row]
+            if writer:
+                writer.writerow([json.dumps(v) if isinstance(v, (dict, list)) else v for v in values])
+            else:
+                buf.write(json.dumps(dict(zip(columns, values)), ensure_ascii=False, default=str))
+                buf.write("\n")
+            n += 1
+            if n % FLUSH_ROWS == 0:
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+        if buf.tell():
+            yield buf.getvalue()
+
+
+def _export_response(stmt: Select, columns: Sequence[str], fmt: str, name: str,
+                     start: date | None, end: date | None) -> StreamingResponse:
+    span = f"_{start or 'begin'}_{end or 'now'}"
+    return StreamingResponse(
+        _stream_rows(stmt, columns, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}{span}.{fmt}"'},
+    )
+
+
+@router.get("/appointments", dependencies=[Depends(require_admin_token)])
+async def export_appointments(
+    start: date | None = Query(None, description="created_at from this UTC day (inclusive)"),
+    end: date | None = Query(None, description="created_at up to this UTC day (inclusive)"),
+    format: Literal["csv", "ndjson"] = Query("csv"),
+):
+    """Stream appointments created in [start, end] in created_at order; memory use is constant."""
+    columns = (
+        "id", "external_appointment_id", "patient_id", "external_patient_id", "doctor_id",
+        "doctor_name", "start_time", "end_time", "status", "created_at",
+    )
+    stmt = (
+        select(
+            Appointment.id, Appointment.external_appointment_id, Appointment.patient_id,
+            Patient.external_patient_id, Appointment.doctor_id, Doctor.name,
+            Appointment.start_time, Appointment.end_time, cast(Appointment.status, String),
+            Appointment.created_at,
+        )
+        .join(Patient, Patient.id == Appointment.patient_id)
+        .join(Doctor, Doctor.id == Appointment.doctor_id)
+        .order_by(Appointment.created_at, Appointment.id)
+    )
+    stmt = _created_range(stmt, Appointment.created_at, start, end)
+    return _export_response(stmt, columns, format, "appointments", start, end)
+
+
+@router.get("/audit-logs", dependencies=[Depends(require_admin_token)])
+async def export_audit_logs(
+    start: date | None = Query(None, description="created_at from this UTC day (inclusive)"),
+    end: date | None = Query(None, description="created_at up to this UTC day (inclusive)"),
+    format: Literal["csv", "ndjson"] = Query("csv"),
+):
+    """Stream audit log rows created in [start, end] in created_at order; memory use is constant."""
+    columns = ("id", "created_at", "actor_type", "actor_id", "action", "meta_json")
+    stmt = select(
+        AuditLog.id, AuditLog.created_at, AuditLog.actor_type, AuditLog.actor_id,
+        AuditLog.action, AuditLog.meta_json,
+    ).order_by(AuditLog.created_at, AuditLog.id)
+    stmt = _created_range(stmt, AuditLog.created_at, start, end)
+    return _export_response(stmt, columns, format, "audit_logs", start, end)
@@ -1,10 +1,12 @@
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 
 from app.db.pg import get_db
 from app.security.deps import require_admin_token
+from app.services.nlu import reload_faqs
+from app.services.pagination import CURSOR_DESCRIPTION, apply_keyset, page_rows, set_next_cursor
 from app.models.faq import Faq
 from app.schemas.faq import FaqCreate, FaqUpdate, FaqOut
 
@@ -13,11 +15,13 @@ router = APIRouter(prefix="/admin/faqs", tags=["admin-faqs"])
 
 @router.get("/", response_model=list[FaqOut], dependencies=[Depends(require_admin_token)])
 def list_faqs(
+    response: Response,
     db: Session = Depends(get_db),
     q: str | None = Query(None, description="Search by intent_key or question"),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
     include_inactive: bool = Query(False, description="Include inactive FAQs"),
+    cursor: str | None = Query(None, description=CURSOR_DESCRIPTION),
 ):
     query = db.query(Faq)
     if not include_inactive:
@@ -27,7 +31,9 @@ def list_faqs(
         query = query.filter(
             func.lower(Faq.intent_key).like(like) | func.lower(Faq.question).like(like)
         )
-    rows = query.order_by(Faq.intent_key).limit(limit).offset(offset).all()
+    query = apply_keyset(query, [Faq.intent_key, Faq.id], cursor=cursor, limit=limit, offset=offset)
+    rows, next_cursor = page_rows(query.all(), limit, key=lambda r: (r.intent_key, r.id))
+    set_next_cursor(response, next_cursor)
     return rows
 
 
@@ -48,6 +54,7 @@ def create_faq(payload: FaqCreate, db: Session = Depends(get_db)):
     row = Faq(**payload.model_dump())
     db.add(row)
     db.commit()
+    reload_faqs(db)  # recompile intents with the new phrase / answer
     db.refresh(row)
     return row
 
@@ -67,6 +74,7 @@ def update_faq(faq_id: UUID, payload: FaqUpdate, db: Session = Depends(get_db)):
     for k, v in payload.model_dump(exclude_unset=True).items():
         setattr(row, k, v)
     db.commit()
+    reload_faqs(db)  # recompile intents with the new phrase / answer
     db.refresh(row)
     return row
 
@@ -78,4 +86,5 @@ def delete_faq(faq_id: UUID, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="FAQ not found")
     db.delete(row)
     db.commit()
+    reload_faqs(db)
     return None
@@ -0,0 +1,54 @@
+import tempfile
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.db.pg import engine
+from app.security.deps import require_admin_token
+from app.services.appointment_cache import appointment_lookup_cache
+from app.services.availability import availability_cache
+from app.services.bulk_import import run_import, text_stream
+
+router = APIRouter(prefix="/admin/imports", tags=["admin-imports"])
+
+
+@router.post("/{entity}", dependencies=[Depends(require_admin_token)])
+async def import_extract(
+    entity: Literal["patients", "appointments"],
+    request: Request,
+    format: Literal["csv", "ndjson"] | None = Query(None, description="Default: from Content-Type, else csv"),
+    chunk_size: int = Query(settings.IMPORT_CHUNK_SIZE, ge=100, le=100_000),
+):
+    """
+    Upsert an HIS extract sent as the raw request body (text/csv or
+    application/x-ndjson). Returns counts and sample rejects; for nightly
+    multi-GB loads prefer scripts/import_his.py.
+    """
+    if format is None:
+        ctype = request.headers.get("content-type", "")
+        format = "ndjson" if "ndjson" in ctype or "jsonl" in ctype else "csv"
+
+    # Spool the body (memory, then disk) so the load can run off the event loop
+    limit = settings.IMPORT_MAX_UPLOAD_MB * 1024 * 1024
+    spool = tempfile.SpooledTemporaryFile(max_size=settings.IMPORT_SPOOL_MEMORY_MB * 1024 * 1024)
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            spool.close()
+            raise HTTPException(status_code=413, detail=f"Upload exceeds {settings.IMPORT_MAX_UPLOAD_MB} MB")
+        spool.write(chunk)
+    spool.seek(0)
+
+    def load():
+        with spool, engine.connect() as conn:
+            return run_import(conn, text_stream(spool), entity, format, chunk_size)
+
+    report = await run_in_threadpool(load)
+    # Patient rows change what a token resolves to; appointment rows change the results
+    appointment_lookup_cache.invalidate()
+    if entity == "appointments":
+        availability_cache.invalidate()  # bookings may have moved for any doctor
+    return report.as_dict()
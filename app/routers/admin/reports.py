@@ -1,41 +1,66 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from datetime import date, timedelta
 
 from app.security.deps import require_admin_token
 from app.db.pg import get_db
-from app.models.appointment import Appointment, AppointmentStatus
-from app.models.doctor import Doctor
-from app.models.patient import Patient
+from app.models.department import Department
+from app.models.usage_rollup import AppointmentDailyRollup, UsageCounter
 
 router = APIRouter(prefix="/admin/reports", tags=["admin-reports"])
 
 
 @router.get("/usage", dependencies=[Depends(require_admin_token)])
-def usage_report(db: Session = Depends(get_db)):
-    """Return a simple usage summary for the last 30 days."""
-    today = date.today()
-    start_date = today - timedelta(days=30)
-
-    total_patients = db.query(func.count(Patient.id)).scalar()
-    total_doctors = db.query(func.count(Doctor.id)).scalar()
-
-    appt_counts = (
-        db.query(
-            Appointment.status,
-            func.count(Appointment.id).label("count")
-        )
-        .filter(Appointment.start_time >= start_date)
-        .group_by(Appointment.status)
+def usage_report(
+    db: Session = Depends(get_db),
+    start: date | None = Query(None, description="First day (inclusive); default 30 days ago"),
+    end: date | None = Query(None, description="Last day (inclusive); default open-ended"),
+):
+    """
+    Usage summary read from the daily rollups (see app/services/rollups.py),
+    so cost depends on the date range, not on table size.
+    """
+    default_range = start is None
+    start = start or date.today() - timedelta(days=30)
+    if end and end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+
+    R = AppointmentDailyRollup
+    day_filter = [R.day >= start] + ([R.day <= end] if end else [])
+
+    by_status = (
+        db.query(R.status, func.sum(R.count))
+        .filter(*day_filter)
+        .group_by(R.status)
+        .all()
+    )
+    by_department = (
+        db.query(R.department_id, Department.name, R.status, func.sum(R.count))
+        .outerjoin(Department, Department.id == R.department_id)
+        .filter(*day_filter)
+        .group_by(R.department_id, Department.name, R.status)
         .all()
     )
+    counters = {name: (value, at) for name, value, at in db.query(UsageCounter.name, UsageCounter.value, UsageCounter.refreshed_at)}
 
     # Convert to dict like {"PENDING": 10, "CONFIRMED": 5, ...}
-    appt_summary = {status: count for status, count in appt_counts}
+    appt_summary = {status: int(count) for status, count in by_status}
+
+    departments: dict = {}
+    for dep_id, dep_name, status, count in by_department:
+        entry = departments.setdefault(dep_id, {"departmentId": dep_id, "name": dep_name, "counts": {}})
+        entry["counts"][status] = int(count)
 
-    return {
-        "total_patients": total_patients,
-        "total_doctors": total_doctors,
-        "appointments_last_30_days": appt_summary,
+    res = {
+        "total_patients": counters.get("patients", (None, None))[0],
+        "total_doctors": counters.get("doctors", (None, None))[0],
+        "range": {"start": start, "end": end},
+        "appointments_by_status": appt_summary,
+        "appointments_by_department": list(departments.values()),
+        "refreshed_at": max((at for _, at in counters.values()), default=None),
     }
+    if default_range:
+        res["appointments_last_30_days"] = appt_summary  # pre-rollup response key
+    return res
+
@@ -1,17 +1,17 @@
 from __future__ import annotations
 
 from uuid import UUID
-from datetime import datetime, timezone
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.pg import get_db
+from app.db.pg import get_async_db
 from app.models.appointment import Appointment
-from app.models.patient import Patient
-from app.models.doctor import Doctor
+from app.services import fast_json
+from app.services.appointment_queries import for_patients, item_select
+from app.services.pagination import apply_keyset, page_rows
+from app.services.patient_search import find_patient_ids
 from app.schemas.appointment import (
     AppointmentCheckRequest,
     AppointmentCheckResponse,
@@ -21,87 +21,50 @@ from app.schemas.appointment import (
 router = APIRouter(prefix="/appointments", tags=["appointments"])
 
 
-def _try_parse_uuid(value: str) -> Optional[UUID]:
-    try:
-        return UUID(value)
-    except Exception:
-        return None
-
-
 @router.post("/check", response_model=AppointmentCheckResponse)
-def check_appointments(
+async def check_appointments(
     payload: AppointmentCheckRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     limit: int = Query(20, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous response (nextCursor); overrides offset"),
     upcoming_only: bool = Query(False, description="If true, only future appointments are returned"),
 ):
     term = (payload.patientIdOrName or "").strip()
     if not term:
         return AppointmentCheckResponse(items=[])
 
-    # Base query
-    q = (
-        db.query(Appointment, Patient, Doctor)
-        .join(Patient, Patient.id == Appointment.patient_id)
-        .join(Doctor, Doctor.id == Appointment.doctor_id)
-    )
-
-    # Filters: UUID (Patient.id), exact external_patient_id, or ilike on full_name
-    as_uuid = _try_parse_uuid(term)
-    if as_uuid:
-        q = q.filter(Patient.id == as_uuid)
-    else:
-        q = q.filter(
-            or_(
-                Patient.external_patient_id == term,
-                func.lower(Patient.full_name).like(f"%{term.lower()}%"),
-            )
-        )
+    # Resolve UUID / exact MRN / fuzzy name to patient ids first
+    patient_ids = await find_patient_ids(db, term)
+    if not patient_ids:
+        return AppointmentCheckResponse(items=[])
 
-    if upcoming_only:
-        now = datetime.now(timezone.utc)
-        q = q.filter(Appointment.start_time >= now)
+    q = for_patients(item_select(), patient_ids, upcoming_only)
 
-    rows = (
-        q.order_by(Appointment.start_time.desc())
-        .limit(limit)
-        .offset(offset)
-        .all()
+    # Newest first; (start_time, id) keyset walks ix_appt_patient_start_time
+    q = apply_keyset(
+        q, [Appointment.start_time, Appointment.id],
+        cursor=cursor, limit=limit, offset=offset, descending=True,
     )
+    result = await db.execute(q)
+    rows, next_cursor = page_rows(result.all(), limit, key=lambda r: (r.start_time, r.id))
 
-    items: list[AppointmentItem] = [
-        AppointmentItem(
-            id=a.id,
-            doctorName=d.name,
-            start_time=a.start_time,
-            end_time=a.end_time,
-            status=a.status,
-        )
-        for (a, p, d) in rows
-    ]
-    return AppointmentCheckResponse(items=items)
+    if fast_json.enabled():
+        # Labelled rows already match AppointmentItem; skip response_model
+        return fast_json.FastJSONResponse({"items": [r._asdict() for r in rows], "nextCursor": next_cursor})
+    items = [AppointmentItem.model_validate(r) for r in rows]
+    return AppointmentCheckResponse(items=items, nextCursor=next_cursor)
 
 
 @router.get("/{appointment_id}", response_model=AppointmentItem)
-def get_appointment(
+async def get_appointment(
     appointment_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    row = (
-        db.query(Appointment, Doctor)
-        .join(Doctor, Doctor.id == Appointment.doctor_id)
-        .filter(Appointment.id == appointment_id)
-        .first()
-    )
+    result = await db.execute(item_select().where(Appointment.id == appointment_id))
+    row = result.first()
     if not row:
         raise HTTPException(status_code=404, detail="Appointment not found")
-
-    a, d = row
-    return AppointmentItem(
-        id=a.id,
-        doctorName=d.name,
-        start_time=a.start_time,
-        end_time=a.end_time,
-        status=a.status,
-    )
+    if fast_json.enabled():
+        return fast_json.FastJSONResponse(row._asdict())
+    return AppointmentItem.model_validate(row)
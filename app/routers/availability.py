@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.pg import get_async_db
+from app.schemas.availability import (
+    DepartmentNextResponse,
+    DoctorAvailability,
+    NextAvailable,
+    SlotOut,
+)
+from app.services.availability import ClinicHours, availability_cache, free_slots
+from app.services.directory_cache import directory_cache
+
+router = APIRouter(prefix="/availability", tags=["availability"])
+
+MAX_RANGE_DAYS = 31
+
+
+def _range(start: Optional[date], end: Optional[date], hours: ClinicHours) -> Tuple[datetime, datetime]:
+    today = datetime.now(hours.tz).date()
+    start = start or today
+    end = end or start + timedelta(days=6)
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    if (end - start).days >= MAX_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {MAX_RANGE_DAYS} days")
+    lo, hi = hours.day_bounds(start, end)
+    return max(lo, datetime.now(timezone.utc)), hi  # no slots in the past
+
+
+def _duration(minutes: Optional[int]) -> Tuple[timedelta, timedelta]:
+    step = timedelta(minutes=settings.SLOT_MINUTES)
+    return (timedelta(minutes=minutes) if minutes else step), step
+
+
+async def _department_doctors(db: AsyncSession, department_id: UUID) -> List[dict]:
+    snap = await directory_cache.snapshot(db)
+    if not any(d["id"] == department_id for d in snap.departments):
+        raise HTTPException(status_code=404, detail="Department not found")
+    return [d for d in snap.doctors if d["departmentId"] == department_id]
+
+
+def _availability(doc: dict, slots) -> DoctorAvailability:
+    return DoctorAvailability(
+        doctorId=doc["id"],
+        name=doc["name"],
+        specialty=doc["specialty"],
+        room=doc["room"],
+        slots=[SlotOut(start=s, end=e) for s, e in slots],
+    )
+
+
+@router.get("/doctors/{doctor_id}", response_model=DoctorAvailability)
+async def doctor_availability(
+    doctor_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    start: Optional[date] = Query(None, description="First day (clinic time); default today"),
+    end: Optional[date] = Query(None, description="Last day, inclusive; default start + 6 days"),
+    duration: Optional[int] = Query(None, ge=5, le=240, description="Minutes; default SLOT_MINUTES"),
+    limit: int = Query(50, ge=1, le=500),
+):
+    snap = await directory_cache.snapshot(db)
+    doc = next((d for d in snap.doctors if d["id"] == doctor_id), None)
+    if doc is None:
+        raise HTTPException(status_code=404, detail="Doctor not found")
+
+    hours = ClinicHours.from_settings()
+    lo, hi = _range(start, end, hours)
+    length, step = _duration(duration)
+    busy = (await availability_cache.busy_for(db, [doctor_id], lo, hi))[doctor_id]
+    return _availability(doc, free_slots(busy, hours, lo, hi, length, step, limit))
+
+
+@router.get("/departments/{department_id}", response_model=list[DoctorAvailability])
+async def department_availability(
+    department_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    start: Optional[date] = Query(None, description="First day (clinic time); default today"),
+    end: Optional[date] = Query(None, description="Last day, inclusive; default start + 6 days"),
+    duration: Optional[int] = Query(None, ge=5, le=240, description="Minutes; default SLOT_MINUTES"),
+    limit_per_doctor: int = Query(10, ge=1, le=200),
+):
+    doctors = await _department_doctors(db, department_id)
+    hours = ClinicHours.from_settings()
+    lo, hi = _range(start, end, hours)
+    length, step = _duration(duration)
+    busy = await availability_cache.busy_for(db, [d["id"] for d in doctors], lo, hi)
+    return [
+        _availability(doc, free_slots(busy[doc["id"]], hours, lo, hi, length, step, limit_per_doctor))
+        for doc in doctors
+    ]
+
+
+@router.get("/departments/{department_id}/next", response_model=DepartmentNextResponse)
+async def department_next_available(
+    department_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    duration: Optional[int] = Query(None, ge=5, le=240, description="Minutes; default SLOT_MINUTES"),
+    limit: int = Query(10, ge=1, le=200, description="Doctors to return"),
+):
+    """Each doctor's earliest free slot within AVAILABILITY_HORIZON_DAYS, earliest first."""
+    doctors = await _department_doctors(db, department_id)
+    hours = ClinicHours.from_settings()
+    lo = datetime.now(timezone.utc)
+    hi = lo + availability_cache.horizon
+    length, step = _duration(duration)
+    busy = await availability_cache.busy_for(db, [d["id"] for d in doctors], lo, hi)
+
+    items = []
+    for doc in doctors:
+        slots = free_slots(busy[doc["id"]], hours, lo, hi, length, step, 1)
+        if slots:
+            s, e = slots[0]
+            items.append(NextAvailable(
+                doctorId=doc["id"], name=doc["name"], specialty=doc["specialty"],
+                room=doc["room"], start=s, end=e,
+            ))
+    items.sort(key=lambda i: (i.start, i.name))
+    return DepartmentNextResponse(departmentId=department_id, items=items[:limit])
@@ -1,20 +1,36 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import math
 from datetime import datetime, timezone
-from typing import Optional, List
+from typing import AsyncIterator, Literal, Optional, List, Tuple
+from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Path
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from bson import ObjectId
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
+from pydantic import ValidationError
+from pymongo import ReturnDocument
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Select
 
+from app.config import settings
 from app.db.mongo import get_mongo
-from app.db.pg import get_db
-from app.services.nlu import detect_intent
-from app.schemas.chat import StartSessionRequest, AddMessageRequest
+from app.db.pg import AsyncSessionLocal, get_async_db
+from app.security.deps import chat_device, require_admin_token
+from app.services.appointment_cache import appointment_lookup_cache
+from app.services.appointment_queries import card_dict, card_select, for_patients
+from app.services.chat_archive import history_collection
+from app.services.devices import DeviceInfo, device_registry
+from app.services.nlu import detect_intent, faq_answer
+from app.services.pagination import CURSOR_DESCRIPTION, decode_cursor, page_rows, set_next_cursor
+from app.services.rate_limit import client_key, rate_limiter
+from app.services.patient_search import find_patient_ids
+from app.services.session_cache import session_cache
+from app.services.timing import TurnTimer
+from app.schemas.chat import StartSessionRequest, AddMessageRequest, MessageHistoryResponse
 from app.models.appointment import Appointment
-from app.models.patient import Patient
-from app.models.doctor import Doctor
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
@@ -31,70 +47,85 @@ def _format_time(dt) -> str:
     return dt.astimezone(timezone.utc).strftime("%d %b %Y, %H:%M")
 
 
-async def _fetch_appointments_by_token(
-    db: Session, token: str, upcoming_only: bool = True, limit: int = 5
-) -> List[dict]:
+def _appointments_for_patients_stmt(
+    patient_ids: List[UUID], upcoming_only: bool, limit: int
+) -> Select:
+    q = for_patients(card_select(), patient_ids, upcoming_only)
+    return q.order_by(Appointment.start_time.asc()).limit(limit)
+
+
+# Appointments shown per check_appointment turn
+CHAT_APPOINTMENT_LIMIT = 5
+
+
+async def _lookup_appointments(
+    db: AsyncSession,
+    token: str,
+    found_ids: List[UUID],
+    *,
+    stored_ids: Optional[List[UUID]] = None,
+    upcoming_only: bool = True,
+    limit: int = CHAT_APPOINTMENT_LIMIT,
+) -> AsyncIterator[dict]:
     """
-    token can be:
+    Appointment cards for a token, yielded as rows arrive. token can be:
       - Patient UUID (internal id)
       - external_patient_id (exact)
-      - partial/full name (case-insensitive)
+      - partial/full name (case-insensitive, trigram-ranked)
+    Served from appointment_lookup_cache when the same token was looked up
+    recently. Otherwise `stored_ids` (resolved on an earlier turn) skip the
+    patient search. The ids the token resolved to are appended to found_ids.
     """
-    token = (token or "").strip()
-    if not token:
-        return []
-
-    # try UUID
-    as_uuid = None
+    hit = appointment_lookup_cache.get(token, upcoming_only, limit)
+    if hit is not None:
+        found_ids.extend(hit.patient_ids)
+        for item in hit.current_items():
+            yield item
+        return
+
+    generation = appointment_lookup_cache.generation
+    # Stored ids go straight to ix_appt_patient_start_time
+    patient_ids = stored_ids if stored_ids is not None else await find_patient_ids(db, token)
+    found_ids.extend(patient_ids)
+    items: List[dict] = []
+    if patient_ids:
+        rows = await db.stream(_appointments_for_patients_stmt(patient_ids, upcoming_only, limit))
+        async for row in rows:
+            item = card_dict(row)
+            items.append(item)
+            yield item
+    appointment_lookup_cache.put(token, upcoming_only, limit, patient_ids, items, generation)
+
+
+def _session_patient_ids(pr: dict, token: str) -> Optional[List[UUID]]:
+    """Patient ids resolved on an earlier turn for this session's attached token."""
+    ids = pr.get("patientIds")
+    if pr.get("token") != token or not isinstance(ids, list):
+        return None
     try:
-        from uuid import UUID
-        as_uuid = UUID(token)
-    except Exception:
-        pass
+        return [UUID(str(i)) for i in ids]
+    except ValueError:
+        return None
 
-    q = (
-        db.query(Appointment, Patient, Doctor)
-        .join(Patient, Patient.id == Appointment.patient_id)
-        .join(Doctor, Doctor.id == Appointment.doctor_id)
-    )
 
-    if as_uuid:
-        q = q.filter(Patient.id == as_uuid)
+@router.post("/sessions")
+async def start_session(
+    payload: StartSessionRequest,
+    dbm=Depends(get_mongo),
+    device: Optional[DeviceInfo] = Depends(chat_device),
+):
+    # A registered kiosk (X-Device-Code) is recorded by its id; the free-form
+    # deviceId is accepted only while DEVICE_AUTH_REQUIRED is off
+    if device is not None:
+        device_id = str(device.id)
+    elif payload.deviceId:
+        device_id = payload.deviceId
     else:
-        q = q.filter(
-            or_(
-                Patient.external_patient_id == token,
-                func.lower(Patient.full_name).like(f"%{token.lower()}%"),
-            )
-        )
-
-    if upcoming_only:
-        now = datetime.now(timezone.utc)
-        q = q.filter(Appointment.start_time >= now)
-
-    rows = q.order_by(Appointment.start_time.asc()).limit(limit).all()
+        raise HTTPException(status_code=400, detail="deviceId is required")
 
-    items: List[dict] = []
-    for (a, p, d) in rows:
-        items.append(
-            {
-                "appointmentId": str(a.id),
-                "patientName": p.full_name,
-                "doctorName": d.name,
-                "departmentId": str(d.department_id),
-                "start_time": a.start_time,
-                "end_time": a.end_time,
-                "status": a.status,
-            }
-        )
-    return items
-
-
-@router.post("/sessions")
-async def start_session(payload: StartSessionRequest, dbm=Depends(get_mongo)):
     now = datetime.now(timezone.utc)
     doc = {
-        "deviceId": payload.deviceId,
+        "deviceId": device_id,
         "startedAt": now,
         "endedAt": None,
         "channel": payload.channel,
@@ -102,40 +133,87 @@ async def start_session(payload: StartSessionRequest, dbm=Depends(get_mongo)):
         "context": {},
     }
     res = await dbm.chat_sessions.insert_one(doc)
+    await session_cache.put(res.inserted_id, doc)
     return {"sessionId": str(res.inserted_id), "startedAt": now}
 
 
-@router.post("/sessions/{sessionId}/messages")
-async def add_message(
-    sessionId: str = Path(..., description="Chat session ObjectId string"),
-    payload: AddMessageRequest = ...,
-    dbm=Depends(get_mongo),
-    dbp: Session = Depends(get_db),
-):
-    sid = _oid(sessionId)
+def _item_json(it: dict) -> dict:
+    return {
+        **it,
+        "start_time": it["start_time"].isoformat(),
+        "end_time": it["end_time"].isoformat() if it["end_time"] else None,
+    }
+
 
-    sess = await dbm.chat_sessions.find_one({"_id": sid})
+async def _load_session_for_turn(dbm, sid: ObjectId, intent: str) -> Tuple[dict, bool]:
+    """
+    Return (session state, cached). Cached sessions skip the read; the
+    turn then records the intent with a status filter, overlapped with the
+    lookup, which also catches a session ended on another worker. On a miss,
+    load the session and record the intent in one round trip. Only the
+    ended check needs a second read, and only on the error path.
+    """
+    sess = await session_cache.get(sid)
+    if sess is not None:
+        return sess, True
+    sess = await dbm.chat_sessions.find_one_and_update(
+        {"_id": sid, "status": {"$ne": "ended"}},
+        {"$set": {"context.intent": intent}},
+        projection={"status": 1, "patientRef": 1},
+        return_document=ReturnDocument.AFTER,
+    )
     if not sess:
+        if await dbm.chat_sessions.count_documents({"_id": sid}, limit=1):
+            raise HTTPException(status_code=409, detail="Session already ended")
         raise HTTPException(status_code=404, detail="Session not found")
-    if sess.get("status") == "ended":
-        raise HTTPException(status_code=409, detail="Session already ended")
+    return await session_cache.put(sid, sess), False
+
+
+class SessionEnded(Exception):
+    """The session was ended elsewhere while a turn was in flight."""
+
+
+async def _turn_events(
+    dbm,
+    dbp: AsyncSession,
+    sid: ObjectId,
+    sess: dict,
+    cached: bool,
+    role: str,
+    text: str,
+    intent: str,
+    timer: TurnTimer,
+) -> AsyncIterator[Tuple[str, dict]]:
+    """
+    One chat turn as a stream of events, shared by the HTTP, WebSocket and
+    SSE endpoints:
+      ("ack",   {"intent"})          immediately
+      ("card",  {"item"})            per appointment, as rows arrive
+      ("reply", {"reply", "intent", "items"?})  after the turn is persisted
+    Raises SessionEnded, before anything is persisted, if a cached session
+    was ended elsewhere.
+    """
+    yield "ack", {"intent": intent}
 
     now = datetime.now(timezone.utc)
 
-    # Store user message
-    intent = detect_intent(payload.text)
-    await dbm.messages.insert_one(
-        {
-            "sessionId": sid,
-            "role": payload.role,
-            "text": payload.text,
-            "nlu": {"intent": intent},
-            "timestamp": now,
-        }
-    )
+    # The cache may predate an end on another worker: record the intent with a
+    # status filter instead of trusting the cached status. It runs alongside
+    # the lookup and is checked before anything is persisted.
+    recorded: Optional[asyncio.Future] = None
+    if cached:
+        recorded = asyncio.ensure_future(
+            dbm.chat_sessions.update_one(
+                {"_id": sid, "status": {"$ne": "ended"}},
+                {"$set": {"context.intent": intent}},
+            )
+        )
+        # Retrieve the outcome even if the consumer goes away mid-turn
+        recorded.add_done_callback(lambda f: f.cancelled() or f.exception())
 
     reply: str
     extra: dict = {}
+    resolved_ids: Optional[List[str]] = None  # to store on the session's patientRef
 
     # --- NEW: real check_appointment intent ---
     if intent == "check_appointment":
@@ -144,10 +222,12 @@ async def add_message(
         # 2) if message starts with "id: ..." or "pid: ..."
         token: Optional[str] = None
         pr = (sess or {}).get("patientRef") or {}
-        if isinstance(pr, dict):
-            token = pr.get("token")
+        if not isinstance(pr, dict):
+            pr = {}
+        token = pr.get("token")
+        from_session = bool(token)
 
-        txt = (payload.text or "").strip()
+        txt = (text or "").strip()
         lowered = txt.lower()
         if not token and (lowered.startswith("id:") or lowered.startswith("pid:")):
             token = txt.split(":", 1)[1].strip()
@@ -155,15 +235,16 @@ async def add_message(
         if not token:
             reply = "Please tell me your patient ID or your full name to check appointments. For example: `ID: MRN-12345`."
         else:
-            items = await _fetch_appointments_by_token(dbp, token, upcoming_only=True, limit=5)
-            extra["items"] = [
-                {
-                    **it,
-                    "start_time": it["start_time"].isoformat(),
-                    "end_time": it["end_time"].isoformat() if it["end_time"] else None,
-                }
-                for it in items
-            ]
+            items: List[dict] = []
+            patient_ids: List[UUID] = []
+            with timer.phase("lookup"):
+                stored_ids = _session_patient_ids(pr, token) if from_session else None
+                async for item in _lookup_appointments(dbp, token, patient_ids, stored_ids=stored_ids):
+                    items.append(item)
+                    yield "card", {"item": _item_json(item)}
+                if from_session and stored_ids is None and patient_ids:
+                    resolved_ids = [str(i) for i in patient_ids]
+            extra["items"] = [_item_json(it) for it in items]
 
             if not items:
                 reply = "I couldn’t find any upcoming appointments. Would you like me to check past ones?"
@@ -176,6 +257,10 @@ async def add_message(
                 more = "" if len(items) <= 3 else f" and {len(items)-3} more…"
                 reply = "Here are your upcoming appointments:\n" + "\n".join(lines) + more
 
+    # --- FAQ-driven intents (also override the samples below when configured) ---
+    elif (answer := faq_answer(intent)) is not None:
+        reply = answer
+
     # --- Existing sample intents / fallback ---
     elif intent == "ask_directions":
         reply = "Please follow the signs to Wing B, 2nd floor. (Sample)"
@@ -184,68 +269,372 @@ async def add_message(
     else:
         reply = "Sorry, I didn’t catch that. You can ask for directions, clinic hours, or say `Check my appointment`."
 
-    # Store assistant reply
-    await dbm.messages.insert_one(
-        {
-            "sessionId": sid,
-            "role": "assistant",
-            "text": reply,
-            "timestamp": datetime.now(timezone.utc),
-            "extra": extra or None,
-        }
-    )
+    if recorded is not None:
+        with timer.phase("session"):
+            matched = (await recorded).matched_count
+        if matched == 0:
+            await session_cache.invalidate(sid)
+            raise SessionEnded()
+
+    # User message + assistant reply in one batch (plus the resolved patient
+    # ids, when there are new ones), sent concurrently
+    with timer.phase("persist"):
+        writes = [
+            dbm.messages.insert_many(
+                [
+                    {
+                        "sessionId": sid,
+                        "role": role,
+                        "text": text,
+                        "nlu": {"intent": intent},
+                        "timestamp": now,
+                    },
+                    {
+                        "sessionId": sid,
+                        "role": "assistant",
+                        "text": reply,
+                        "timestamp": datetime.now(timezone.utc),
+                        "extra": extra or None,
+                    },
+                ],
+                ordered=False,
+            )
+        ]
+        if resolved_ids:
+            # Only while the same patient is attached (a re-attach replaces patientRef)
+            writes.append(
+                dbm.chat_sessions.update_one(
+                    {"_id": sid, "status": {"$ne": "ended"}, "patientRef.token": token},
+                    {"$set": {"patientRef.patientIds": resolved_ids}},
+                )
+            )
+        results = await asyncio.gather(*writes)
 
-    # Update session context with last intent
-    await dbm.chat_sessions.update_one(
-        {"_id": sid},
-        {"$set": {"context.intent": intent}}
-    )
+    if resolved_ids and results[-1].modified_count:
+        await session_cache.put(
+            sid, {"status": "active", "patientRef": {"token": token, "patientIds": resolved_ids}}
+        )
 
     # Return reply and any structured items (frontend can render a card/list)
     res = {"reply": reply, "intent": intent}
     if extra:
         res.update(extra)
+    yield "reply", res
+
+
+@router.post("/sessions/{sessionId}/messages", dependencies=[Depends(chat_device)])
+async def add_message(
+    response: Response,
+    sessionId: str = Path(..., description="Chat session ObjectId string"),
+    payload: AddMessageRequest = ...,
+    dbm=Depends(get_mongo),
+    dbp: AsyncSession = Depends(get_async_db),
+):
+    sid = _oid(sessionId)
+    timer = TurnTimer()
+
+    with timer.phase("nlu"):
+        intent = detect_intent(payload.text)
+    with timer.phase("session"):
+        sess, cached = await _load_session_for_turn(dbm, sid, intent)
+
+    res: dict = {}
+    try:
+        async for event, data in _turn_events(dbm, dbp, sid, sess, cached, payload.role, payload.text, intent, timer):
+            if event == "reply":
+                res = data
+    except SessionEnded:
+        # Ended on another worker while cached; nothing was persisted
+        raise HTTPException(status_code=409, detail="Session already ended")
+
+    response.headers["Server-Timing"] = timer.server_timing()
+    timer.log(intent=intent)
     return res
 
 
-@router.patch("/sessions/{sessionId}/attach-patient")
-async def attach_patient(
-    sessionId: str,
-    patientIdOrName: str,
+_HISTORY_PROJECTION = {"role": 1, "text": 1, "timestamp": 1, "nlu.intent": 1, "extra": 1}
+
+
+@router.get("/sessions/{sessionId}/messages", response_model=MessageHistoryResponse, dependencies=[Depends(require_admin_token)])
+async def list_messages(
+    response: Response,
+    sessionId: str = Path(..., description="Chat session ObjectId string"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    order: Literal["asc", "desc"] = Query("asc", description="asc = oldest first"),
     dbm=Depends(get_mongo),
 ):
+    """
+    Conversation history (admin only), paged on (timestamp, _id) so each
+    page is one range scan of the (sessionId, timestamp, _id) index.
+    Archived sessions are read from their monthly collection.
+    """
     sid = _oid(sessionId)
-    sess = await dbm.chat_sessions.find_one({"_id": sid})
+    sess = await dbm.chat_sessions.find_one({"_id": sid}, projection={"archivedIn": 1})
     if not sess:
         raise HTTPException(status_code=404, detail="Session not found")
+
+    op, direction = ("$gt", 1) if order == "asc" else ("$lt", -1)
+    filt: dict = {"sessionId": sid}
+    if cursor:
+        ts, last_id = decode_cursor(cursor, 2)
+        if not isinstance(ts, datetime) or not ObjectId.is_valid(last_id):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        filt["$or"] = [
+            {"timestamp": {op: ts}},
+            {"timestamp": ts, "_id": {op: ObjectId(last_id)}},
+        ]
+
+    docs = await (
+        dbm[history_collection(sess)]
+        .find(filt, projection=_HISTORY_PROJECTION)
+        .sort([("timestamp", direction), ("_id", direction)])
+        .limit(limit + 1)
+        .to_list(length=limit + 1)
+    )
+    docs, next_cursor = page_rows(docs, limit, key=lambda d: (d["timestamp"], str(d["_id"])))
+    set_next_cursor(response, next_cursor)
+    items = [
+        {
+            "id": str(d["_id"]),
+            "role": d["role"],
+            "text": d["text"],
+            "intent": (d.get("nlu") or {}).get("intent"),
+            "timestamp": d["timestamp"],
+            "extra": d.get("extra"),
+        }
+        for d in docs
+    ]
+    return {"items": items, "nextCursor": next_cursor}
+
+
+def _sse(event: str, data: dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode()
+
+
+@router.post("/sessions/{sessionId}/messages/stream", dependencies=[Depends(chat_device)])
+async def add_message_stream(
+    sessionId: str = Path(..., description="Chat session ObjectId string"),
+    payload: AddMessageRequest = ...,
+    dbm=Depends(get_mongo),
+):
+    """
+    Same turn as POST .../messages, answered as Server-Sent Events (ack,
+    card..., reply, done): the fallback for kiosks that cannot hold a
+    WebSocket.
+    """
+    sid = _oid(sessionId)
+    timer = TurnTimer()
+    with timer.phase("nlu"):
+        intent = detect_intent(payload.text)
+    with timer.phase("session"):
+        sess, cached = await _load_session_for_turn(dbm, sid, intent)  # 404/409 before streaming
+
+    async def events() -> AsyncIterator[bytes]:
+        # Own session: yield-dependencies are closed before a streamed body is sent
+        async with AsyncSessionLocal() as dbp:
+            try:
+                async for event, data in _turn_events(
+                    dbm, dbp, sid, sess, cached, payload.role, payload.text, intent, timer
+                ):
+                    yield _sse(event, data)
+            except SessionEnded:
+                yield _sse("ended", {})
+        yield _sse("done", {"timing": timer.server_timing()})
+        timer.log(intent=intent, transport="sse")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # identity encoding keeps GZipMiddleware from buffering the events
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "Content-Encoding": "identity"},
+    )
+
+
+# WebSocket close codes (4000-4999 are application-defined)
+WS_UNAUTHORIZED = 4401
+WS_SESSION_NOT_FOUND = 4404
+WS_SESSION_ENDED = 4409
+
+
+@router.websocket("/sessions/{sessionId}/ws")
+async def chat_ws(websocket: WebSocket, sessionId: str, dbm=Depends(get_mongo)):
+    """
+    One connection per kiosk session. The session is loaded once and kept
+    for the life of the socket; each turn streams the same events as the
+    SSE endpoint, tagged with a turn number. A registered kiosk sends
+    X-Device-Code on the upgrade request (closed with 4401 if unknown);
+    each turn counts as a heartbeat.
+
+    Client -> server:
+      {"type": "message", "text": "...", "role": "user"}
+      {"type": "attach", "patientIdOrName": "..."}
+      {"type": "end"}
+    Server -> client:
+      {"type": "ack" | "card" | "reply", "turn": n, ...}
+      {"type": "attached"} | {"type": "ended"} | {"type": "error", "detail": "..."}
+      {"type": "error", "detail": "Too many messages", "retryAfter": s}  (chat_message rate limit)
+    A malformed frame (not JSON, missing text, ...) gets an error frame; the
+    socket stays open.
+    """
+    await websocket.accept()
+    try:
+        sid = ObjectId(sessionId)
+    except Exception:
+        await websocket.close(code=WS_SESSION_NOT_FOUND, reason="Invalid sessionId")
+        return
+
+    # Same device check as chat_device; the header is read by hand since the
+    # HTTP security dependencies do not run on WebSocket routes
+    device: Optional[DeviceInfo] = None
+    code = websocket.headers.get("x-device-code")
+    if code:
+        async with AsyncSessionLocal() as dbp:
+            device = await device_registry.authenticate(dbp, code)
+        if device is None:
+            await websocket.close(code=WS_UNAUTHORIZED, reason="Unknown or inactive device")
+            return
+    elif settings.DEVICE_AUTH_REQUIRED:
+        await websocket.close(code=WS_UNAUTHORIZED, reason="X-Device-Code required")
+        return
+
+    sess = await session_cache.get(sid)
+    if sess is None:
+        doc = await dbm.chat_sessions.find_one({"_id": sid}, projection={"status": 1, "patientRef": 1})
+        if not doc:
+            await websocket.close(code=WS_SESSION_NOT_FOUND, reason="Session not found")
+            return
+        sess = await session_cache.put(sid, doc)
     if sess.get("status") == "ended":
-        raise HTTPException(status_code=409, detail="Session already ended")
+        await websocket.close(code=WS_SESSION_ENDED, reason="Session already ended")
+        return
+
+    # Same bucket as POST .../messages; the HTTP middleware only sees the upgrade
+    limit_rule = rate_limiter.rule("chat_message") if settings.RATE_LIMIT_ENABLED else None
+    limit_key = client_key(websocket.headers, websocket.client, str(sid))
+
+    turn = 0
+    try:
+        while True:
+            try:
+                msg = await websocket.receive_json()
+            except (ValueError, KeyError):  # not JSON, or a binary frame
+                await websocket.send_json({"type": "error", "detail": "Expected a JSON text frame"})
+                continue
+            kind = msg.get("type") if isinstance(msg, dict) else None
+
+            if kind == "message":
+                text = msg.get("text")
+                if not isinstance(text, str) or not text.strip():
+                    await websocket.send_json({"type": "error", "detail": "text is required"})
+                    continue
+                if limit_rule is not None:
+                    wait = await rate_limiter.check(limit_rule, limit_key)
+                    if wait > 0:
+                        await websocket.send_json(
+                            {"type": "error", "detail": "Too many messages", "retryAfter": math.ceil(wait)}
+                        )
+                        continue
+                try:
+                    payload = AddMessageRequest(role=msg.get("role", "user"), text=text)
+                except ValidationError as e:
+                    await websocket.send_json({
+                        "type": "error",
+                        "detail": e.errors(include_url=False, include_context=False, include_input=False),
+                    })
+                    continue
+                if device is not None:
+                    device_registry.seen(device.id)
+                turn += 1
+                timer = TurnTimer()
+                with timer.phase("nlu"):
+                    intent = detect_intent(payload.text)
+                # Other channels write through the cache; otherwise keep what we loaded
+                sess = await session_cache.get(sid) or sess
+                async with AsyncSessionLocal() as dbp:
+                    try:
+                        async for event, data in _turn_events(
+                            dbm, dbp, sid, sess, True, payload.role, payload.text, intent, timer
+                        ):
+                            await websocket.send_json({"type": event, "turn": turn, **data})
+                    except SessionEnded:
+                        await websocket.send_json({"type": "ended"})
+                        await websocket.close(code=WS_SESSION_ENDED)
+                        return
+                timer.log(intent=intent, transport="ws")
+
+            elif kind == "attach":
+                token = str(msg.get("patientIdOrName") or "").strip()
+                if not token:
+                    await websocket.send_json({"type": "error", "detail": "patientIdOrName is required"})
+                    continue
+                doc = await _attach_patient(dbm, sid, token)
+                if not doc:
+                    await websocket.send_json({"type": "ended"})
+                    await websocket.close(code=WS_SESSION_ENDED)
+                    return
+                sess = doc
+                await websocket.send_json({"type": "attached"})
+
+            elif kind == "end":
+                await _end_session(dbm, sid)
+                await websocket.send_json({"type": "ended"})
+                await websocket.close()
+                return
 
-    await dbm.chat_sessions.update_one(
-        {"_id": sid},
+            else:
+                await websocket.send_json({"type": "error", "detail": "Unknown message type"})
+    except WebSocketDisconnect:
+        pass
+
+
+async def _attach_patient(dbm, sid: ObjectId, token: str) -> Optional[dict]:
+    """Set patientRef and write through; None if the session is missing or ended."""
+    sess = await dbm.chat_sessions.find_one_and_update(
+        {"_id": sid, "status": {"$ne": "ended"}},
         {
             "$set": {
                 "patientRef": {
-                    "token": patientIdOrName,
+                    "token": token,
                     "attachedAt": datetime.now(timezone.utc),
                 }
             }
         },
+        projection={"status": 1, "patientRef": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    if not sess:
+        await session_cache.invalidate(sid)
+        return None
+    return await session_cache.put(sid, sess)  # write-through
+
+
+async def _end_session(dbm, sid: ObjectId):
+    await session_cache.invalidate(sid)
+    return await dbm.chat_sessions.update_one(
+        {"_id": sid, "status": {"$ne": "ended"}},
+        {"$set": {"status": "ended", "endedAt": datetime.now(timezone.utc)}},
     )
+
+
+@router.patch("/sessions/{sessionId}/attach-patient", dependencies=[Depends(chat_device)])
+async def attach_patient(
+    sessionId: str,
+    patientIdOrName: str,
+    dbm=Depends(get_mongo),
+):
+    sid = _oid(sessionId)
+    if not await _attach_patient(dbm, sid, patientIdOrName):
+        if await dbm.chat_sessions.count_documents({"_id": sid}, limit=1):
+            raise HTTPException(status_code=409, detail="Session already ended")
+        raise HTTPException(status_code=404, detail="Session not found")
     return {"ok": True}
 
 
-@router.post("/sessions/{sessionId}/end")
+@router.post("/sessions/{sessionId}/end", dependencies=[Depends(chat_device)])
 async def end_session(sessionId: str, dbm=Depends(get_mongo)):
     sid = _oid(sessionId)
-    sess = await dbm.chat_sessions.find_one({"_id": sid})
-    if not sess:
+    res = await _end_session(dbm, sid)
+    if res.matched_count == 0 and not await dbm.chat_sessions.count_documents({"_id": sid}, limit=1):
         raise HTTPException(status_code=404, detail="Session not found")
-    if sess.get("status") == "ended":
-        return {"ok": True}  # idempotent
-
-    await dbm.chat_sessions.update_one(
-        {"_id": sid},
-        {"$set": {"status": "ended", "endedAt": datetime.now(timezone.utc)}},
-    )
-    return {"ok": True}
+    return {"ok": True}  # idempotent
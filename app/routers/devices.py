@@ -0,0 +1,31 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends
+
+from app.config import settings
+from app.schemas.device import DeviceSelf, HeartbeatRequest, HeartbeatResponse
+from app.security.deps import require_device
+from app.services.devices import DeviceInfo, device_registry
+
+router = APIRouter(prefix="/devices", tags=["devices"])
+
+
+@router.get("/me", response_model=DeviceSelf)
+async def whoami(device: DeviceInfo = Depends(require_device)):
+    # Kiosks call this at boot to check their code
+    return DeviceSelf(id=device.id, name=device.name, location=device.location)
+
+
+@router.post("/heartbeat", response_model=HeartbeatResponse)
+async def heartbeat(
+    payload: Optional[HeartbeatRequest] = None,
+    device: DeviceInfo = Depends(require_device),
+):
+    # In memory only; last_seen_at is written in batches (app/services/devices.py)
+    device_registry.record_heartbeat(device.id, payload.model_dump(exclude_none=True) if payload else None)
+    return HeartbeatResponse(
+        deviceId=device.id,
+        serverTime=datetime.now(timezone.utc),
+        nextHeartbeatSeconds=settings.DEVICE_HEARTBEAT_SECONDS,
+    )
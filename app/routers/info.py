@@ -1,14 +1,14 @@
 from uuid import UUID
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.pg import get_db
-from app.models.department import Department
-from app.models.doctor import Doctor
-from pydantic import BaseModel
+from app.db.pg import get_async_db
+from app.services import fast_json
+from app.services.directory_cache import Rendered, directory_cache, etag_matches, sort_key
+from app.services.pagination import CURSOR_DESCRIPTION, NEXT_CURSOR_HEADER, page_sorted_list
+from pydantic import BaseModel, TypeAdapter
 
 
 router = APIRouter(prefix="/info", tags=["info"])
@@ -29,59 +29,79 @@ class DoctorPublic(BaseModel):
     departmentId: UUID
 
 
+_departments_adapter = TypeAdapter(list[DepartmentPublic])
+_doctors_adapter = TypeAdapter(list[DoctorPublic])
+
+
+def _render(adapter: TypeAdapter, page: list[dict]) -> bytes:
+    # Snapshot rows are already in the response shape; the fast path skips validation
+    if fast_json.enabled():
+        return fast_json.dumps(page)
+    return adapter.dump_json(adapter.validate_python(page))
+
+
+def _cached_response(request: Request, rendered: Rendered) -> Response:
+    etag, body, next_cursor = rendered
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}  # revalidate on every poll
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @router.get("/departments", response_model=list[DepartmentPublic])
-def list_departments(
-    db: Session = Depends(get_db),
+async def list_departments(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     q: Optional[str] = Query(None, description="Search by department name"),
     limit: int = Query(100, ge=1, le=500),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
 ):
-    query = db.query(Department).filter(Department.is_active.is_(True))
-    if q:
-        query = query.filter(func.lower(Department.name).like(f"%{q.lower()}%"))
-    rows = (
-        query.order_by(Department.name)
-        .limit(limit)
-        .offset(offset)
-        .all()
-    )
-    return [
-        DepartmentPublic(
-            id=r.id, name=r.name, floor=r.floor, location=r.location_note
+    # Served from the in-memory directory snapshot; no DB round trip unless stale
+    snap = await directory_cache.snapshot(db)
+    needle = q.lower() if q else None
+
+    def build() -> tuple[bytes, Optional[str]]:
+        rows = snap.departments
+        if needle:
+            rows = [r for r in rows if needle in r["name"].lower()]
+        page, next_cursor = page_sorted_list(
+            rows, [sort_key(r) for r in rows], cursor=cursor, limit=limit, offset=offset
         )
-        for r in rows
-    ]
+        return _render(_departments_adapter, page), next_cursor
+
+    key = ("departments", needle, limit, offset, cursor)
+    return _cached_response(request, directory_cache.render(snap, key, build))
 
 
 @router.get("/doctors", response_model=list[DoctorPublic])
-def list_doctors(
-    db: Session = Depends(get_db),
+async def list_doctors(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     departmentId: Optional[UUID] = Query(None, description="Filter by department UUID"),
     q: Optional[str] = Query(None, description="Search by doctor name or specialty"),
     limit: int = Query(100, ge=1, le=500),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
 ):
-    query = db.query(Doctor).filter(Doctor.is_active.is_(True))
-    if departmentId:
-        query = query.filter(Doctor.department_id == departmentId)
-    if q:
-        like = f"%{q.lower()}%"
-        query = query.filter(
-            func.lower(Doctor.name).like(like) | func.lower(Doctor.specialty).like(like)
-        )
-    rows = (
-        query.order_by(Doctor.name)
-        .limit(limit)
-        .offset(offset)
-        .all()
-    )
-    return [
-        DoctorPublic(
-            id=r.id,
-            name=r.name,
-            specialty=r.specialty,
-            room=r.room,
-            departmentId=r.department_id,
+    snap = await directory_cache.snapshot(db)
+    needle = q.lower() if q else None
+
+    def build() -> tuple[bytes, Optional[str]]:
+        rows = snap.doctors
+        if departmentId:
+            rows = [r for r in rows if r["departmentId"] == departmentId]
+        if needle:
+            rows = [
+                r for r in rows
+                if needle in r["name"].lower() or needle in (r["specialty"] or "").lower()
+            ]
+        page, next_cursor = page_sorted_list(
+            rows, [sort_key(r) for r in rows], cursor=cursor, limit=limit, offset=offset
         )
-        for r in rows
-    ]
+        return _render(_doctors_adapter, page), next_cursor
+
+    key = ("doctors", departmentId, needle, limit, offset, cursor)
+    return _cached_response(request, directory_cache.render(snap, key, build))
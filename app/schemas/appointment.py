@@ -16,8 +16,9 @@ class AppointmentItem(BaseModel):
     status: str
 
     class Config:
-        orm_mode = True  # allows returning SQLAlchemy objects directly
+        from_attributes = True  # validates straight from labelled query rows
 
 
 class AppointmentCheckResponse(BaseModel):
     items: list[AppointmentItem]
+    nextCursor: Optional[str] = None  # pass back as ?cursor= for the next page
@@ -0,0 +1,31 @@
+from datetime import datetime
+from uuid import UUID
+from typing import Optional
+from pydantic import BaseModel
+
+
+class SlotOut(BaseModel):
+    start: datetime
+    end: datetime
+
+
+class DoctorAvailability(BaseModel):
+    doctorId: UUID
+    name: str
+    specialty: Optional[str] = None
+    room: Optional[str] = None
+    slots: list[SlotOut]
+
+
+class NextAvailable(BaseModel):
+    doctorId: UUID
+    name: str
+    specialty: Optional[str] = None
+    room: Optional[str] = None
+    start: datetime
+    end: datetime
+
+
+class DepartmentNextResponse(BaseModel):
+    departmentId: UUID
+    items: list[NextAvailable]  # earliest first; doctors with no free slot are left out
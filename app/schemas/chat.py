@@ -1,10 +1,26 @@
+from datetime import datetime
 from pydantic import BaseModel, Field
-from typing import Literal
+from typing import Any, Literal, Optional
 
 class StartSessionRequest(BaseModel):
-    deviceId: str = Field(..., min_length=3, max_length=120)
+    # Ignored when the kiosk authenticates with X-Device-Code
+    deviceId: Optional[str] = Field(None, min_length=3, max_length=120)
     channel: Literal["voice", "touch"] = "touch"
 
 class AddMessageRequest(BaseModel):
     role: Literal["user", "assistant", "system"]
     text: str = Field(..., min_length=1, max_length=2000)
+
+
+class ChatMessageOut(BaseModel):
+    id: str
+    role: str
+    text: str
+    intent: Optional[str] = None
+    timestamp: datetime
+    extra: Optional[dict[str, Any]] = None
+
+
+class MessageHistoryResponse(BaseModel):
+    items: list[ChatMessageOut]
+    nextCursor: Optional[str] = None  # pass back as ?cursor= for the next page
@@ -0,0 +1,43 @@
+from datetime import datetime
+from uuid import UUID
+from pydantic import BaseModel, Field
+from typing import Optional
+
+class DeviceCreate(BaseModel):
+    name: str = Field(..., min_length=2, max_length=120)
+    location: Optional[str] = Field(None, max_length=160)
+    is_active: bool = True
+
+class DeviceUpdate(BaseModel):
+    name: Optional[str] = Field(None, min_length=2, max_length=120)
+    location: Optional[str] = Field(None, max_length=160)
+    is_active: Optional[bool] = None
+
+class DeviceOut(BaseModel):
+    id: UUID
+    name: str
+    location: Optional[str] = None
+    is_active: bool
+    last_seen_at: Optional[datetime] = None
+    created_at: datetime
+    class Config:
+        from_attributes = True
+
+class DeviceRegistered(DeviceOut):
+    device_code: str  # shown once; the kiosk sends it as X-Device-Code
+
+
+class HeartbeatRequest(BaseModel):
+    appVersion: Optional[str] = Field(None, max_length=40)
+    uptimeSeconds: Optional[int] = Field(None, ge=0)
+    detail: Optional[str] = Field(None, max_length=200)  # e.g. "printer offline"
+
+class HeartbeatResponse(BaseModel):
+    deviceId: UUID
+    serverTime: datetime
+    nextHeartbeatSeconds: int
+
+class DeviceSelf(BaseModel):
+    id: UUID
+    name: str
+    location: Optional[str] = None
@@ -1,34 +1,95 @@
 from datetime import datetime, timedelta
+from typing import Optional
 from uuid import UUID
 from fastapi import HTTPException, Depends
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.security import APIKeyHeader, HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.db.pg import get_db
+from app.db.pg import get_async_db, get_db
 from app.models.admin import AdminUser
+from app.services.admin_cache import DELETED, AdminIdentity, admin_identity_cache
+from app.services.devices import DeviceInfo, device_registry
 
 bearer = HTTPBearer()
+device_code_header = APIKeyHeader(name="X-Device-Code", auto_error=False)
 
-def create_token(sub: str) -> str:
-    payload = {"sub": sub, "exp": datetime.utcnow() + timedelta(minutes=settings.JWT_EXPIRES_MIN)}
+def create_token(sub: str, **claims) -> str:
+    payload = {**claims, "sub": sub, "exp": datetime.utcnow() + timedelta(minutes=settings.JWT_EXPIRES_MIN)}
     return jwt.encode(payload, settings.JWT_SECRET, algorithm="HS256")
 
-def require_admin_token(token: HTTPAuthorizationCredentials = Depends(bearer)) -> str:
+def create_admin_token(admin: AdminUser) -> str:
+    # role/email/ver let get_current_admin answer without a DB read
+    return create_token(str(admin.id), role=admin.role, email=admin.email, ver=admin.token_version or 0)
+
+def require_admin_claims(token: HTTPAuthorizationCredentials = Depends(bearer)) -> dict:
     try:
         payload = jwt.decode(token.credentials, settings.JWT_SECRET, algorithms=["HS256"])
-        return payload["sub"]
-    except JWTError:
+        UUID(payload["sub"])
+        return payload
+    except (JWTError, KeyError, TypeError, ValueError):
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
-def get_current_admin(sub: str = Depends(require_admin_token), db: Session = Depends(get_db)) -> AdminUser:
-    admin = db.get(AdminUser, UUID(sub))
-    if not admin:
+def require_admin_token(claims: dict = Depends(require_admin_claims)) -> str:
+    return claims["sub"]
+
+def get_current_admin(claims: dict = Depends(require_admin_claims), db: Session = Depends(get_db)) -> AdminIdentity:
+    sub, ver = claims["sub"], claims.get("ver")
+    cached = admin_identity_cache.get(sub)
+    if cached is DELETED:
         raise HTTPException(status_code=401, detail="Invalid token")
-    return admin
+    if cached is not None:
+        if ver is None or ver == cached.token_version:
+            return cached
+        if ver < cached.token_version:
+            admin_identity_cache.revoked += 1
+            raise HTTPException(status_code=401, detail="Token revoked")
+        # ver is newer than this worker's entry: another worker changed the admin
+    elif settings.ADMIN_TOKEN_TRUST_CLAIMS:
+        identity = AdminIdentity.from_claims(claims)
+        if identity is not None:
+            admin_identity_cache.from_claims += 1
+            admin_identity_cache.put(identity)
+            return identity
+
+    row = db.get(AdminUser, UUID(sub))
+    if not row:
+        admin_identity_cache.forget(sub)
+        raise HTTPException(status_code=401, detail="Invalid token")
+    identity = AdminIdentity.from_row(row)
+    admin_identity_cache.put(identity)
+    if ver is not None and ver != identity.token_version:
+        admin_identity_cache.revoked += 1
+        raise HTTPException(status_code=401, detail="Token revoked")
+    return identity
 
-def require_superadmin(admin: AdminUser = Depends(get_current_admin)) -> AdminUser:
+def require_superadmin(admin: AdminIdentity = Depends(get_current_admin)) -> AdminIdentity:
     if admin.role != "SUPERADMIN":
         raise HTTPException(status_code=403, detail="SUPERADMIN required")
     return admin
+
+async def optional_device(
+    code: Optional[str] = Depends(device_code_header),
+    db: AsyncSession = Depends(get_async_db),
+) -> Optional[DeviceInfo]:
+    """The calling kiosk if it sent X-Device-Code (401 if the code is unknown); counts as a heartbeat."""
+    if not code:
+        return None
+    device = await device_registry.authenticate(db, code)
+    if device is None:
+        raise HTTPException(status_code=401, detail="Unknown or inactive device")
+    device_registry.seen(device.id)
+    return device
+
+async def require_device(device: Optional[DeviceInfo] = Depends(optional_device)) -> DeviceInfo:
+    if device is None:
+        raise HTTPException(status_code=401, detail="X-Device-Code required")
+    return device
+
+async def chat_device(device: Optional[DeviceInfo] = Depends(optional_device)) -> Optional[DeviceInfo]:
+    """optional_device for the kiosk chat routes; required while DEVICE_AUTH_REQUIRED is on."""
+    if device is None and settings.DEVICE_AUTH_REQUIRED:
+        raise HTTPException(status_code=401, detail="X-Device-Code required")
+    return device
@@ -0,0 +1,85 @@
+"""
+Cache of admin identities (id, email, role, token version), keyed by `sub`.
+
+get_current_admin reads it before touching admin_users, so an admin session
+costs one DB read per ADMIN_IDENTITY_CACHE_TTL_SECONDS instead of one per
+request. The auth router writes through on login and role changes, and
+leaves a tombstone on delete.
+
+Tokens carry `role`, `email` and `ver` claims. `ver` is the admin's
+token_version, bumped when the role changes, so a token minted before the
+change no longer matches and is rejected. With ADMIN_TOKEN_TRUST_CLAIMS a
+cold cache is filled from the claims instead of the DB; revocations then
+reach other workers only when the old tokens expire.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Union
+from uuid import UUID
+
+from app.config import settings
+from app.models.admin import AdminUser
+from app.services.cache import TTLCache
+
+
+@dataclass(frozen=True)
+class AdminIdentity:
+    id: UUID
+    email: str
+    role: str
+    token_version: int
+
+    @classmethod
+    def from_row(cls, row: AdminUser) -> "AdminIdentity":
+        return cls(id=row.id, email=row.email, role=row.role, token_version=row.token_version or 0)
+
+    @classmethod
+    def from_claims(cls, claims: Dict[str, Any]) -> Optional["AdminIdentity"]:
+        try:
+            return cls(
+                id=UUID(claims["sub"]),
+                email=claims["email"],
+                role=claims["role"],
+                token_version=int(claims["ver"]),
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+
+class _Deleted:
+    """Tombstone: the admin was deleted on this worker."""
+
+
+DELETED = _Deleted()
+
+
+class AdminIdentityCache:
+    def __init__(self, maxsize: int, ttl: float, pinned_ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        # Entries written by role changes/deletes must outlive every token they revoke
+        self.pinned_ttl = pinned_ttl
+        self.from_claims = 0
+        self.revoked = 0
+
+    def get(self, sub: str) -> Union[AdminIdentity, _Deleted, None]:
+        return self._cache.get(sub)
+
+    def put(self, identity: AdminIdentity, pin: bool = False) -> None:
+        self._cache.set(str(identity.id), identity, ttl=self.pinned_ttl if pin else None)
+
+    def forget(self, admin_id: Union[UUID, str]) -> None:
+        self._cache.set(str(admin_id), DELETED, ttl=self.pinned_ttl)
+
+    def invalidate(self, admin_id: Union[UUID, str]) -> None:
+        self._cache.pop(str(admin_id))
+
+    def stats(self) -> dict:
+        return {**self._cache.stats(), "from_claims": self.from_claims, "revoked": self.revoked}
+
+
+admin_identity_cache = AdminIdentityCache(
+    maxsize=settings.ADMIN_IDENTITY_CACHE_MAX_ENTRIES,
+    ttl=settings.ADMIN_IDENTITY_CACHE_TTL_SECONDS,
+    pinned_ttl=settings.JWT_EXPIRES_MIN * 60,
+)
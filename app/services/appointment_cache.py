@@ -0,0 +1,86 @@
+"""
+Short-lived cache of chat appointment lookups.
+
+A chat session asks "check my appointment" with the same patientRef.token
+turn after turn; each miss costs the patient search (UUID / MRN / trigram
+name scan) plus the joined appointments query. Results are cached per
+(normalized token, upcoming_only, limit) for APPOINTMENT_CACHE_TTL_SECONDS,
+together with the patient ids the token resolved to.
+
+Appointment (and patient) writes call invalidate(). A generation counter
+keeps a lookup that raced with a write from caching its stale result; the
+TTL bounds staleness for writes made by other workers or scripts.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from app.config import settings
+from app.services.cache import TTLCache
+from app.services.patient_search import try_parse_uuid
+
+
+def normalize_token(token: str) -> str:
+    """Canonical UUIDs; otherwise trimmed with single spaces (MRNs are case-sensitive)."""
+    token = " ".join((token or "").split())
+    as_uuid = try_parse_uuid(token)
+    return str(as_uuid) if as_uuid else token
+
+
+@dataclass(frozen=True)
+class AppointmentLookup:
+    patient_ids: Tuple[UUID, ...]
+    items: Tuple[dict, ...]  # card dicts; treat as read-only
+    upcoming_only: bool
+
+    def current_items(self) -> List[dict]:
+        """Items, minus upcoming ones that have started since the lookup."""
+        if not self.upcoming_only:
+            return list(self.items)
+        now = datetime.now(timezone.utc)
+        return [it for it in self.items if it["start_time"] >= now]
+
+
+class AppointmentLookupCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.generation = 0
+        self.invalidations = 0
+
+    def get(self, token: str, upcoming_only: bool, limit: int) -> Optional[AppointmentLookup]:
+        return self._cache.get((normalize_token(token), upcoming_only, limit))
+
+    def put(
+        self,
+        token: str,
+        upcoming_only: bool,
+        limit: int,
+        patient_ids: Sequence[UUID],
+        items: Sequence[dict],
+        generation: int,
+    ) -> None:
+        """Cache a lookup started at `generation`; dropped if a write invalidated since."""
+        if generation != self.generation:
+            return
+        self._cache.set(
+            (normalize_token(token), upcoming_only, limit),
+            AppointmentLookup(tuple(patient_ids), tuple(items), upcoming_only),
+        )
+
+    def invalidate(self) -> None:
+        """Drop every entry. Safe to call from sync routes and scripts."""
+        self.generation += 1
+        self.invalidations += 1
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, object]:
+        return {**self._cache.stats(), "invalidations": self.invalidations}
+
+
+appointment_lookup_cache = AppointmentLookupCache(
+    maxsize=settings.APPOINTMENT_CACHE_MAX_ENTRIES,
+    ttl=settings.APPOINTMENT_CACHE_TTL_SECONDS,
+)
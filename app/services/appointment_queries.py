@@ -0,0 +1,78 @@
+"""
+Column projections for the appointment read paths.
+
+The kiosk endpoints only need a handful of columns from appointments,
+doctors and patients, so they select exactly those, labelled like the
+response fields, and never load ORM entities. Relationships on the models
+are lazy="raise_on_sql": a query that really needs related objects asks for
+them with joinedload()/selectinload() instead of every Appointment pulling
+patients, doctors and departments through LEFT OUTER JOINs.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Sequence
+from uuid import UUID
+
+from sqlalchemy import Select, select
+
+from app.models.appointment import Appointment
+from app.models.doctor import Doctor
+from app.models.patient import Patient
+
+# Labels match AppointmentItem, so rows validate straight into it (from_attributes)
+ITEM_COLUMNS = (
+    Appointment.id.label("id"),
+    Doctor.name.label("doctorName"),
+    Appointment.start_time.label("start_time"),
+    Appointment.end_time.label("end_time"),
+    Appointment.status.label("status"),
+)
+
+# The chat card additionally shows the patient and links the department
+CARD_COLUMNS = ITEM_COLUMNS + (
+    Patient.full_name.label("patientName"),
+    Doctor.department_id.label("departmentId"),
+)
+
+
+def item_select() -> Select:
+    """Appointment + doctor name, one inner join; rows fit AppointmentItem."""
+    return (
+        select(*ITEM_COLUMNS)
+        .select_from(Appointment)
+        .join(Doctor, Doctor.id == Appointment.doctor_id)
+    )
+
+
+def card_select() -> Select:
+    return (
+        select(*CARD_COLUMNS)
+        .select_from(Appointment)
+        .join(Patient, Patient.id == Appointment.patient_id)
+        .join(Doctor, Doctor.id == Appointment.doctor_id)
+    )
+
+
+def for_patients(stmt: Select, patient_ids: Sequence[UUID], upcoming_only: bool) -> Select:
+    stmt = stmt.where(Appointment.patient_id.in_(patient_ids))
+    if upcoming_only:
+        stmt = stmt.where(Appointment.start_time >= datetime.now(timezone.utc))
+    return stmt
+
+
+def card_dict(row: Any) -> Dict[str, Any]:
+    """Chat card item (ids as strings) from a card_select() row."""
+    return {
+        "appointmentId": str(row.id),
+        "patientName": row.patientName,
+        "doctorName": row.doctorName,
+        "departmentId": str(row.departmentId),
+        "start_time": row.start_time,
+        "end_time": row.end_time,
+        "status": row.status,
+    }
+
+
+def card_dicts(rows: Sequence[Any]) -> List[Dict[str, Any]]:
+    return [card_dict(r) for r in rows]
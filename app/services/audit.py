@@ -1,6 +1,151 @@
+"""
+Audit log writes.
+
+log_action() queues the row for AuditWriter, a background task that drains
+the queue with one multi-row INSERT every AUDIT_FLUSH_INTERVAL_MS or
+AUDIT_BATCH_SIZE rows, so an audited admin write pays no extra commit.
+Queued rows are flushed on shutdown.
+
+durable=True (or AUDIT_MODE=sync) keeps the old behaviour: the row is added
+to the caller's session and committed with it, for actions whose audit
+record must exist before the response is sent. The same path is used when
+the queue is full or no writer is running (scripts, CLI).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, List, Optional
+
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.pg import AsyncSessionLocal
 from app.models.audit_log import AuditLog
 
-def log_action(db: Session, actor_type: str, action: str, actor_id=None, meta_json: str | None = None):
-    db.add(AuditLog(actor_type=actor_type, actor_id=actor_id, action=action, meta_json=meta_json))
-    db.commit()
+logger = logging.getLogger(__name__)
+
+
+class AuditWriter:
+    def __init__(self, max_queue: int, batch_size: int, flush_interval: float):
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buf: Deque[dict] = deque()
+        self._lock = threading.Lock()  # log_action runs on threadpool workers
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.overflowed = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None
+
+    def submit(self, row: dict) -> bool:
+        """Queue a row; False if the writer is not running or the queue is full."""
+        if self._loop is None:
+            return False
+        with self._lock:
+            if len(self._buf) >= self.max_queue:
+                self.overflowed += 1
+                return False
+            self._buf.append(row)
+            self.enqueued += 1
+            full = len(self._buf) >= self.batch_size
+        if full:
+            self._loop.call_soon_threadsafe(self._wake.set)
+        return True
+
+    def _take(self) -> List[dict]:
+        with self._lock:
+            n = min(self.batch_size, len(self._buf))
+            return [self._buf.popleft() for _ in range(n)]
+
+    def _requeue(self, batch: List[dict]) -> None:
+        with self._lock:
+            self._buf.extendleft(reversed(batch))
+
+    async def _write(self, batch: List[dict]) -> None:
+        try:
+            async with AsyncSessionLocal() as db:
+                # executemany -> multi-row INSERT ... VALUES (insertmanyvalues)
+                await db.execute(insert(AuditLog), batch)
+                await db.commit()
+        except asyncio.CancelledError:
+            self._requeue(batch)  # picked up by the shutdown flush
+            raise
+        except Exception:
+            self.failed += len(batch)
+            logger.exception("Dropped %d audit rows", len(batch))
+            return
+        self.written += len(batch)
+        self.batches += 1
+
+    async def flush(self) -> None:
+        while True:
+            batch = self._take()
+            if not batch:
+                return
+            await self._write(batch)
+
+    async def run_forever(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                await self.flush()
+        finally:
+            self._loop = None  # later log_action calls write synchronously
+
+    def stats(self) -> dict:
+        return {
+            "mode": settings.AUDIT_MODE,
+            "queued": len(self._buf),
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "overflowed": self.overflowed,
+            "failed": self.failed,
+        }
+
+
+audit_writer = AuditWriter(
+    max_queue=settings.AUDIT_MAX_QUEUE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_MS / 1000,
+)
+
+
+def log_action(
+    db: Session,
+    actor_type: str,
+    action: str,
+    actor_id=None,
+    meta_json: str | None = None,
+    durable: bool = False,
+):
+    row = {
+        "id": uuid.uuid4(),
+        "actor_type": actor_type,
+        "actor_id": actor_id,
+        "action": action,
+        "meta_json": meta_json,
+        "created_at": datetime.now(timezone.utc),  # time of the action, not of the flush
+    }
+    if durable or settings.AUDIT_MODE == "sync" or not audit_writer.submit(row):
+        db.add(AuditLog(**row))
+        db.commit()
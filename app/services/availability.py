@@ -0,0 +1,259 @@
+"""
+Free appointment slots per doctor and per department.
+
+A doctor's bookings (non-cancelled appointments) are read with one range scan
+on ix_appt_doctor_start_time, merged into sorted, non-overlapping busy
+intervals and cached per doctor for a horizon (AVAILABILITY_HORIZON_DAYS
+ahead). Free slots are the gaps between busy intervals inside clinic hours,
+found by bisecting the merged list, so a department-wide "next available"
+is one in-memory walk per doctor plus at most one batched query for the
+doctors that were not cached.
+
+Appointment writes call availability_cache.invalidate(doctor_id), or
+invalidate() after a bulk import; the TTL bounds staleness for workers that
+did not see the write. Opening hours come from the CLINIC_* settings, since
+doctors have no schedule table (schedule_note is free text).
+"""
+from __future__ import annotations
+
+import asyncio
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from time import monotonic
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.appointment import Appointment, AppointmentStatus
+from app.services.cache import TTLCache
+
+Interval = Tuple[datetime, datetime]
+
+# Bookings starting this long before a window are still read, in case they run into it
+_MAX_APPOINTMENT = timedelta(hours=12)
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """Sort and merge overlapping or touching intervals."""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+@dataclass(frozen=True)
+class BusyIntervals:
+    """A doctor's merged bookings over the loaded range [start, end)."""
+
+    start: datetime
+    end: datetime
+    starts: Tuple[datetime, ...]
+    ends: Tuple[datetime, ...]  # sorted as well, since the intervals do not overlap
+
+    @classmethod
+    def build(cls, start: datetime, end: datetime, intervals: Iterable[Interval]) -> "BusyIntervals":
+        merged = merge_intervals(intervals)
+        return cls(start, end, tuple(s for s, _ in merged), tuple(e for _, e in merged))
+
+    def covers(self, start: datetime, end: datetime) -> bool:
+        return self.start <= start and end <= self.end
+
+    def gaps(self, start: datetime, end: datetime) -> Iterator[Interval]:
+        """Free sub-ranges of [start, end), in order."""
+        i = bisect_right(self.ends, start)  # first booking still running after start
+        cursor = start
+        while i < len(self.starts) and self.starts[i] < end:
+            if self.starts[i] > cursor:
+                yield cursor, self.starts[i]
+            if self.ends[i] > cursor:
+                cursor = self.ends[i]
+            i += 1
+        if cursor < end:
+            yield cursor, end
+
+
+def _parse_time(value: str) -> time:
+    hours, _, minutes = value.partition(":")
+    return time(int(hours), int(minutes or 0))
+
+
+@dataclass(frozen=True)
+class ClinicHours:
+    tz: ZoneInfo
+    day_start: time
+    day_end: time
+    workdays: frozenset
+
+    @classmethod
+    def from_settings(cls) -> "ClinicHours":
+        return cls(
+            tz=ZoneInfo(settings.CLINIC_TIMEZONE),
+            day_start=_parse_time(settings.CLINIC_DAY_START),
+            day_end=_parse_time(settings.CLINIC_DAY_END),
+            workdays=frozenset(int(d) for d in settings.CLINIC_WORKDAYS.split(",") if d.strip()),
+        )
+
+    def day_bounds(self, first: date, last: date) -> Interval:
+        """[first 00:00, last + 1 day 00:00) in clinic time, as UTC."""
+        return (
+            datetime.combine(first, time.min, tzinfo=self.tz).astimezone(timezone.utc),
+            datetime.combine(last + timedelta(days=1), time.min, tzinfo=self.tz).astimezone(timezone.utc),
+        )
+
+    def windows(self, start: datetime, end: datetime) -> Iterator[Tuple[datetime, datetime, datetime]]:
+        """(opening time, window start, window end) of each open period within [start, end), in UTC."""
+        day = start.astimezone(self.tz).date()
+        last = end.astimezone(self.tz).date()
+        while day <= last:
+            if day.weekday() in self.workdays:
+                opens = datetime.combine(day, self.day_start, tzinfo=self.tz).astimezone(timezone.utc)
+                closes = datetime.combine(day, self.day_end, tzinfo=self.tz).astimezone(timezone.utc)
+                ws, we = max(opens, start), min(closes, end)
+                if ws < we:
+                    yield opens, ws, we
+            day += timedelta(days=1)
+
+
+def _slots_in(gap_start: datetime, gap_end: datetime, anchor: datetime,
+              duration: timedelta, step: timedelta) -> Iterator[Interval]:
+    # Slots sit on the step grid counted from opening time (09:00, 09:15, ...)
+    offset = (gap_start - anchor) % step
+    s = gap_start + (step - offset) if offset else gap_start
+    while s + duration <= gap_end:
+        yield s, s + duration
+        s += step
+
+
+def free_slots(
+    busy: BusyIntervals,
+    hours: ClinicHours,
+    start: datetime,
+    end: datetime,
+    duration: timedelta,
+    step: timedelta,
+    limit: int,
+) -> List[Interval]:
+    """Up to `limit` free slots of `duration` within [start, end), earliest first."""
+    out: List[Interval] = []
+    for anchor, ws, we in hours.windows(start, end):
+        for gs, ge in busy.gaps(ws, we):
+            for slot in _slots_in(gs, ge, anchor, duration, step):
+                out.append(slot)
+                if len(out) >= limit:
+                    return out
+    return out
+
+
+def _busy_stmt(doctor_ids: Sequence[UUID], start: datetime, end: datetime):
+    return select(Appointment.doctor_id, Appointment.start_time, Appointment.end_time).where(
+        Appointment.doctor_id.in_(doctor_ids),
+        Appointment.start_time >= start - _MAX_APPOINTMENT,
+        Appointment.start_time < end,
+        Appointment.status != AppointmentStatus.CANCELLED,
+    )
+
+
+class AvailabilityCache:
+    def __init__(self, maxsize: int, ttl: float, horizon_days: int):
+        self._busy = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.horizon = timedelta(days=horizon_days)
+        # Loads reach this far past the horizon: an entry lives at most `ttl`,
+        # so "now + horizon" stays covered for every query made while it is cached
+        self._margin = timedelta(seconds=ttl)
+        self._generation = 0
+        self._lock: Optional[asyncio.Lock] = None
+        self.loads = 0
+        self.doctors_loaded = 0
+        self.rows_loaded = 0
+        self.load_seconds = 0.0
+
+    def invalidate(self, doctor_id: Optional[UUID] = None) -> None:
+        """Drop one doctor's intervals, or all of them. Safe from sync routes and scripts."""
+        self._generation += 1
+        if doctor_id is None:
+            self._busy.clear()
+        else:
+            self._busy.pop(doctor_id)
+
+    def _cached(self, doctor_ids: Iterable[UUID], start: datetime, end: datetime,
+                out: Dict[UUID, BusyIntervals]) -> List[UUID]:
+        missing = []
+        for doctor_id in doctor_ids:
+            busy = self._busy.get(doctor_id)
+            if busy is not None and busy.covers(start, end):
+                out[doctor_id] = busy
+            else:
+                missing.append(doctor_id)
+        return missing
+
+    async def busy_for(
+        self, db: AsyncSession, doctor_ids: Sequence[UUID], start: datetime, end: datetime
+    ) -> Dict[UUID, BusyIntervals]:
+        """Merged bookings covering [start, end) for each doctor; one query for all cache misses."""
+        out: Dict[UUID, BusyIntervals] = {}
+        missing = self._cached(doctor_ids, start, end, out)
+        if not missing:
+            return out
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            # Another request may have loaded some of them meanwhile
+            missing = self._cached(missing, start, end, out)
+            if missing:
+                out.update(await self._load(db, missing, start, end))
+        return out
+
+    async def _load(
+        self, db: AsyncSession, doctor_ids: List[UUID], start: datetime, end: datetime
+    ) -> Dict[UUID, BusyIntervals]:
+        # Load the whole horizon (plus the TTL) so later "from now" queries hit the cache
+        now = datetime.now(timezone.utc)
+        lo, hi = min(start, now), max(end, now + self.horizon + self._margin)
+        generation = self._generation
+        t0 = monotonic()
+
+        default = timedelta(minutes=settings.APPOINTMENT_DEFAULT_MINUTES)
+        booked: Dict[UUID, List[Interval]] = {d: [] for d in doctor_ids}
+        rows = 0
+        for doctor_id, s, e in (await db.execute(_busy_stmt(doctor_ids, lo, hi))).all():
+            e = e or s + default
+            if e > lo:
+                booked[doctor_id].append((s, e))
+            rows += 1
+
+        loaded = {d: BusyIntervals.build(lo, hi, intervals) for d, intervals in booked.items()}
+        # Skip caching if a write was invalidated while the query ran; still answer with it
+        if generation == self._generation:
+            for doctor_id, busy in loaded.items():
+                self._busy.set(doctor_id, busy)
+        self.loads += 1
+        self.doctors_loaded += len(doctor_ids)
+        self.rows_loaded += rows
+        self.load_seconds += monotonic() - t0
+        return loaded
+
+    def stats(self) -> dict:
+        return {
+            **self._busy.stats(),
+            "horizon_days": self.horizon.days,
+            "loads": self.loads,
+            "doctors_loaded": self.doctors_loaded,
+            "rows_loaded": self.rows_loaded,
+            "load_seconds": round(self.load_seconds, 3),
+        }
+
+
+availability_cache = AvailabilityCache(
+    maxsize=settings.AVAILABILITY_CACHE_MAX_DOCTORS,
+    ttl=settings.AVAILABILITY_CACHE_TTL_SECONDS,
+    horizon_days=settings.AVAILABILITY_HORIZON_DAYS,
+)
@@ -0,0 +1,298 @@
+"""
+Bulk import of patients and appointments from HIS extracts.
+
+Input (CSV with a header row, or NDJSON) is read as a stream and validated
+in chunks of `chunk_size` rows. Each valid chunk is COPYed into a temporary
+staging table and merged with one INSERT ... SELECT ... ON CONFLICT DO
+UPDATE, then committed, so memory stays flat and progress survives a
+failure in a later chunk. Re-importing the same extract is idempotent:
+rows whose values did not change are not rewritten.
+
+Columns
+  patients:     external_patient_id*, full_name*, dob (YYYY-MM-DD), phone, note
+  appointments: external_appointment_id*, external_patient_id*, doctor_id* (UUID),
+                start_time* (ISO 8601 with offset), end_time, status
+(* required). Rejected rows are counted and the first few are reported
+with their line number and reason; rows referencing an unknown patient or
+doctor are rejected at merge time.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import Connection, text
+
+from app.models.appointment import AppointmentStatus
+
+FORMATS = ("csv", "ndjson")
+MAX_REJECT_SAMPLES = 100
+
+
+@dataclass
+class ImportReport:
+    entity: str
+    read: int = 0
+    rejected: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    chunks: int = 0
+    rejects: List[Dict] = field(default_factory=list)
+
+    def reject(self, line: int, reason: str) -> None:
+        self.rejected += 1
+        if len(self.rejects) < MAX_REJECT_SAMPLES:
+            self.rejects.append({"line": line, "error": reason})
+
+    def as_dict(self) -> dict:
+        return {
+            "entity": self.entity,
+            "read": self.read,
+            "rejected": self.rejected,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "chunks": self.chunks,
+            "rejects": self.rejects,
+        }
+
+
+# --- reading ---
+def iter_records(stream: Iterable[str], fmt: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Yield (line number, record or None, parse error or None)."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for rec in reader:
+            yield reader.line_num, rec, None
+    elif fmt == "ndjson":
+        for n, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                rec = json.loads(line)
+            except ValueError as e:
+                yield n, None, f"invalid JSON: {e}"
+                continue
+            if not isinstance(rec, dict):
+                yield n, None, "expected a JSON object"
+                continue
+            yield n, rec, None
+    else:
+        raise ValueError(f"unknown format {fmt!r}; expected one of {FORMATS}")
+
+
+def _str(rec: dict, key: str, max_len: int, required: bool = False) -> Optional[str]:
+    v = rec.get(key)
+    v = None if v is None else str(v).strip()
+    if not v:
+        if required:
+            raise ValueError(f"{key} is required")
+        return None
+    if len(v) > max_len:
+        raise ValueError(f"{key} longer than {max_len}")
+    return v
+
+
+def _ts(rec: dict, key: str, required: bool = False) -> Optional[datetime]:
+    v = _str(rec, key, 64, required)
+    if v is None:
+        return None
+    dt = datetime.fromisoformat(v.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        raise ValueError(f"{key} needs a UTC offset")
+    return dt
+
+
+# --- entity specs: validation + staging + merge ---
+@dataclass(frozen=True)
+class _Spec:
+    staging_ddl: str
+    columns: Sequence[str]
+    validate: Callable[[dict], tuple]
+    merge_sql: str
+    orphans_sql: Optional[str] = None  # staged rows the merge would drop, with a reason
+
+
+def _validate_patient(rec: dict) -> tuple:
+    dob = _str(rec, "dob", 10)
+    return (
+        _str(rec, "external_patient_id", 120, required=True),
+        _str(rec, "full_name", 160, required=True),
+        date.fromisoformat(dob) if dob else None,
+        _str(rec, "phone", 32),
+        _str(rec, "note", 500),
+    )
+
+
+_STATUSES = {s.value for s in AppointmentStatus}
+
+
+def _validate_appointment(rec: dict) -> tuple:
+    start = _ts(rec, "start_time", required=True)
+    end = _ts(rec, "end_time")
+    if end is not None and end < start:
+        raise ValueError("end_time before start_time")
+    status = (_str(rec, "status", 16) or AppointmentStatus.PENDING.value).upper()
+    if status not in _STATUSES:
+        raise ValueError(f"unknown status {status!r}")
+    return (
+        _str(rec, "external_appointment_id", 120, required=True),
+        _str(rec, "external_patient_id", 120, required=True),
+        UUID(_str(rec, "doctor_id", 36, required=True)),
+        start,
+        end,
+        status,
+    )
+
+
+SPECS: Dict[str, _Spec] = {
+    "patients": _Spec(
+        staging_ddl="""
+            CREATE TEMP TABLE IF NOT EXISTS stg_patients (
+                line bigint, external_patient_id text, full_name text,
+                dob date, phone text, note text
+            ) ON COMMIT DELETE ROWS
+        """,
+        columns=("line", "external_patient_id", "full_name", "dob", "phone", "note"),
+        validate=_validate_patient,
+        # DISTINCT ON: a key repeated within the chunk keeps its last line
+        merge_sql="""
+            INSERT INTO patients (id, external_patient_id, full_name, dob, phone, note)
+            SELECT DISTINCT ON (external_patient_id)
+                   gen_random_uuid(), external_patient_id, full_name, dob, phone, note
+            FROM stg_patients
+            ORDER BY external_patient_id, line DESC
+            ON CONFLICT (external_patient_id) DO UPDATE
+               SET full_name = EXCLUDED.full_name, dob = EXCLUDED.dob,
+                   phone = EXCLUDED.phone, note = EXCLUDED.note
+             WHERE (patients.full_name, patients.dob, patients.phone, patients.note)
+                   IS DISTINCT FROM
+                   (EXCLUDED.full_name, EXCLUDED.dob, EXCLUDED.phone, EXCLUDED.note)
+            RETURNING (xmax = 0) AS inserted
+        """,
+    ),
+    "appointments": _Spec(
+        staging_ddl="""
+            CREATE TEMP TABLE IF NOT EXISTS stg_appointments (
+                line bigint, external_appointment_id text, external_patient_id text,
+                doctor_id uuid, start_time timestamptz, end_time timestamptz, status text
+            ) ON COMMIT DELETE ROWS
+        """,
+        columns=(
+            "line", "external_appointment_id", "external_patient_id",
+            "doctor_id", "start_time", "end_time", "status",
+        ),
+        validate=_validate_appointment,
+        merge_sql="""
+            INSERT INTO appointments
+                   (id, external_appointment_id, patient_id, doctor_id, start_time, end_time, status)
+            SELECT DISTINCT ON (s.external_appointment_id)
+                   gen_random_uuid(), s.external_appointment_id, p.id, d.id,
+                   s.start_time, s.end_time, s.status::appointment_status
+            FROM stg_appointments s
+            JOIN patients p ON p.external_patient_id = s.external_patient_id
+            JOIN doctors d ON d.id = s.doctor_id
+            ORDER BY s.external_appointment_id, s.line DESC
+            ON CONFLICT (external_appointment_id) DO UPDATE
+               SET patient_id = EXCLUDED.patient_id, doctor_id = EXCLUDED.doctor_id,
+                   start_time = EXCLUDED.start_time, end_time = EXCLUDED.end_time,
+                   status = EXCLUDED.status
+             WHERE (appointments.patient_id, appointments.doctor_id, appointments.start_time,
+                    appointments.end_time, appointments.status)
+                   IS DISTINCT FROM
+                   (EXCLUDED.patient_id, EXCLUDED.doctor_id, EXCLUDED.start_time,
+                    EXCLUDED.end_time, EXCLUDED.status)
+            RETURNING (xmax = 0) AS inserted
+        """,
+        orphans_sql="""
+            SELECT s.line, s.external_appointment_id,
+                   CASE WHEN p.id IS NULL THEN 'unknown external_patient_id'
+                        ELSE 'unknown doctor_id' END
+            FROM stg_appointments s
+            LEFT JOIN patients p ON p.external_patient_id = s.external_patient_id
+            LEFT JOIN doctors d ON d.id = s.doctor_id
+            WHERE p.id IS NULL OR d.id IS NULL
+            ORDER BY s.line
+        """,
+    ),
+}
+
+
+def _load_chunk(conn: Connection, spec: _Spec, table: str, rows: List[tuple], report: ImportReport) -> None:
+    with conn.connection.cursor() as cur:  # psycopg cursor, same transaction
+        with cur.copy(f"COPY {table} ({', '.join(spec.columns)}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row(row)
+    orphan_keys = set()
+    if spec.orphans_sql:
+        for line, key, reason in conn.execute(text(spec.orphans_sql)):
+            report.reject(line, reason)
+            orphan_keys.add(key)
+    merged = conn.execute(text(spec.merge_sql)).scalars().all()
+    inserted = sum(1 for m in merged if m)
+    report.inserted += inserted
+    report.updated += len(merged) - inserted
+    # Keys that reached the merge but were already up to date
+    staged_keys = {row[1] for row in rows} - orphan_keys
+    report.unchanged += max(len(staged_keys) - len(merged), 0)
+    conn.commit()  # ON COMMIT DELETE ROWS empties the staging table
+    report.chunks += 1
+
+
+def run_import(
+    conn: Connection,
+    stream: Iterable[str],
+    entity: str,
+    fmt: str,
+    chunk_size: int = 10_000,
+    on_progress: Optional[Callable[[ImportReport], None]] = None,
+) -> ImportReport:
+    """
+    Import `stream` (text lines) into `entity`; commits once per chunk.
+    Takes a Connection, not a Session: the temp staging table lives on one
+    connection, and a Session may hand back a different one after commit.
+    """
+    spec = SPECS.get(entity)
+    if spec is None:
+        raise ValueError(f"unknown entity {entity!r}; expected one of {tuple(SPECS)}")
+    table = f"stg_{entity}"
+    report = ImportReport(entity=entity)
+    conn.execute(text(spec.staging_ddl))
+
+    chunk: List[tuple] = []
+    for line, rec, error in iter_records(stream, fmt):
+        report.read += 1
+        if error is None:
+            try:
+                chunk.append((line, *spec.validate(rec)))
+            except (ValueError, TypeError) as e:
+                error = str(e)
+        if error is not None:
+            report.reject(line, error)
+        if len(chunk) >= chunk_size:
+            _load_chunk(conn, spec, table, chunk, report)
+            chunk = []
+            if on_progress:
+                on_progress(report)
+    if chunk:
+        _load_chunk(conn, spec, table, chunk, report)
+    else:
+        conn.commit()
+    if on_progress:
+        on_progress(report)
+    return report
+
+
+def detect_format(filename: str) -> str:
+    return "ndjson" if filename.lower().endswith((".ndjson", ".jsonl")) else "csv"
+
+
+def text_stream(binary: io.BufferedIOBase) -> io.TextIOWrapper:
+    """Decode an uploaded/opened byte stream; utf-8-sig drops an Excel BOM."""
+    return io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
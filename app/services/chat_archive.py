@@ -0,0 +1,106 @@
+"""
+Retention for chat messages.
+
+The hot `messages` collection only needs recent conversations. Two optional
+mechanisms keep it (and its indexes) small enough to stay in RAM:
+
+  - MESSAGE_TTL_DAYS: a TTL index on `timestamp` deletes old messages
+    (managed by ensure_mongo_indexes)
+  - MESSAGE_ARCHIVE_ENABLED: sessions ended more than
+    MESSAGE_ARCHIVE_AFTER_HOURS ago have their messages moved into a
+    per-month collection (messages_YYYYMM, by session start) with a
+    server-side $merge; the session records `archivedIn` so history reads
+    follow it. MESSAGE_ARCHIVE_RETENTION_MONTHS drops whole old months,
+    which is far cheaper than deleting documents.
+
+Moving a batch is merge -> mark -> delete, so a crash part-way leaves at
+most duplicates in the hot collection, never a gap in history.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Set
+
+from app.config import settings
+from app.db.mongo import MESSAGE_HISTORY_INDEX, get_mongo
+
+logger = logging.getLogger(__name__)
+
+HOT_COLLECTION = "messages"
+ARCHIVE_PREFIX = "messages_"
+_ARCHIVE_RE = re.compile(r"^messages_(\d{4})(\d{2})$")
+
+_indexed_archives: Set[str] = set()
+
+
+def archive_collection_name(dt: datetime) -> str:
+    return f"{ARCHIVE_PREFIX}{dt.year:04d}{dt.month:02d}"
+
+
+async def _ensure_archive_index(name: str) -> None:
+    if name not in _indexed_archives:
+        await get_mongo()[name].create_index(MESSAGE_HISTORY_INDEX)
+        _indexed_archives.add(name)
+
+
+async def archive_ended_sessions(older_than: timedelta, batch_size: int = 500) -> int:
+    """Move one batch of ended sessions' messages to monthly collections. Returns sessions moved."""
+    db = get_mongo()
+    cutoff = datetime.now(timezone.utc) - older_than
+    sessions = await db.chat_sessions.find(
+        {"status": "ended", "endedAt": {"$lt": cutoff}, "archivedIn": {"$exists": False}},
+        projection={"startedAt": 1},
+    ).limit(batch_size).to_list(length=batch_size)
+    if not sessions:
+        return 0
+
+    by_month: Dict[str, List] = {}
+    for s in sessions:
+        by_month.setdefault(archive_collection_name(s["startedAt"]), []).append(s["_id"])
+
+    for target, ids in by_month.items():
+        await _ensure_archive_index(target)
+        cursor = db[HOT_COLLECTION].aggregate([
+            {"$match": {"sessionId": {"$in": ids}}},
+            {"$merge": {"into": target, "on": "_id", "whenMatched": "keepExisting", "whenNotMatched": "insert"}},
+        ])
+        await cursor.to_list(length=None)  # $merge runs when the cursor is drained
+        await db.chat_sessions.update_many({"_id": {"$in": ids}}, {"$set": {"archivedIn": target}})
+        await db[HOT_COLLECTION].delete_many({"sessionId": {"$in": ids}})
+    return len(sessions)
+
+
+async def drop_expired_archives(retention_months: int) -> List[str]:
+    db = get_mongo()
+    now = datetime.now(timezone.utc)
+    keep_from = now.year * 12 + now.month - 1 - retention_months  # months since year 0
+    dropped = []
+    for name in await db.list_collection_names(filter={"name": {"$regex": f"^{ARCHIVE_PREFIX}"}}):
+        m = _ARCHIVE_RE.match(name)
+        if m and int(m.group(1)) * 12 + int(m.group(2)) - 1 < keep_from:
+            await db.drop_collection(name)
+            _indexed_archives.discard(name)
+            dropped.append(name)
+    return dropped
+
+
+async def archive_forever(interval: float) -> None:
+    older_than = timedelta(hours=settings.MESSAGE_ARCHIVE_AFTER_HOURS)
+    while True:
+        try:
+            while await archive_ended_sessions(older_than):
+                await asyncio.sleep(0)  # drain the backlog batch by batch
+            if settings.MESSAGE_ARCHIVE_RETENTION_MONTHS:
+                for name in await drop_expired_archives(settings.MESSAGE_ARCHIVE_RETENTION_MONTHS):
+                    logger.info("Dropped expired message archive %s", name)
+        except Exception:
+            logger.exception("Chat message archiving failed")
+        await asyncio.sleep(interval)
+
+
+def history_collection(session: dict) -> str:
+    """Collection holding a session's messages (hot, or its monthly archive)."""
+    return session.get("archivedIn") or HOT_COLLECTION
@@ -0,0 +1,252 @@
+"""
+Kiosk device registry and heartbeats.
+
+Devices authenticate with the X-Device-Code header: a random code issued by
+the admin API and stored only as its SHA-256 (device_code_hash). The
+registry keeps every device (a few hundred rows) in memory keyed by that
+hash, so authenticating is a dict lookup. Admin writes call invalidate(); a
+max age (and an unknown code, at most every few seconds) reloads it so other
+workers pick up new or deactivated devices.
+
+Heartbeats, and any other authenticated device request, only stamp "seen at"
+in memory. Every DEVICE_FLUSH_INTERVAL_SECONDS the pending stamps go to
+Postgres in one UPDATE ... FROM (VALUES ...), so 300 kiosks beating every
+10 s cost one statement per flush instead of 30 commits a second. The admin
+fleet view reads the same in-memory state; with several workers each one
+sees its own heartbeats plus last_seen_at as of its last reload.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import secrets
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from time import monotonic
+from typing import Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import column, or_, select, update, values
+from sqlalchemy.dialects.postgresql import TIMESTAMP, UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.pg import AsyncSessionLocal
+from app.models.kiosk_device import KioskDevice
+
+logger = logging.getLogger(__name__)
+
+# An unknown code triggers a reload (a device registered on another worker), at most this often
+_MISS_RELOAD_SECONDS = 5
+
+
+def new_device_code() -> str:
+    return secrets.token_urlsafe(32)
+
+
+def hash_device_code(code: str) -> str:
+    return hashlib.sha256(code.encode()).hexdigest()
+
+
+@dataclass(frozen=True)
+class DeviceInfo:
+    id: UUID
+    name: str
+    location: Optional[str]
+    is_active: bool
+
+
+class DeviceRegistry:
+    def __init__(self, max_age: float, flush_interval: float, offline_after: float):
+        self.max_age = max_age
+        self.flush_interval = flush_interval
+        self.offline_after = offline_after
+        self._devices: Dict[UUID, DeviceInfo] = {}
+        self._by_hash: Dict[str, UUID] = {}
+        self._last_seen: Dict[UUID, datetime] = {}
+        self._reports: Dict[UUID, dict] = {}
+        self._pending: Dict[UUID, datetime] = {}  # seen-at stamps not yet written
+        self._loaded_at: Optional[float] = None
+        self._dirty = True
+        self._lock: Optional[asyncio.Lock] = None
+        self.reloads = 0
+        self.auth_failures = 0
+        self.heartbeats = 0
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.failed = 0
+
+    def invalidate(self) -> None:
+        """Reload on the next lookup. Safe to call from sync (threadpool) routes."""
+        self._dirty = True
+
+    def _fresh(self) -> bool:
+        return (
+            self._loaded_at is not None
+            and not self._dirty
+            and monotonic() - self._loaded_at < self.max_age
+        )
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        if self._fresh():
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self._fresh():  # another request may have reloaded meanwhile
+                await self._load(db)
+
+    async def _load(self, db: AsyncSession) -> None:
+        # Clear the flag first: a write landing during the load marks it dirty again
+        self._dirty = False
+        result = await db.execute(
+            select(
+                KioskDevice.id,
+                KioskDevice.name,
+                KioskDevice.location,
+                KioskDevice.is_active,
+                KioskDevice.device_code_hash,
+                KioskDevice.last_seen_at,
+            )
+        )
+        devices: Dict[UUID, DeviceInfo] = {}
+        by_hash: Dict[str, UUID] = {}
+        for r in result:
+            devices[r.id] = DeviceInfo(r.id, r.name, r.location, r.is_active)
+            if r.device_code_hash:
+                by_hash[r.device_code_hash] = r.id
+            # Heartbeats other workers flushed
+            seen = self._last_seen.get(r.id)
+            if r.last_seen_at and (seen is None or seen < r.last_seen_at):
+                self._last_seen[r.id] = r.last_seen_at
+        for gone in set(self._last_seen) - devices.keys():
+            self._last_seen.pop(gone, None)
+            self._reports.pop(gone, None)
+            self._pending.pop(gone, None)
+        self._devices, self._by_hash = devices, by_hash
+        self._loaded_at = monotonic()
+        self.reloads += 1
+
+    async def authenticate(self, db: AsyncSession, code: str) -> Optional[DeviceInfo]:
+        """The active device holding `code`, or None."""
+        await self.ensure_loaded(db)
+        code_hash = hash_device_code(code)
+        device_id = self._by_hash.get(code_hash)
+        if device_id is None and monotonic() - self._loaded_at >= _MISS_RELOAD_SECONDS:
+            self.invalidate()
+            await self.ensure_loaded(db)
+            device_id = self._by_hash.get(code_hash)
+        device = self._devices.get(device_id) if device_id else None
+        if device is None or not device.is_active:
+            self.auth_failures += 1
+            return None
+        return device
+
+    def known(self, code: str) -> Optional[DeviceInfo]:
+        """The active device holding `code` as of the last load; never reloads (no DB)."""
+        device_id = self._by_hash.get(hash_device_code(code))
+        device = self._devices.get(device_id) if device_id else None
+        return device if device is not None and device.is_active else None
+
+    def seen(self, device_id: UUID) -> None:
+        now = datetime.now(timezone.utc)
+        self._last_seen[device_id] = now
+        self._pending[device_id] = now
+
+    def record_heartbeat(self, device_id: UUID, report: Optional[dict] = None) -> None:
+        self.seen(device_id)
+        self.heartbeats += 1
+        if report:
+            self._reports[device_id] = report
+
+    def _requeue(self, batch: Dict[UUID, datetime]) -> None:
+        for device_id, at in batch.items():
+            pending = self._pending.get(device_id)
+            if pending is None or pending < at:
+                self._pending[device_id] = at
+
+    async def flush(self) -> int:
+        """Write pending seen-at stamps in one statement; returns the rows sent."""
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending, {}
+        v = values(
+            column("id", PG_UUID(as_uuid=True)),
+            column("seen", TIMESTAMP(timezone=True)),
+            name="v",
+        ).data(list(batch.items()))
+        t = KioskDevice.__table__
+        stmt = (
+            update(t)
+            .where(t.c.id == v.c.id)
+            .where(or_(t.c.last_seen_at.is_(None), t.c.last_seen_at < v.c.seen))
+            .values(last_seen_at=v.c.seen)
+        )
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(stmt)
+                await db.commit()
+        except asyncio.CancelledError:
+            self._requeue(batch)  # picked up by the shutdown flush
+            raise
+        except Exception:
+            self._requeue(batch)
+            self.failed += 1
+            logger.exception("Device heartbeat flush failed (%d devices)", len(batch))
+            return 0
+        self.flushes += 1
+        self.rows_flushed += len(batch)
+        return len(batch)
+
+    async def run_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def fleet(self) -> dict:
+        """Fleet status from memory: every registered device with its last heartbeat."""
+        now = datetime.now(timezone.utc)
+        devices = []
+        online = 0
+        for d in sorted(self._devices.values(), key=lambda d: (d.name.lower(), str(d.id))):
+            seen = self._last_seen.get(d.id)
+            is_online = (
+                d.is_active and seen is not None and (now - seen).total_seconds() < self.offline_after
+            )
+            online += is_online
+            devices.append({
+                "id": d.id,
+                "name": d.name,
+                "location": d.location,
+                "isActive": d.is_active,
+                "online": is_online,
+                "lastSeenAt": seen,
+                "report": self._reports.get(d.id),
+            })
+        return {
+            "total": len(devices),
+            "active": sum(d.is_active for d in self._devices.values()),
+            "online": online,
+            "offlineAfterSeconds": self.offline_after,
+            "devices": devices,
+        }
+
+    def stats(self) -> dict:
+        return {
+            "devices": len(self._devices),
+            "reloads": self.reloads,
+            "auth_failures": self.auth_failures,
+            "heartbeats": self.heartbeats,
+            "pending": len(self._pending),
+            "flushes": self.flushes,
+            "rows_flushed": self.rows_flushed,
+            "failed": self.failed,
+        }
+
+
+device_registry = DeviceRegistry(
+    max_age=settings.DEVICE_REGISTRY_REFRESH_SECONDS,
+    flush_interval=settings.DEVICE_FLUSH_INTERVAL_SECONDS,
+    offline_after=settings.DEVICE_OFFLINE_AFTER_SECONDS,
+)
@@ -0,0 +1,36 @@
+"""
+In-process cache and queue counters, reported next to the pools on /readyz.
+
+Every figure is read from memory (no I/O), so the probe stays cheap.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from app.services import reminders
+from app.services.admin_cache import admin_identity_cache
+from app.services.appointment_cache import appointment_lookup_cache
+from app.services.audit import audit_writer
+from app.services.availability import availability_cache
+from app.services.devices import device_registry
+from app.services.directory_cache import directory_cache
+from app.services.passwords import password_hasher
+from app.services.rate_limit import admission_controller, rate_limiter
+from app.services.session_cache import session_cache
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters for the in-process caches, plus the background writers."""
+    return {
+        "chat_sessions": session_cache.stats(),
+        "directory": directory_cache.stats(),
+        "admin_identity": admin_identity_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "audit_writer": audit_writer.stats(),
+        "availability": availability_cache.stats(),
+        "appointment_lookups": appointment_lookup_cache.stats(),
+        "devices": device_registry.stats(),
+        "rate_limit": rate_limiter.stats(),
+        "admission": admission_controller.stats(),
+        "reminders": reminders.reminder_scheduler.stats() if reminders.reminder_scheduler else None,
+    }
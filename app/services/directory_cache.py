@@ -0,0 +1,163 @@
+"""
+In-memory snapshot of the public directory (active departments and doctors).
+
+The kiosks poll /info/departments and /info/doctors every few seconds while
+the directory changes a few times a day, so:
+  - one snapshot per process, loaded with two column-only queries
+  - admin writes call invalidate(); the next read reloads (single-flight)
+  - a max age bounds staleness for workers that did not see the write
+  - rendered JSON bytes and their strong ETag are memoized per query, so a
+    repeat poll is a dict lookup and, with If-None-Match, a bodiless 304
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.department import Department
+from app.models.doctor import Doctor
+
+# Bound on memoized renders per snapshot (distinct q/limit/offset combos)
+MAX_RENDERS = 512
+
+
+@dataclass
+class DirectorySnapshot:
+    version: int
+    departments: List[dict]
+    doctors: List[dict]
+    loaded_at: float = field(default_factory=monotonic)
+    renders: Dict[Hashable, "Rendered"] = field(default_factory=dict)
+
+
+# (etag, body, next page cursor)
+Rendered = Tuple[str, bytes, Optional[str]]
+
+
+def sort_key(row: dict) -> Tuple[str, str]:
+    """Snapshot order (also the keyset cursor key): case-insensitive name, then id."""
+    return (row["name"].lower(), str(row["id"]))
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class DirectoryCache:
+    def __init__(self, max_age: float):
+        self.max_age = max_age
+        self._snapshot: Optional[DirectorySnapshot] = None
+        self._dirty = True
+        self._version = 0
+        self._lock: Optional[asyncio.Lock] = None
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def invalidate(self) -> None:
+        """Mark the snapshot stale. Safe to call from sync (threadpool) routes."""
+        self._dirty = True
+
+    def _fresh(self) -> bool:
+        snap = self._snapshot
+        return snap is not None and not self._dirty and monotonic() - snap.loaded_at < self.max_age
+
+    async def snapshot(self, db: AsyncSession) -> DirectorySnapshot:
+        if self._fresh():
+            return self._snapshot
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self._fresh():  # another request may have reloaded meanwhile
+                self._snapshot = await self._load(db)
+        return self._snapshot
+
+    async def _load(self, db: AsyncSession) -> DirectorySnapshot:
+        # Clear the flag first: a write landing during the load marks it dirty again
+        self._dirty = False
+        deps = await db.execute(
+            select(Department.id, Department.name, Department.floor, Department.location_note)
+            .where(Department.is_active.is_(True))
+        )
+        docs = await db.execute(
+            select(Doctor.id, Doctor.name, Doctor.specialty, Doctor.room, Doctor.department_id)
+            .where(Doctor.is_active.is_(True))
+        )
+        self._version += 1
+        self.reloads += 1
+        departments = [
+            {"id": r.id, "name": r.name, "floor": r.floor, "location": r.location_note}
+            for r in deps
+        ]
+        doctors = [
+            {
+                "id": r.id,
+                "name": r.name,
+                "specialty": r.specialty,
+                "room": r.room,
+                "departmentId": r.department_id,
+            }
+            for r in docs
+        ]
+        departments.sort(key=sort_key)
+        doctors.sort(key=sort_key)
+        return DirectorySnapshot(version=self._version, departments=departments, doctors=doctors)
+
+    def render(
+        self,
+        snap: DirectorySnapshot,
+        key: Hashable,
+        build: Callable[[], Tuple[bytes, Optional[str]]],
+    ) -> Rendered:
+        """
+        Return (etag, body, next_cursor) for `key`; `build` returns
+        (body, next_cursor) and runs only on the first request for `key`.
+        """
+        hit = snap.renders.get(key)
+        if hit is not None:
+            self.hits += 1
+            return hit
+        self.misses += 1
+        body, next_cursor = build()
+        rendered = (make_etag(body), body, next_cursor)
+        if len(snap.renders) < MAX_RENDERS:
+            snap.renders[key] = rendered
+        return rendered
+
+    def stats(self) -> dict:
+        snap = self._snapshot
+        lookups = self.hits + self.misses
+        return {
+            "version": snap.version if snap else None,
+            "departments": len(snap.departments) if snap else 0,
+            "doctors": len(snap.doctors) if snap else 0,
+            "renders": len(snap.renders) if snap else 0,
+            "reloads": self.reloads,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+directory_cache = DirectoryCache(max_age=settings.DIRECTORY_CACHE_MAX_AGE_SECONDS)
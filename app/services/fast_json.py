@@ -0,0 +1,67 @@
+"""
+Fast JSON responses (FAST_JSON_RESPONSES=true).
+
+FastAPI validates a handler's return value against response_model and then
+encodes it again with jsonable_encoder + json.dumps, so list endpoints that
+already built Pydantic models per row pay for validation twice. With the
+fast path on:
+  - FastJSONResponse (orjson) is the app's default response class;
+    datetimes, UUIDs and enums are serialized natively, UTC as "Z" like
+    Pydantic does
+  - endpoints whose rows come from our own queries or the directory
+    snapshot (already in the response shape) return FastJSONResponse
+    directly, which FastAPI passes through without touching response_model
+
+response_model stays on those routes for the OpenAPI schema. Off by default;
+the `orjson` package is only needed when it is turned on.
+"""
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.config import settings
+
+_orjson: Optional[Any] = None
+
+
+def _backend() -> Any:
+    global _orjson
+    if _orjson is None:
+        try:
+            import orjson
+        except ImportError as e:
+            raise RuntimeError("FAST_JSON_RESPONSES requires the 'orjson' package (pip install orjson).") from e
+        _orjson = orjson
+    return _orjson
+
+
+def enabled() -> bool:
+    return settings.FAST_JSON_RESPONSES
+
+
+def _default(obj: Any) -> Any:
+    # Models that still reach the encoder (e.g. via the default response class)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    orjson = _backend()
+    return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def default_response_class() -> type:
+    """The app-wide response class; fails at startup if orjson is missing."""
+    if not enabled():
+        return JSONResponse
+    _backend()
+    return FastJSONResponse
@@ -0,0 +1,103 @@
+"""
+Dependency health for /readyz.
+
+A background task pings Postgres and Mongo every HEALTH_CHECK_INTERVAL_SECONDS,
+each bounded by HEALTH_CHECK_TIMEOUT_SECONDS, and keeps the last result. The
+probe only reads that state: it costs no DB round trip, and a hung database
+shows up as a timed-out check instead of a probe stuck on the event loop.
+A result older than HEALTH_MAX_STALENESS_SECONDS counts as failed, so a
+stalled checker also turns the pod unready.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.db.mongo import get_mongo
+from app.db.pg import async_engine
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CheckResult:
+    ok: bool = False
+    latency_ms: Optional[float] = None
+    error: Optional[str] = "not checked yet"
+    checked_at: Optional[float] = None  # monotonic
+
+
+async def _check_postgres() -> None:
+    async with async_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def _check_mongo() -> None:
+    await get_mongo().command("ping")
+
+
+class HealthChecker:
+    def __init__(self, interval: float, timeout: float, max_staleness: float):
+        self.interval = interval
+        self.timeout = timeout
+        self.max_staleness = max_staleness
+        self.checks: Dict[str, Callable[[], Awaitable[None]]] = {
+            "postgres": _check_postgres,
+            "mongo": _check_mongo,
+        }
+        self.results: Dict[str, CheckResult] = {name: CheckResult() for name in self.checks}
+
+    async def _run_check(self, name: str) -> None:
+        t0 = time.perf_counter()
+        try:
+            await asyncio.wait_for(self.checks[name](), timeout=self.timeout)
+            ok, error = True, None
+        except asyncio.TimeoutError:
+            ok, error = False, f"timed out after {self.timeout}s"
+        except Exception as e:
+            ok, error = False, str(e) or type(e).__name__
+        if not ok and self.results[name].ok:
+            logger.warning("%s health check failed: %s", name, error)
+        self.results[name] = CheckResult(
+            ok=ok,
+            latency_ms=round((time.perf_counter() - t0) * 1000, 2),
+            error=error,
+            checked_at=time.monotonic(),
+        )
+
+    async def check_now(self) -> None:
+        await asyncio.gather(*(self._run_check(name) for name in self.checks))
+
+    async def run_forever(self) -> None:
+        while True:
+            await self.check_now()
+            await asyncio.sleep(self.interval)
+
+    def report(self) -> dict:
+        now = time.monotonic()
+        deps = {}
+        ready = True
+        for name, r in self.results.items():
+            staleness = None if r.checked_at is None else round(now - r.checked_at, 2)
+            dep_ok = r.ok and staleness is not None and staleness <= self.max_staleness
+            ready = ready and dep_ok
+            deps[name] = {
+                "ok": dep_ok,
+                "latency_ms": r.latency_ms,
+                "staleness_s": staleness,
+                "error": r.error if not r.ok else (None if dep_ok else "stale"),
+            }
+        return {"ready": ready, "dependencies": deps}
+
+
+health_checker = HealthChecker(
+    interval=settings.HEALTH_CHECK_INTERVAL_SECONDS,
+    timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS,
+    max_staleness=settings.HEALTH_MAX_STALENESS_SECONDS,
+)
@@ -0,0 +1,149 @@
+"""
+Prometheus metrics, served at /metrics.
+
+  http_request_duration_seconds{method,route,status}   route template, not raw path
+  db_pool_checkout_wait_seconds{engine}                time to get a pooled connection
+  db_pool_connections{engine,state}                    size / checked_in / checked_out / overflow
+  mongo_command_duration_seconds{command,outcome}      from a pymongo CommandListener
+  kiosk_intents_total{intent}                          detect_intent() results
+  http_requests_shed_total{reason,rule}                429s (rate_limited) and 503s (overloaded)
+
+A slow kiosk turn with low checkout wait and high Mongo command time is
+blocked on Mongo, and the other way round for Postgres.
+
+Metrics are per process; with several uvicorn workers, scrape each one or
+run prometheus_client in multiprocess mode.
+"""
+from __future__ import annotations
+
+import time
+from typing import Iterable
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, REGISTRY, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from pymongo import monitoring
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a Postgres connection from the pool",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5, 30),
+)
+MONGO_COMMAND_LATENCY = Histogram(
+    "mongo_command_duration_seconds",
+    "MongoDB command latency",
+    ["command", "outcome"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+INTENTS = Counter("kiosk_intents", "Detected chat intents", ["intent"])
+REQUESTS_SHED = Counter(
+    "http_requests_shed", "Requests rejected before reaching a handler", ["reason", "rule"]
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no BaseHTTPMiddleware body buffering)."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        t0 = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # FastAPI stores the matched APIRoute in the scope; its path is the template
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                scope["method"], getattr(route, "path", UNMATCHED_ROUTE), str(status)
+            ).observe(time.perf_counter() - t0)
+
+
+# --- SQLAlchemy pools ---
+class _PoolCollector:
+    def __init__(self) -> None:
+        self.engines: dict[str, Engine] = {}
+
+    def collect(self) -> Iterable[GaugeMetricFamily]:
+        g = GaugeMetricFamily("db_pool_connections", "SQLAlchemy pool connections", labels=["engine", "state"])
+        for name, engine in self.engines.items():
+            pool = engine.pool
+            for state, fn in (
+                ("size", "size"), ("checked_in", "checkedin"),
+                ("checked_out", "checkedout"), ("overflow", "overflow"),
+            ):
+                if hasattr(pool, fn):
+                    g.add_metric([name, state], getattr(pool, fn)())
+        yield g
+
+
+_pool_collector = _PoolCollector()
+REGISTRY.register(_pool_collector)
+
+
+def instrument_engine(name: str, engine: Engine) -> None:
+    """
+    Export pool gauges and checkout wait for `engine` (for an AsyncEngine,
+    pass .sync_engine). SQLAlchemy's pool events fire only after a connection
+    is obtained, so the wait is measured by wrapping the pool's _do_get.
+    """
+    _pool_collector.engines[name] = engine
+    pool = engine.pool
+    do_get = pool._do_get
+    hist = POOL_CHECKOUT_WAIT.labels(name)
+
+    def timed_do_get():
+        t0 = time.perf_counter()
+        try:
+            return do_get()
+        finally:
+            hist.observe(time.perf_counter() - t0)
+
+    pool._do_get = timed_do_get
+
+
+# --- Mongo ---
+class MongoCommandMetrics(monitoring.CommandListener):
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        MONGO_COMMAND_LATENCY.labels(event.command_name, "ok").observe(event.duration_micros / 1e6)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        MONGO_COMMAND_LATENCY.labels(event.command_name, "error").observe(event.duration_micros / 1e6)
+
+
+# --- NLU ---
+def count_intent(intent: str) -> None:
+    INTENTS.labels(intent).inc()
+
+
+# --- Rate limiting / admission control ---
+def count_shed(reason: str, rule: str) -> None:
+    REQUESTS_SHED.labels(reason, rule).inc()
+
+
+def render_latest() -> tuple[bytes, str]:
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
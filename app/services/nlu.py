@@ -1,9 +1,226 @@
+"""
+Keyword intent classifier.
+
+All phrases (built-in intents plus active FAQ questions) are compiled into a
+single Aho-Corasick automaton, so an utterance is scanned once no matter how
+many FAQs are loaded. Matches must start at a word boundary and are taken
+leftmost-longest without overlap within each intent. The intent whose matches
+cover the most content words (not stopwords) of the utterance wins, so an FAQ
+matching "cancel" and "appointment" beats the built-in "my appointment" in
+"I want to cancel my appointment". Ties go to the summed phrase weight, then
+to built-ins ahead of FAQs. Weights default to the phrase's word count, so
+"my appointment" (2) outranks "time" (1) in "what time is my appointment".
+
+FAQ intents come from the `faqs` table: reload_faqs() recompiles after admin
+writes, and answer_for(intent) serves the canned answer from memory.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.pg import AsyncSessionLocal
+from app.models.faq import Faq
+from app.services.metrics import count_intent
+
+logger = logging.getLogger(__name__)
+
+FALLBACK = "fallback"
+
+# (intent, phrases); order is the tie-break priority
+BUILTIN_INTENTS: Sequence[Tuple[str, Sequence[str]]] = (
+    ("check_appointment", (
+        "check my appointment", "my appointment", "appointment status", "check appointment",
+        "id:", "pid:",
+    )),
+    ("ask_directions", ("where", "direction", "locate", "how to get")),
+    ("clinic_hours", ("open", "hour", "time")),
+)
+
+# Words that carry no intent on their own; dropped when deriving FAQ keywords
+_STOPWORDS = frozenset(
+    "a an and are at be can do does for from how i in is it me my of on or "
+    "the to what when where which who why will with you your".split()
+)
+
+
+@dataclass(frozen=True)
+class _Phrase:
+    intent: str
+    weight: float
+    covers: int  # content words in the phrase
+
+
+def _content_words(text: str) -> int:
+    return sum(w.strip(":") not in _STOPWORDS for w in text.split())
+
+
+class _Compiled:
+    """Aho-Corasick automaton over all phrases (one pass per utterance)."""
+
+    def __init__(self, phrases: Dict[str, List[_Phrase]], priority: Dict[str, int]):
+        self.priority = priority
+        self.goto: List[Dict[str, int]] = [{}]
+        self.out: List[List[Tuple[int, str]]] = [[]]  # (phrase length, phrase) ending here
+        self.phrases = phrases
+
+        for text in phrases:
+            state = 0
+            for ch in text:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.out.append([])
+                state = nxt
+            self.out[state].append((len(text), text))
+
+        # Failure links, breadth-first; outputs are merged along them
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def _matches(self, text: str) -> List[Tuple[int, int, str]]:
+        goto, fail, out = self.goto, self.fail, self.out
+        hits: List[Tuple[int, int, str]] = []
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, phrase in out[state]:
+                start = i - length + 1
+                # Anchor at a word start only, so "hour" still matches "hours"
+                if start == 0 or not (text[start - 1].isalnum() or text[start - 1] == "_"):
+                    hits.append((start, -length, phrase))
+        return hits
+
+    def classify(self, text: str) -> str:
+        hits = self._matches(text)
+        if not hits:
+            return FALLBACK
+        # Leftmost-longest, non-overlapping per intent (so "check my
+        # appointment" is not also counted as "my appointment", but another
+        # intent can still claim "appointment")
+        hits.sort()
+        scores: Dict[str, Tuple[int, float]] = {}  # intent -> (content words covered, weight)
+        ends: Dict[str, int] = {}
+        for start, neg_len, phrase in hits:
+            for ph in self.phrases[phrase]:
+                if start < ends.get(ph.intent, 0):
+                    continue
+                ends[ph.intent] = start - neg_len
+                covers, weight = scores.get(ph.intent, (0, 0.0))
+                scores[ph.intent] = (covers + ph.covers, weight + ph.weight)
+        return max(scores, key=lambda k: (*scores[k], -self.priority.get(k, len(self.priority))))
+
+
+def _normalize(text: str) -> str:
+    return " ".join(re.findall(r"[\w:]+", (text or "").lower()))
+
+
+def _faq_phrases(intent_key: str, question: str) -> List[Tuple[str, float]]:
+    out: List[Tuple[str, float]] = []
+    q = _normalize(question)
+    if q:
+        out.append((q, float(len(q.split()) + 1)))  # the whole question is a strong signal
+    keywords = set(_normalize(intent_key.replace("_", " ").replace("-", " ")).split())
+    keywords.update(w for w in q.split() if len(w) > 2)
+    out.extend((w, 1.0) for w in keywords - _STOPWORDS)
+    return out
+
+
+class IntentEngine:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._answers: Dict[str, str] = {}
+        self._compiled = self._build([])
+
+    def _build(self, faqs: Iterable[Tuple[str, str, str]]) -> _Compiled:
+        phrases: Dict[str, List[_Phrase]] = {}
+        priority: Dict[str, int] = {}
+
+        def add(text: str, intent: str, weight: float) -> None:
+            text = text.strip()
+            if text:
+                phrases.setdefault(text, []).append(_Phrase(intent, weight, _content_words(text)))
+
+        for intent, words in BUILTIN_INTENTS:
+            priority.setdefault(intent, len(priority))
+            for w in words:
+                add(w, intent, float(len(w.split())))
+        for intent_key, question, _ in faqs:
+            priority.setdefault(intent_key, len(priority))
+            for text, weight in _faq_phrases(intent_key, question):
+                add(text, intent_key, weight)
+        return _Compiled(phrases, priority)
+
+    def set_faqs(self, faqs: Iterable[Tuple[str, str, str]]) -> None:
+        """Recompile from (intent_key, question, answer) rows and swap in atomically."""
+        faqs = list(faqs)
+        compiled = self._build(faqs)
+        answers = {k: a for k, _, a in faqs}
+        with self._lock:
+            self._compiled, self._answers = compiled, answers
+
+    def detect(self, text: str) -> str:
+        return self._compiled.classify((text or "").lower())
+
+    def answer_for(self, intent: str) -> Optional[str]:
+        return self._answers.get(intent)
+
+
+intent_engine = IntentEngine()
+
+
+def _active_faqs_stmt():
+    return select(Faq.intent_key, Faq.question, Faq.answer).where(Faq.is_active.is_(True))
+
+
+def reload_faqs(db: Session) -> None:
+    """Recompile with the current active FAQs (sync; used by the admin router)."""
+    intent_engine.set_faqs(tuple(r) for r in db.execute(_active_faqs_stmt()).all())
+
+
+async def reload_faqs_async(db: AsyncSession) -> None:
+    result = await db.execute(_active_faqs_stmt())
+    intent_engine.set_faqs(tuple(r) for r in result.all())
+
+
+async def refresh_faqs_forever(interval: float) -> None:
+    """Periodic reload so workers that did not handle an admin write converge."""
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                await reload_faqs_async(db)
+        except Exception:
+            logger.exception("FAQ intent refresh failed")
+        await asyncio.sleep(interval)
+
+
 def detect_intent(text: str) -> str:
-    t = (text or "").lower()
-    if any(k in t for k in ["where", "direction", "locate", "how to get"]):
-        return "ask_directions"
-    if any(k in t for k in ["open", "hour", "time"]):
-        return "clinic_hours"
-    if any(k in t for k in ["check my appointment", "my appointment", "appointment status", "check appointment"]):
-        return "check_appointment"
-    return "fallback"
+    intent = intent_engine.detect(text)
+    count_intent(intent)
+    return intent
+
+
+def faq_answer(intent: str) -> Optional[str]:
+    return intent_engine.answer_for(intent)
@@ -0,0 +1,156 @@
+"""
+Keyset (cursor) pagination shared by the list endpoints.
+
+A cursor is an opaque, URL-safe token holding the sort key and id of the last
+row of the previous page. The next page is `WHERE (key, id) > (:key, :id)`
+(or `<` for descending sorts), a row-value comparison Postgres can answer
+straight from a composite index such as ix_appt_patient_start_time, so page
+N costs the same as page 1.
+
+limit/offset still works as a compatibility mode; either way the response
+carries the cursor for the following page (X-Next-Cursor header on list
+endpoints), so clients can switch over at any point.
+"""
+from __future__ import annotations
+
+import base64
+import json
+from bisect import bisect_right
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple, TypeVar
+from uuid import UUID
+
+from fastapi import HTTPException, Response
+from sqlalchemy import tuple_
+
+T = TypeVar("T")
+Q = TypeVar("Q")  # sqlalchemy Select or orm Query; both have where/order_by/limit/offset
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+CURSOR_DESCRIPTION = "Opaque cursor from a previous page (X-Next-Cursor); overrides offset"
+
+
+def _encode_value(v: Any) -> Any:
+    if isinstance(v, datetime):
+        return {"$dt": v.isoformat()}
+    if isinstance(v, UUID):
+        return {"$uuid": str(v)}
+    return v
+
+
+def _decode_value(v: Any) -> Any:
+    if isinstance(v, dict):
+        if "$dt" in v:
+            return datetime.fromisoformat(v["$dt"])
+        if "$uuid" in v:
+            return UUID(v["$uuid"])
+    return v
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> Tuple[Any, ...]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError("cursor shape")
+        return tuple(_decode_value(v) for v in values)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _check_types(values: Sequence[Any], types: Sequence[Optional[type]]) -> None:
+    """
+    Reject a well-formed cursor whose values do not match the sort key types
+    (e.g. a string where the key is a UUID): Postgres would refuse the
+    comparison, and in memory it would raise or land anywhere.
+    """
+    if any(t is not None and not isinstance(v, t) for v, t in zip(values, types)):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _python_type(column: Any) -> Optional[type]:
+    try:
+        return column.type.python_type
+    except NotImplementedError:  # custom types: nothing to check against
+        return None
+
+
+def apply_keyset(
+    stmt: Q,
+    columns: Sequence[Any],
+    *,
+    cursor: Optional[str],
+    limit: int,
+    offset: int = 0,
+    descending: bool = False,
+) -> Q:
+    """
+    Order `stmt` (a select() or an ORM Query) by `columns` (sort key(s) then
+    a unique id) and page it.
+
+    Fetches limit + 1 rows so page_rows() can tell whether a next page exists.
+    With a cursor the offset is ignored.
+    """
+    if cursor:
+        after = decode_cursor(cursor, len(columns))
+        _check_types(after, [_python_type(c) for c in columns])
+        keys = tuple_(*columns)
+        stmt = stmt.where(keys < tuple_(*after) if descending else keys > tuple_(*after))
+    stmt = stmt.order_by(*[c.desc() if descending else c.asc() for c in columns])
+    stmt = stmt.limit(limit + 1)
+    if offset and not cursor:
+        stmt = stmt.offset(offset)
+    return stmt
+
+
+def page_rows(
+    rows: Sequence[T], limit: int, key: Callable[[T], Sequence[Any]]
+) -> Tuple[List[T], Optional[str]]:
+    """Trim the look-ahead row and build the cursor for the next page."""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(key(rows[-1]))
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+
+def page_sorted_list(
+    items: Sequence[T],
+    keys: Sequence[Tuple[Any, ...]],
+    *,
+    cursor: Optional[str],
+    limit: int,
+    offset: int = 0,
+) -> Tuple[List[T], Optional[str]]:
+    """
+    Same contract as apply_keyset/page_rows for an in-memory list that is
+    already sorted ascending by `keys` (one key tuple per item).
+    """
+    if not items:
+        if cursor:
+            decode_cursor(cursor, 2)  # still reject garbage
+        return [], None
+    if cursor:
+        after = decode_cursor(cursor, len(keys[0]))
+        _check_types(after, [type(k) for k in keys[0]])
+        try:
+            start = bisect_right(keys, after)
+        except TypeError:  # naive vs aware datetimes
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    else:
+        start = offset
+    page = list(items[start:start + limit])
+    if start + limit >= len(items):
+        return page, None
+    return page, encode_cursor(keys[start + limit - 1])
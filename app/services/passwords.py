@@ -0,0 +1,117 @@
+"""
+Password hashing off the request workers.
+
+bcrypt costs ~250ms of CPU per call. Run inline, a burst of logins fills
+FastAPI's shared threadpool and every sync endpoint queues behind it. Here
+hash/verify run in a dedicated process pool (PASSWORD_HASH_WORKERS), and at
+most PASSWORD_HASH_MAX_PENDING calls may be running or queued per API
+process; beyond that callers get 429 with Retry-After instead of piling up.
+
+Hashes made with other parameters (e.g. fewer BCRYPT_ROUNDS) are reported by
+needs_rehash() so login can upgrade them while the plaintext is at hand.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from fastapi import HTTPException
+from passlib.hash import bcrypt
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _hasher():
+    return bcrypt.using(rounds=settings.BCRYPT_ROUNDS)
+
+
+# --- run in the worker processes (module-level so they pickle) ---
+def _hash(password: str) -> str:
+    return _hasher().hash(password)
+
+
+def _verify(password: str, password_hash: str) -> bool:
+    try:
+        return bcrypt.verify(password, password_hash)
+    except ValueError:  # malformed/unknown hash in the DB
+        return False
+
+
+def hash_password_sync(password: str) -> str:
+    """In-process hash for scripts (seed, CLI); request paths use hash_password()."""
+    return _hash(password)
+
+
+def needs_rehash(password_hash: str) -> bool:
+    try:
+        return _hasher().needs_update(password_hash)
+    except ValueError:
+        return True
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=429,
+                detail="Too many sign-in requests, retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor(), fn, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self._run(_verify, password, password_hash)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
+async def hash_password(password: str) -> str:
+    return await password_hasher.hash(password)
+
+
+async def verify_password(password: str, password_hash: str) -> bool:
+    return await password_hasher.verify(password, password_hash)
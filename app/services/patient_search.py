@@ -0,0 +1,76 @@
+"""
+Patient lookup shared by /appointments/check and the chat check_appointment turn.
+
+A search term resolves to patient ids in this order:
+  1. internal Patient UUID
+  2. exact MRN (external_patient_id, unique B-tree index)
+  3. fuzzy name match on lower(full_name), ranked by trigram similarity and
+     served by the ix_patients_full_name_trgm GIN index (pg_trgm)
+
+Callers then fetch appointments by patient_id, which hits
+ix_appt_patient_start_time instead of joining through the patients table.
+"""
+from __future__ import annotations
+
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import Select, select, or_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.patient import Patient
+
+# Upper bound on patients a fuzzy name search may expand to
+MAX_NAME_MATCHES = 20
+
+
+def try_parse_uuid(value: str) -> Optional[UUID]:
+    try:
+        return UUID(value)
+    except Exception:
+        return None
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def mrn_stmt(term: str) -> Select:
+    return select(Patient.id).where(Patient.external_patient_id == term)
+
+
+def name_match_stmt(term: str, limit: int = MAX_NAME_MATCHES) -> Select:
+    """
+    Substring OR trigram-similar names, best match first.
+
+    Both predicates are on lower(full_name) so the planner can use the
+    trigram GIN index; `%` honours pg_trgm.similarity_threshold (0.3 default).
+    """
+    needle = term.lower()
+    name = func.lower(Patient.full_name)
+    return (
+        select(Patient.id)
+        .where(or_(name.like(f"%{_escape_like(needle)}%"), name.op("%")(needle)))
+        .order_by(func.similarity(name, needle).desc(), Patient.id)
+        .limit(limit)
+    )
+
+
+async def find_patient_ids(
+    db: AsyncSession, term: str, limit: int = MAX_NAME_MATCHES
+) -> List[UUID]:
+    """Resolve a UUID / MRN / partial name to at most `limit` patient ids."""
+    term = (term or "").strip()
+    if not term:
+        return []
+
+    as_uuid = try_parse_uuid(term)
+    if as_uuid:
+        return [as_uuid]
+
+    by_mrn = (await db.execute(mrn_stmt(term))).scalar_one_or_none()
+    if by_mrn:
+        return [by_mrn]
+
+    result = await db.execute(name_match_stmt(term, limit))
+    return list(result.scalars().all())
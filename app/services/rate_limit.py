@@ -0,0 +1,348 @@
+"""
+Per-client rate limiting and global admission control.
+
+RateLimitMiddleware gives every client a token bucket per rule, so one
+misbehaving kiosk (a stuck touch-screen loop flooding add_message) gets 429s
+with Retry-After while the others keep working. The client key is, in order:
+  - dev:<id>    the device holding the X-Device-Code, if it is a registered,
+                active device in this worker's registry
+  - adm:<sub>   the sub of a valid admin bearer token
+  - sess:<id>   the chat session, for turns on an existing session
+  - ip:<addr>   the peer address (with RATE_LIMIT_TRUST_PROXY, the rightmost
+                X-Forwarded-For hop, the one the trusted proxy appended)
+Kiosks behind one hospital NAT share an IP; a kiosk's chat turns are keyed
+by its session, so the fleet does not share one chat bucket before devices
+are registered. An unknown code counts against the session or address, so
+made-up codes do not each get a fresh bucket. Rules are matched on method + path; the first match wins and anything
+else under API_PREFIX falls back to RATE_LIMIT_DEFAULT. Each rule is
+"tokens per second,burst".
+
+Buckets live in memory per worker (RATE_LIMIT_BACKEND=memory), or in any
+Redis-compatible server (redis) so all workers share them; the Redis update
+is one Lua script, and a Redis error lets the request through.
+
+AdmissionMiddleware caps requests in flight per worker (default: the
+Postgres pool plus overflow) and sheds the excess with 503 + Retry-After
+after waiting at most ADMISSION_QUEUE_TIMEOUT_MS, instead of letting them
+pile up on pool checkout until PG_POOL_TIMEOUT. Health and metrics
+endpoints are exempt from both.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+
+from jose import JWTError, jwt
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import settings
+from app.services.devices import device_registry
+from app.services.metrics import count_shed
+
+logger = logging.getLogger(__name__)
+
+EXEMPT_PATHS = frozenset({"/healthz", "/readyz", "/metrics"})
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    rate: float  # tokens per second
+    burst: float
+    method: Optional[str] = None  # None matches any method
+    pattern: Optional[Pattern[str]] = None  # None matches any path
+
+    def matches(self, method: str, path: str) -> bool:
+        return (self.method is None or self.method == method) and (
+            self.pattern is None or self.pattern.match(path) is not None
+        )
+
+    def session_of(self, path: str) -> Optional[str]:
+        """The chat session id in `path`, for rules whose pattern captures one."""
+        m = self.pattern.match(path) if self.pattern is not None else None
+        session = m.groupdict().get("session") if m else None
+        return session.lower() if session else None
+
+
+def parse_limit(value: str) -> Tuple[float, float]:
+    """Parse "rate,burst" into (tokens per second, bucket size)."""
+    rate, _, burst = value.partition(",")
+    r = float(rate)
+    if r <= 0:
+        raise ValueError(f"Rate limit must be positive: {value!r}")
+    return r, float(burst) if burst else max(r, 1.0)
+
+
+def default_rules(prefix: str) -> List[Rule]:
+    p = re.escape(prefix)
+
+    def rule(name: str, limit: str, method: Optional[str], path: str) -> Rule:
+        rate, burst = parse_limit(limit)
+        return Rule(name, rate, burst, method, re.compile(p + path))
+
+    return [
+        rule("chat_message", settings.RATE_LIMIT_CHAT, "POST",
+             r"/chat/sessions/(?P<session>[0-9a-fA-F]{24})/messages(/stream)?$"),
+        rule("chat_session", settings.RATE_LIMIT_CHAT, "POST", r"/chat/sessions$"),
+        rule("lookup", settings.RATE_LIMIT_LOOKUP, None, r"/(appointments|availability)/"),
+        rule("admin_login", settings.RATE_LIMIT_LOGIN, "POST", r"/admin/auth/login$"),
+        Rule("default", *parse_limit(settings.RATE_LIMIT_DEFAULT)),
+    ]
+
+
+class MemoryBucketStore:
+    """Token buckets in this process; least recently used keys are dropped past max_keys."""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()  # key -> (tokens, at)
+
+    async def take(self, key: str, rate: float, burst: float) -> float:
+        """Take one token; returns 0 if allowed, else seconds until one is available."""
+        now = time.monotonic()
+        tokens, at = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - at) * rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)  # a forgotten key starts again with a full bucket
+        return wait
+
+    def info(self) -> Dict[str, Any]:
+        return {"backend": "memory", "keys": len(self._buckets), "max_keys": self.max_keys}
+
+
+# KEYS[1] bucket; ARGV rate, burst, now (s). Returns the wait in seconds as a string.
+_TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local b = redis.call('HMGET', KEYS[1], 'tokens', 'at')
+local tokens = tonumber(b[1]) or burst
+local at = tonumber(b[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - at) * rate)
+local wait = 0
+if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'at', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+class RedisBucketStore:
+    """Token buckets shared by all workers; any redis.asyncio-compatible client with EVAL works."""
+
+    def __init__(self, client: Any, prefix: str = "rl:"):
+        self._client = client
+        self._prefix = prefix
+        self.errors = 0
+
+    async def take(self, key: str, rate: float, burst: float) -> float:
+        try:
+            wait = await self._client.eval(_TAKE_SCRIPT, 1, self._prefix + key, rate, burst, time.time())
+            return float(wait)
+        except Exception:
+            # Fail open: a Redis blip should not take the kiosks down with it
+            self.errors += 1
+            logger.warning("Rate limit store unavailable; allowing request", exc_info=True)
+            return 0.0
+
+    def info(self) -> Dict[str, Any]:
+        return {"backend": "redis", "errors": self.errors}
+
+
+class RateLimiter:
+    def __init__(self, store, rules: List[Rule]):
+        self.store = store
+        self.rules = rules
+        self.allowed = 0
+        self.limited: Dict[str, int] = {}
+
+    def rule(self, name: str) -> Optional[Rule]:
+        return next((r for r in self.rules if r.name == name), None)
+
+    def match(self, method: str, path: str) -> Optional[Rule]:
+        for rule in self.rules:
+            if rule.matches(method, path):
+                return rule
+        return None
+
+    async def check(self, rule: Rule, key: str) -> float:
+        """0 if the request may proceed, else the Retry-After in seconds."""
+        wait = await self.store.take(f"{rule.name}:{key}", rule.rate, rule.burst)
+        if wait > 0:
+            self.limited[rule.name] = self.limited.get(rule.name, 0) + 1
+            count_shed("rate_limited", rule.name)
+        else:
+            self.allowed += 1
+        return wait
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.store.info(),
+            "rules": {r.name: {"rate": r.rate, "burst": r.burst} for r in self.rules},
+            "allowed": self.allowed,
+            "limited": dict(self.limited),
+        }
+
+
+def client_key(
+    headers: Headers, client: Optional[Tuple[str, int]], session_id: Optional[str] = None
+) -> str:
+    code = headers.get("x-device-code")
+    if code:
+        device = device_registry.known(code)
+        if device is not None:
+            return "dev:" + str(device.id)
+    auth = headers.get("authorization", "")
+    if auth[:7].lower() == "bearer ":
+        try:
+            sub = jwt.decode(auth[7:], settings.JWT_SECRET, algorithms=["HS256"]).get("sub")
+            if sub:
+                return "adm:" + str(sub)
+        except JWTError:
+            pass  # expired or forged: limited by address like anyone else
+    if session_id:
+        return "sess:" + session_id
+    if settings.RATE_LIMIT_TRUST_PROXY:
+        forwarded = headers.get("x-forwarded-for")
+        if forwarded:
+            # Earlier hops are whatever the client sent; only the last is the proxy's
+            return "ip:" + forwarded.split(",")[-1].strip()
+    return "ip:" + (client[0] if client else "unknown")
+
+
+def _exempt(path: str) -> bool:
+    return path in EXEMPT_PATHS or not path.startswith(settings.API_PREFIX)
+
+
+class RateLimitMiddleware:
+    """Pure ASGI; 429 + Retry-After once a client's bucket for the matched rule is empty."""
+
+    def __init__(self, app: ASGIApp, limiter: "RateLimiter"):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or _exempt(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        rule = self.limiter.match(scope["method"], scope["path"])
+        if rule is not None:
+            key = client_key(Headers(scope=scope), scope.get("client"), rule.session_of(scope["path"]))
+            wait = await self.limiter.check(rule, key)
+            if wait > 0:
+                response = JSONResponse(
+                    {"detail": "Too many requests"},
+                    status_code=429,
+                    headers={"Retry-After": str(max(1, math.ceil(wait)))},
+                )
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+class AdmissionController:
+    def __init__(self, limit: int, wait_timeout: float, retry_after: int):
+        self.limit = limit
+        self.wait_timeout = wait_timeout
+        self.retry_after = retry_after
+        self._sem: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.waiting = 0
+        self.peak = 0
+        self.admitted = 0
+        self.shed = 0
+
+    async def acquire(self) -> bool:
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.limit)
+        if self._sem.locked():
+            # Queue briefly (at most `limit` waiters), then shed
+            if self.waiting >= self.limit:
+                self.shed += 1
+                return False
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._sem.acquire(), timeout=self.wait_timeout)
+            except asyncio.TimeoutError:
+                self.shed += 1
+                return False
+            finally:
+                self.waiting -= 1
+        else:
+            await self._sem.acquire()
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._sem.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "peak": self.peak,
+            "admitted": self.admitted,
+            "shed": self.shed,
+        }
+
+
+class AdmissionMiddleware:
+    """Pure ASGI; 503 + Retry-After when the worker already has `limit` requests in flight."""
+
+    def __init__(self, app: ASGIApp, controller: "AdmissionController"):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or _exempt(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        if not await self.controller.acquire():
+            count_shed("overloaded", "admission")
+            response = JSONResponse(
+                {"detail": "Server busy, retry shortly"},
+                status_code=503,
+                headers={"Retry-After": str(self.controller.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release()
+
+
+def build_rate_limiter() -> RateLimiter:
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        from app.db.redis import get_redis
+        store = RedisBucketStore(get_redis())
+    else:
+        store = MemoryBucketStore(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+    return RateLimiter(store, default_rules(settings.API_PREFIX))
+
+
+rate_limiter = build_rate_limiter()
+admission_controller = AdmissionController(
+    limit=settings.MAX_CONCURRENT_REQUESTS or settings.PG_POOL_SIZE + settings.PG_MAX_OVERFLOW,
+    wait_timeout=settings.ADMISSION_QUEUE_TIMEOUT_MS / 1000,
+    retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS,
+)
@@ -1,3 +1,252 @@
-# Placeholder; wire APScheduler/Celery later if needed
-async def schedule_reminders():
-    return True
+"""
+Appointment reminder scheduler.
+
+Each worker runs ReminderScheduler.run() as a background task:
+  - every REMINDER_WINDOW_SECONDS it loads the (id, start_time) of unsent,
+    non-cancelled appointments starting within REMINDER_LEAD_MINUTES plus
+    one window, using the partial index ix_appt_reminder_due, and pushes
+    them onto a heap ordered by due time (start_time - lead)
+  - when reminders fall due it claims up to REMINDER_BATCH_SIZE of them with
+    SELECT ... FOR UPDATE OF appointments SKIP LOCKED, hands them to the
+    sender in one call, and stamps reminder_sent_at on the delivered ones in
+    the same transaction
+
+Several workers can run it at once: rows locked by another worker are
+skipped, and rows already stamped no longer match. Delivery is at least
+once; a reminder that fails or is interrupted stays unsent and is reloaded
+with the next window.
+
+Senders implement `async send(reminders) -> delivered ids`. REMINDER_SENDER
+is "log", "fake" or "package.module:factory".
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import importlib
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional, Protocol, Sequence, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.pg import AsyncSessionLocal
+from app.models.appointment import Appointment, AppointmentStatus
+from app.models.doctor import Doctor
+from app.models.patient import Patient
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Reminder:
+    appointment_id: UUID
+    start_time: datetime
+    patient_name: str
+    patient_phone: Optional[str]
+    doctor_name: str
+    room: Optional[str]
+
+
+class ReminderSender(Protocol):
+    async def send(self, reminders: Sequence[Reminder]) -> Set[UUID]:
+        """Deliver a batch; return the ids that were delivered."""
+        ...
+
+
+class LogSender:
+    """Writes reminders to the log; a stand-in until an SMS gateway is wired."""
+
+    async def send(self, reminders: Sequence[Reminder]) -> Set[UUID]:
+        for r in reminders:
+            logger.info("Reminder for %s (%s): Dr. %s at %s", r.patient_name, r.patient_phone, r.doctor_name, r.start_time)
+        return {r.appointment_id for r in reminders}
+
+
+class FakeSender:
+    """Records batches in memory; ids in `fail` are reported as undelivered."""
+
+    def __init__(self, fail: Iterable[UUID] = ()):
+        self.fail = set(fail)
+        self.batches: List[List[Reminder]] = []
+
+    @property
+    def sent(self) -> List[Reminder]:
+        return [r for batch in self.batches for r in batch if r.appointment_id not in self.fail]
+
+    async def send(self, reminders: Sequence[Reminder]) -> Set[UUID]:
+        self.batches.append(list(reminders))
+        return {r.appointment_id for r in reminders} - self.fail
+
+
+def load_sender(spec: str) -> ReminderSender:
+    if spec == "log":
+        return LogSender()
+    if spec == "fake":
+        return FakeSender()
+    module, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module), attr)()
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class ReminderScheduler:
+    def __init__(
+        self,
+        sender: ReminderSender,
+        lead: timedelta,
+        window: timedelta,
+        batch_size: int,
+    ):
+        self.sender = sender
+        self.lead = lead
+        self.window = window
+        self.batch_size = batch_size
+        self._heap: List[Tuple[datetime, UUID]] = []
+        self._queued: Set[UUID] = set()
+        self._next_load: Optional[datetime] = None
+        self.loaded = 0
+        self.sent = 0
+        self.skipped = 0
+        self.failed = 0
+
+    # --- window loading ---
+    async def load_window(self, db: AsyncSession, now: datetime) -> int:
+        horizon = now + self.lead + self.window
+        rows = await db.execute(
+            select(Appointment.id, Appointment.start_time)
+            .where(
+                Appointment.reminder_sent_at.is_(None),
+                Appointment.start_time > now,
+                Appointment.start_time < horizon,
+                Appointment.status != AppointmentStatus.CANCELLED,
+            )
+        )
+        added = 0
+        for appt_id, start_time in rows:
+            if appt_id in self._queued:
+                continue
+            heapq.heappush(self._heap, (start_time - self.lead, appt_id))
+            self._queued.add(appt_id)
+            added += 1
+        self.loaded += added
+        return added
+
+    # --- dispatch ---
+    def _pop_due(self, now: datetime) -> List[UUID]:
+        due: List[UUID] = []
+        while self._heap and self._heap[0][0] <= now and len(due) < self.batch_size:
+            _, appt_id = heapq.heappop(self._heap)
+            due.append(appt_id)
+        return due
+
+    async def dispatch(self, db: AsyncSession, ids: Sequence[UUID], now: datetime) -> int:
+        """Claim, send and stamp one batch. Returns the number delivered."""
+        try:
+            rows = (
+                await db.execute(
+                    select(
+                        Appointment.id,
+                        Appointment.start_time,
+                        Patient.full_name,
+                        Patient.phone,
+                        Doctor.name,
+                        Doctor.room,
+                    )
+                    .join(Patient, Patient.id == Appointment.patient_id)
+                    .join(Doctor, Doctor.id == Appointment.doctor_id)
+                    .where(
+                        Appointment.id.in_(ids),
+                        Appointment.reminder_sent_at.is_(None),
+                        Appointment.start_time > now,
+                        Appointment.status != AppointmentStatus.CANCELLED,
+                    )
+                    .with_for_update(of=Appointment, skip_locked=True)
+                )
+            ).all()
+            self.skipped += len(ids) - len(rows)
+            if not rows:
+                await db.rollback()
+                return 0
+
+            delivered = await self.sender.send([Reminder(*r) for r in rows])
+            if delivered:
+                await db.execute(
+                    update(Appointment)
+                    .where(Appointment.id.in_(delivered))
+                    .values(reminder_sent_at=now)
+                    .execution_options(synchronize_session=False)
+                )
+            await db.commit()
+            self.sent += len(delivered)
+            self.failed += len(rows) - len(delivered)
+            return len(delivered)
+        finally:
+            # Undelivered/skipped ids become eligible again on the next window load
+            self._queued.difference_update(ids)
+
+    async def run_once(self, now: Optional[datetime] = None) -> None:
+        now = now or _utcnow()
+        if self._next_load is None or now >= self._next_load:
+            async with AsyncSessionLocal() as db:
+                await self.load_window(db, now)
+            self._next_load = now + self.window
+        while True:
+            ids = self._pop_due(now)
+            if not ids:
+                break
+            async with AsyncSessionLocal() as db:
+                await self.dispatch(db, ids, now)
+
+    def _sleep_for(self) -> float:
+        now = _utcnow()
+        wake = self._next_load or now
+        if self._heap:
+            wake = min(wake, self._heap[0][0])
+        return max(0.0, min((wake - now).total_seconds(), self.window.total_seconds()))
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Reminder scheduler iteration failed")
+                self._next_load = None  # reload the window after a DB error
+                await asyncio.sleep(5)
+            await asyncio.sleep(self._sleep_for())
+
+    def stats(self) -> dict:
+        return {
+            "queued": len(self._heap),
+            "next_due": self._heap[0][0] if self._heap else None,
+            "loaded": self.loaded,
+            "sent": self.sent,
+            "skipped": self.skipped,
+            "failed": self.failed,
+        }
+
+
+def build_scheduler(sender: Optional[ReminderSender] = None) -> ReminderScheduler:
+    return ReminderScheduler(
+        sender=sender or load_sender(settings.REMINDER_SENDER),
+        lead=timedelta(minutes=settings.REMINDER_LEAD_MINUTES),
+        window=timedelta(seconds=settings.REMINDER_WINDOW_SECONDS),
+        batch_size=settings.REMINDER_BATCH_SIZE,
+    )
+
+
+reminder_scheduler: Optional[ReminderScheduler] = None
+
+
+async def schedule_reminders() -> ReminderScheduler:
+    """Build the process-wide scheduler (called from app startup); run() it as a task."""
+    global reminder_scheduler
+    if reminder_scheduler is None:
+        reminder_scheduler = build_scheduler()
+    return reminder_scheduler
@@ -0,0 +1,114 @@
+"""
+Usage rollups behind /admin/reports/usage.
+
+appointment_daily_rollups holds appointment counts per (day, department,
+status); usage_counters holds table totals. A background refresher rebuilds
+a rolling window of days (ROLLUP_WINDOW_PAST_DAYS back to
+ROLLUP_WINDOW_FUTURE_DAYS ahead) every ROLLUP_REFRESH_SECONDS, so the report
+reads a few hundred summary rows instead of scanning appointments.
+
+Days outside the window keep their last computed counts; backfill or repair
+them with `python scripts/refresh_rollups.py --start ... --end ...`.
+Only one worker refreshes at a time (transaction-scoped advisory lock).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import Date, String, cast, delete, func, insert, literal, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.pg import AsyncSessionLocal
+from app.models.appointment import Appointment
+from app.models.doctor import Doctor
+from app.models.patient import Patient
+from app.models.usage_rollup import AppointmentDailyRollup, UsageCounter
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary constant for pg_try_advisory_xact_lock
+_LOCK_KEY = 0x524F4C4C  # "ROLL"
+
+
+def default_window(today: Optional[date] = None) -> Tuple[date, date]:
+    today = today or date.today()
+    return (
+        today - timedelta(days=settings.ROLLUP_WINDOW_PAST_DAYS),
+        today + timedelta(days=settings.ROLLUP_WINDOW_FUTURE_DAYS),
+    )
+
+
+def _statements(start_day: date, end_day: date, counters: bool) -> List:
+    tz = ZoneInfo(settings.REPORT_TIMEZONE)
+    start_ts = datetime.combine(start_day, time.min, tzinfo=tz)
+    end_ts = datetime.combine(end_day + timedelta(days=1), time.min, tzinfo=tz)
+    day = cast(func.timezone(settings.REPORT_TIMEZONE, Appointment.start_time), Date)
+
+    grouped = (
+        select(day, Doctor.department_id, cast(Appointment.status, String), func.count())
+        .join(Doctor, Doctor.id == Appointment.doctor_id)
+        .where(Appointment.start_time >= start_ts, Appointment.start_time < end_ts)
+        .group_by(day, Doctor.department_id, Appointment.status)
+    )
+    stmts = [
+        delete(AppointmentDailyRollup).where(AppointmentDailyRollup.day.between(start_day, end_day)),
+        insert(AppointmentDailyRollup).from_select(
+            ["day", "department_id", "status", "count"], grouped
+        ),
+    ]
+    if counters:
+        for name, counted in (("patients", Patient.id), ("doctors", Doctor.id)):
+            upsert = pg_insert(UsageCounter).from_select(
+                ["name", "value"], select(literal(name), func.count(counted))
+            )
+            stmts.append(
+                upsert.on_conflict_do_update(
+                    index_elements=[UsageCounter.name],
+                    set_={"value": upsert.excluded.value, "refreshed_at": func.now()},
+                )
+            )
+    return stmts
+
+
+_try_lock = text("SELECT pg_try_advisory_xact_lock(:k)").bindparams(k=_LOCK_KEY)
+
+
+def refresh_rollups(db: Session, start_day: date, end_day: date, counters: bool = True) -> bool:
+    """Recompute [start_day, end_day] in one transaction. False if another worker holds the lock."""
+    if not db.execute(_try_lock).scalar():
+        db.rollback()
+        return False
+    for stmt in _statements(start_day, end_day, counters):
+        db.execute(stmt)
+    db.commit()
+    return True
+
+
+async def refresh_rollups_async(
+    db: AsyncSession, start_day: date, end_day: date, counters: bool = True
+) -> bool:
+    if not (await db.execute(_try_lock)).scalar():
+        await db.rollback()
+        return False
+    for stmt in _statements(start_day, end_day, counters):
+        await db.execute(stmt)
+    await db.commit()
+    return True
+
+
+async def refresh_rollups_forever(interval: float) -> None:
+    while True:
+        try:
+            start_day, end_day = default_window()
+            async with AsyncSessionLocal() as db:
+                await refresh_rollups_async(db, start_day, end_day)
+        except Exception:
+            logger.exception("Usage rollup refresh failed")
+        await asyncio.sleep(interval)
@@ -0,0 +1,124 @@
+"""
+Cache of active chat sessions, keyed by the session ObjectId.
+
+Only what the chat turn needs is cached: `status`, `patientRef.token` and
+`patientRef.patientIds` (the patients that token resolved to).
+Routers write through on start/attach and invalidate on end, so a turn on a
+cached session skips the chat_sessions read. A cached "active" can be stale
+(ended on another worker within the TTL), so the turn still records its
+intent with a status filter; that write runs concurrently with the
+appointment lookup and is awaited before the messages are inserted, so a
+hit saves the round trip a miss spends on find_one_and_update.
+
+Backends:
+  - memory: per-process bounded LRU/TTL (default, single worker)
+  - redis:  shared across workers; any redis.asyncio-compatible client works,
+            e.g. fakeredis.aioredis.FakeRedis for local testing
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Optional
+
+from bson import ObjectId
+
+from app.config import settings
+from app.services.cache import TTLCache
+
+
+def _state_of(sess: dict) -> dict:
+    pr = sess.get("patientRef") or {}
+    if not isinstance(pr, dict):
+        pr = {}
+    ref = None
+    if pr.get("token"):
+        ref = {"token": pr["token"]}
+        if pr.get("patientIds"):
+            ref["patientIds"] = [str(i) for i in pr["patientIds"]]
+    return {"status": sess.get("status", "active"), "patientRef": ref}
+
+
+class MemorySessionBackend:
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: str) -> Optional[dict]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, state: dict) -> None:
+        self._cache.set(key, state)
+
+    async def delete(self, key: str) -> None:
+        self._cache.pop(key)
+
+    def info(self) -> Dict[str, Any]:
+        stats = self._cache.stats()
+        return {"backend": "memory", "size": stats["size"], "maxsize": stats["maxsize"],
+                "evictions": stats["evictions"]}
+
+
+class RedisSessionBackend:
+    def __init__(self, client: Any, ttl: int, prefix: str = "chat:sess:"):
+        self._client = client
+        self._ttl = ttl
+        self._prefix = prefix
+
+    async def get(self, key: str) -> Optional[dict]:
+        raw = await self._client.get(self._prefix + key)
+        return json.loads(raw) if raw else None
+
+    async def set(self, key: str, state: dict) -> None:
+        await self._client.set(self._prefix + key, json.dumps(state), ex=self._ttl)
+
+    async def delete(self, key: str) -> None:
+        await self._client.delete(self._prefix + key)
+
+    def info(self) -> Dict[str, Any]:
+        return {"backend": "redis"}
+
+
+class SessionCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, sid: ObjectId) -> Optional[dict]:
+        state = await self.backend.get(str(sid))
+        if state is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return state
+
+    async def put(self, sid: ObjectId, sess: dict) -> dict:
+        state = _state_of(sess)
+        await self.backend.set(str(sid), state)
+        return state
+
+    async def invalidate(self, sid: ObjectId) -> None:
+        await self.backend.delete(str(sid))
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            **self.backend.info(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+def build_session_cache() -> SessionCache:
+    if settings.SESSION_CACHE_BACKEND == "redis":
+        from app.db.redis import get_redis
+        return SessionCache(RedisSessionBackend(get_redis(), ttl=settings.SESSION_CACHE_TTL_SECONDS))
+    return SessionCache(
+        MemorySessionBackend(
+            maxsize=settings.SESSION_CACHE_MAX_ENTRIES,
+            ttl=settings.SESSION_CACHE_TTL_SECONDS,
+        )
+    )
+
+
+session_cache = build_session_cache()
@@ -0,0 +1,50 @@
+import logging
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Dict, Iterator
+
+logger = logging.getLogger("app.chat.turn")
+
+
+class TurnTimer:
+    """
+    Per-turn latency breakdown for the chat hot path.
+
+    Usage:
+        timer = TurnTimer()
+        with timer.phase("session"):
+            await ...
+        response.headers["Server-Timing"] = timer.server_timing()
+        timer.log(intent=intent)
+
+    Phases with the same name accumulate. The Server-Timing header shows up
+    in browser devtools on the kiosk, the log line is for aggregate analysis.
+    """
+
+    def __init__(self) -> None:
+        self._t0 = perf_counter()
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        t = perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + (perf_counter() - t) * 1000
+
+    @property
+    def total_ms(self) -> float:
+        return (perf_counter() - self._t0) * 1000
+
+    def server_timing(self) -> str:
+        parts = [f"{name};dur={ms:.1f}" for name, ms in self.phases.items()]
+        parts.append(f"total;dur={self.total_ms:.1f}")
+        return ", ".join(parts)
+
+    def log(self, **fields) -> None:
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        phases = " ".join(f"{name}={ms:.1f}ms" for name, ms in self.phases.items())
+        extra = " ".join(f"{k}={v}" for k, v in fields.items())
+        logger.info("chat turn total=%.1fms %s %s", self.total_ms, phases, extra)
@@ -0,0 +1,116 @@
+"""
+Concurrent chat-lookup throughput: blocking Session vs AsyncSession.
+
+Simulates many kiosks sending a `check_appointment` turn at the same time on a
+single event loop (one uvicorn worker). The "sync" mode runs the lookup through
+the sync Session inside a coroutine, like add_message did before it moved to
+get_async_db; the "async" mode awaits the same statement on the async engine.
+
+    python scripts/bench_async_db.py --concurrency 50 --turns 500 --token "John"
+    python scripts/bench_async_db.py --latency-ms 50   # simulate a slow lookup
+
+Needs a reachable Postgres (see .env) with some seeded data (scripts/seed.py).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# --- ensure "app" is importable when running this file directly ---
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import text
+
+from app.db.pg import SessionLocal, AsyncSessionLocal, engine, async_engine
+from app.routers import chat
+from app.routers.chat import _appointments_for_patients_stmt, _lookup_appointments
+from app.services.appointment_cache import AppointmentLookupCache
+from app.services.appointment_queries import card_dicts
+from app.services.patient_search import mrn_stmt, name_match_stmt
+
+
+def _sleep_sql(latency_ms: int):
+    return text("SELECT pg_sleep(:s)").bindparams(s=latency_ms / 1000.0)
+
+
+async def turn_sync(token: str, latency_ms: int) -> float:
+    t0 = time.perf_counter()
+    db = SessionLocal()
+    try:
+        if latency_ms:
+            db.execute(_sleep_sql(latency_ms))
+        ids = db.execute(mrn_stmt(token)).scalars().all() or db.execute(name_match_stmt(token)).scalars().all()
+        if ids:
+            rows = db.execute(_appointments_for_patients_stmt(ids, True, 5)).all()
+            card_dicts(rows)
+    finally:
+        db.close()
+    return time.perf_counter() - t0
+
+
+async def turn_async(token: str, latency_ms: int) -> float:
+    t0 = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        if latency_ms:
+            await db.execute(_sleep_sql(latency_ms))
+        [item async for item in _lookup_appointments(db, token, [])]
+    return time.perf_counter() - t0
+
+
+async def run(mode: str, turns: int, concurrency: int, token: str, latency_ms: int) -> None:
+    fn = turn_sync if mode == "sync" else turn_async
+    sem = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one() -> None:
+        async with sem:
+            latencies.append(await fn(token, latency_ms))
+
+    # warm the pool so connection setup is not part of the measurement
+    await fn(token, 0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(turns)))
+    elapsed = time.perf_counter() - t0
+
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)] * 1000
+    print(
+        f"{mode:>5}: {turns} turns in {elapsed:.2f}s "
+        f"-> {turns / elapsed:,.0f} turns/s  p50={p50:.1f}ms  p99={p99:.1f}ms"
+    )
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--turns", type=int, default=500)
+    ap.add_argument("--concurrency", type=int, default=50)
+    ap.add_argument("--token", default="MRN123456", help="patient id / MRN / name to look up")
+    ap.add_argument("--latency-ms", type=int, default=0, help="extra pg_sleep per lookup")
+    ap.add_argument("--mode", choices=["sync", "async", "both"], default="both")
+    args = ap.parse_args()
+
+    # APP_ENV=dev turns on SQL echo; keep logging out of the measurement
+    engine.echo = False
+    async_engine.sync_engine.echo = False
+    # Measure the database, not the chat lookup cache (maxsize 0 keeps nothing)
+    chat.appointment_lookup_cache = AppointmentLookupCache(maxsize=0, ttl=0)
+
+    modes = ["sync", "async"] if args.mode == "both" else [args.mode]
+    try:
+        for mode in modes:
+            await run(mode, args.turns, args.concurrency, args.token, args.latency_ms)
+    finally:
+        engine.dispose()
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
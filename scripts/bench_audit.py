@@ -0,0 +1,106 @@
+"""
+Admin write throughput with auditing: none vs synchronous vs batched.
+
+Each "admin write" is a committed UPDATE of one department (the value is
+left unchanged) followed by log_action(), run from a thread pool like sync
+admin routes are. Modes:
+
+  none     - no audit row
+  sync     - log_action(durable=True): audit row added and committed inline
+  batched  - log_action(): queued, bulk-inserted by the background AuditWriter
+
+Needs a reachable Postgres (see .env) with at least one department
+(scripts/seed.py). Benchmark audit rows are deleted afterwards.
+
+    python scripts/bench_audit.py --writes 2000 --concurrency 8
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# --- ensure "app" is importable when running this file directly ---
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import delete, select, update
+
+from app.db.pg import SessionLocal, async_engine
+from app.models.audit_log import AuditLog
+from app.models.department import Department
+from app.services.audit import audit_writer, log_action
+
+ACTION = "BENCH_WRITE"
+
+
+def admin_write(dep_id, mode: str) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(Department).where(Department.id == dep_id).values(location_note=Department.location_note)
+        )
+        db.commit()
+        if mode != "none":
+            log_action(db, "SYSTEM", ACTION, meta_json='{"bench": true}', durable=(mode == "sync"))
+    finally:
+        db.close()
+
+
+async def run(mode: str, dep_id, writes: int, concurrency: int) -> None:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with sem:
+            await asyncio.to_thread(admin_write, dep_id, mode)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(writes)))
+    elapsed = time.perf_counter() - t0
+    t1 = time.perf_counter()
+    await audit_writer.flush()
+    drain = time.perf_counter() - t1
+    print(
+        f"{mode:>8}: {writes} writes in {elapsed:.2f}s -> {writes / elapsed:,.0f} writes/s"
+        + (f"  (drained queue in {drain * 1000:.0f}ms)" if mode == "batched" else "")
+    )
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--writes", type=int, default=2000)
+    ap.add_argument("--concurrency", type=int, default=8, help="threadpool workers issuing writes")
+    args = ap.parse_args()
+
+    db = SessionLocal()
+    try:
+        dep_id = db.execute(select(Department.id).limit(1)).scalar()
+    finally:
+        db.close()
+    if dep_id is None:
+        sys.exit("No departments found; run scripts/seed.py first")
+
+    writer = asyncio.create_task(audit_writer.run_forever())
+    await asyncio.sleep(0)  # let the writer register its loop
+    try:
+        for mode in ("none", "sync", "batched"):
+            await run(mode, dep_id, args.writes, args.concurrency)
+        print(audit_writer.stats())
+    finally:
+        writer.cancel()
+        await asyncio.gather(writer, return_exceptions=True)
+        await audit_writer.flush()
+        db = SessionLocal()
+        try:
+            db.execute(delete(AuditLog).where(AuditLog.action == ACTION))
+            db.commit()
+        finally:
+            db.close()
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+"""
+Department-wide "next available" over synthetic bookings.
+
+Builds merged busy intervals for N doctors (as AvailabilityCache holds them
+after a load) and times the free-slot walk for every doctor, i.e. the work
+GET /availability/departments/{id}/next does on a warm cache. Also times the
+merge itself, which is what a cache miss adds on top of the query. No
+database needed.
+
+    python scripts/bench_availability.py --doctors 50 --bookings-per-day 24
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# --- ensure "app" is importable when running this file directly ---
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.services.availability import BusyIntervals, ClinicHours, free_slots
+
+
+def make_bookings(rnd: random.Random, hours: ClinicHours, start: datetime, days: int,
+                  per_day: int, fill: float) -> list[tuple[datetime, datetime]]:
+    """`per_day` 15-20 minute bookings per open day; `fill` of days are fully booked."""
+    out = []
+    for anchor, ws, we in hours.windows(start, start + timedelta(days=days)):
+        if rnd.random() < fill:
+            out.append((ws, we))
+            continue
+        span = int((we - ws).total_seconds() // 60)
+        for _ in range(per_day):
+            s = ws + timedelta(minutes=rnd.randrange(0, max(span - 15, 1), 5))
+            out.append((s, s + timedelta(minutes=rnd.choice((15, 20)))))
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--doctors", type=int, default=50)
+    ap.add_argument("--days", type=int, default=14)
+    ap.add_argument("--bookings-per-day", type=int, default=24)
+    ap.add_argument("--fully-booked", type=float, default=0.5, help="Share of days with no free slot")
+    ap.add_argument("--repeat", type=int, default=200)
+    args = ap.parse_args()
+
+    rnd = random.Random(7)
+    hours = ClinicHours.from_settings()
+    now = datetime.now(timezone.utc)
+    hi = now + timedelta(days=args.days)
+    raw = [make_bookings(rnd, hours, now, args.days, args.bookings_per_day, args.fully_booked)
+           for _ in range(args.doctors)]
+
+    t0 = time.perf_counter()
+    busy = [BusyIntervals.build(now, hi, intervals) for intervals in raw]
+    merge_ms = (time.perf_counter() - t0) * 1000
+    bookings = sum(len(r) for r in raw)
+    print(f"merged {bookings} bookings for {args.doctors} doctors in {merge_ms:.2f}ms")
+
+    step = timedelta(minutes=15)
+    best = float("inf")
+    found = 0
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        found = sum(bool(free_slots(b, hours, now, hi, step, step, 1)) for b in busy)
+        best = min(best, time.perf_counter() - t0)
+    print(f"next available for {args.doctors} doctors: {best * 1000:.3f}ms ({found} with a free slot)")
+
+    t0 = time.perf_counter()
+    total = sum(len(free_slots(b, hours, now, hi, step, step, 10_000)) for b in busy)
+    print(f"all free slots over {args.days} days: {total} in {(time.perf_counter() - t0) * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
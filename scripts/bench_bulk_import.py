@@ -0,0 +1,139 @@
+"""
+Bulk patient import at 1M rows: COPY + staged upsert vs the row-by-row ORM loop.
+
+Writes a synthetic CSV extract, then loads it into `bench_import.patients`
+(same columns and indexes as public.patients) in a scratch schema:
+
+  1. bulk import into an empty table            (all inserts)
+  2. the same file again                        (all unchanged, no rewrites)
+  3. the file with --changed of the rows edited  (mostly unchanged, some updates)
+  4. seed.py-style ORM loop (query, then add) on --orm-rows rows, extrapolated
+
+The scratch schema and the temp file are removed afterwards unless --keep.
+
+    python scripts/bench_bulk_import.py --rows 1000000 --orm-rows 20000
+
+Needs a reachable Postgres (see .env).
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# --- ensure "app" is importable when running this file directly ---
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.patient import Patient
+from app.services.bulk_import import run_import, text_stream
+
+SCHEMA = "bench_import"
+
+
+def write_extract(path: Path, rows: int, changed: float, seed: int = 7) -> None:
+    rnd = random.Random(seed)
+    edit = random.Random(seed + 1)
+    with path.open("w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["external_patient_id", "full_name", "dob", "phone", "note"])
+        for i in range(rows):
+            phone = f"09{rnd.randrange(10**8):08d}"
+            if changed and edit.random() < changed:
+                phone = phone[:-1] + "x"
+            w.writerow([
+                f"MRN{i:08d}",
+                f"Patient {i} {rnd.choice(['Smith', 'Tan', 'Nguyen', 'Lee', 'Soe'])}",
+                f"{1940 + rnd.randrange(80)}-{1 + rnd.randrange(12):02d}-{1 + rnd.randrange(28):02d}",
+                phone,
+                "",
+            ])
+
+
+def bulk(engine, path: Path, label: str, chunk_size: int) -> None:
+    t0 = time.perf_counter()
+    with engine.connect() as conn, path.open("rb") as f:
+        r = run_import(conn, text_stream(f), "patients", "csv", chunk_size)
+    dt = time.perf_counter() - t0
+    print(
+        f"{label:>22}: {r.read:,} rows in {dt:6.1f}s -> {r.read / dt:9,.0f} rows/s  "
+        f"(ins {r.inserted:,} upd {r.updated:,} same {r.unchanged:,} rej {r.rejected:,})"
+    )
+
+
+def orm_loop(engine, path: Path, n: int, total: int) -> None:
+    # What seed.py does per row: existence query, then add; one commit at the end
+    with engine.begin() as conn:
+        conn.execute(text(f"TRUNCATE {SCHEMA}.patients"))
+    t0 = time.perf_counter()
+    with Session(engine) as db, path.open(newline="") as f:
+        for i, rec in enumerate(csv.DictReader(f)):
+            if i >= n:
+                break
+            found = db.query(Patient).filter(Patient.external_patient_id == rec["external_patient_id"]).first()
+            if not found:
+                db.add(Patient(
+                    external_patient_id=rec["external_patient_id"], full_name=rec["full_name"],
+                    dob=rec["dob"], phone=rec["phone"],
+                ))
+        db.commit()
+    dt = time.perf_counter() - t0
+    print(
+        f"{'ORM row-by-row':>22}: {n:,} rows in {dt:6.1f}s -> {n / dt:9,.0f} rows/s  "
+        f"(~{total / (n / dt) / 60:.0f} min for {total:,})"
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--changed", type=float, default=0.05, help="fraction of rows edited for run 3")
+    ap.add_argument("--orm-rows", type=int, default=20_000, help="0 skips the ORM baseline")
+    ap.add_argument("--chunk-size", type=int, default=settings.IMPORT_CHUNK_SIZE)
+    ap.add_argument("--keep", action="store_true", help="keep the bench_import schema and extracts")
+    args = ap.parse_args()
+
+    # Unqualified "patients" in the importer and ORM resolves to the scratch table
+    engine = create_engine(
+        settings.postgres_url,
+        connect_args={"options": f"-csearch_path={SCHEMA},public"},
+    )
+    tmp = Path(tempfile.mkdtemp(prefix="bench_import_"))
+    original, edited = tmp / "patients.csv", tmp / "patients_edited.csv"
+    try:
+        t0 = time.perf_counter()
+        write_extract(original, args.rows, 0)
+        write_extract(edited, args.rows, args.changed)
+        print(f"wrote extracts ({original.stat().st_size / 1e6:.0f} MB each) in {time.perf_counter() - t0:.1f}s")
+
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+            conn.execute(text(f"CREATE TABLE {SCHEMA}.patients (LIKE public.patients INCLUDING ALL)"))
+
+        bulk(engine, original, "bulk, empty table", args.chunk_size)
+        bulk(engine, original, "bulk, same file", args.chunk_size)
+        bulk(engine, edited, f"bulk, {args.changed:.0%} changed", args.chunk_size)
+        if args.orm_rows:
+            orm_loop(engine, original, args.orm_rows, args.rows)
+    finally:
+        if not args.keep:
+            with engine.begin() as conn:
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            for p in (original, edited):
+                p.unlink(missing_ok=True)
+            tmp.rmdir()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
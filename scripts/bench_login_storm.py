@@ -0,0 +1,111 @@
+"""
+Latency of ordinary sync endpoints during a login storm.
+
+Sync FastAPI endpoints run on the shared anyio threadpool (40 threads by
+default). This drives a steady stream of short "directory-like" handlers
+through that pool while a burst of logins runs bcrypt, either:
+
+  inline    - bcrypt.verify on the threadpool (the old admin_login)
+  pool      - PasswordHasher: dedicated processes, bounded queue, 429s
+
+and reports p50/p99 of the short handlers plus login outcomes. No database
+or server needed.
+
+    python scripts/bench_login_storm.py --logins 200 --requests 2000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# --- ensure "app" is importable when running this file directly ---
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import anyio.to_thread
+from fastapi import HTTPException
+from passlib.hash import bcrypt
+
+from app.services.passwords import PasswordHasher, _verify
+
+
+def short_handler() -> None:
+    # Stand-in for a cached directory/appointment read: a little CPU, a little I/O
+    sum(range(2_000))
+    time.sleep(0.002)
+
+
+def pct(samples: list[float], p: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p))] * 1000
+
+
+async def run(mode: str, args, password_hash: str) -> None:
+    hasher = PasswordHasher(workers=args.workers, max_pending=args.max_pending)
+    latencies: list[float] = []
+    outcomes = {"ok": 0, "429": 0}
+
+    async def login() -> None:
+        try:
+            if mode == "inline":
+                await anyio.to_thread.run_sync(_verify, "admin123", password_hash)
+            elif mode == "pool":
+                await hasher.verify("admin123", password_hash)
+            outcomes["ok"] += 1
+        except HTTPException:
+            outcomes["429"] += 1
+
+    async def traffic() -> None:
+        interval = 1 / args.rps
+        tasks = []
+
+        async def one() -> None:
+            t0 = time.perf_counter()
+            await anyio.to_thread.run_sync(short_handler)
+            latencies.append(time.perf_counter() - t0)
+
+        for _ in range(args.requests):
+            tasks.append(asyncio.create_task(one()))
+            await asyncio.sleep(interval)
+        await asyncio.gather(*tasks)
+
+    if mode == "pool":
+        await hasher.verify("admin123", password_hash)  # warm the worker processes
+
+    t0 = time.perf_counter()
+    storm = [asyncio.create_task(login()) for _ in range(args.logins if mode != "none" else 0)]
+    await traffic()
+    await asyncio.gather(*storm)
+    elapsed = time.perf_counter() - t0
+    hasher.shutdown()
+
+    print(
+        f"{mode:>7}: p50 {pct(latencies, 0.50):7.1f}ms  p99 {pct(latencies, 0.99):7.1f}ms  "
+        f"max {max(latencies) * 1000:7.1f}ms  mean {statistics.mean(latencies) * 1000:6.1f}ms  "
+        f"logins ok={outcomes['ok']} 429={outcomes['429']}  ({elapsed:.1f}s)"
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--logins", type=int, default=200, help="concurrent logins in the storm")
+    ap.add_argument("--requests", type=int, default=2000, help="short requests during the storm")
+    ap.add_argument("--rps", type=float, default=400, help="arrival rate of short requests")
+    ap.add_argument("--workers", type=int, default=2, help="hashing processes (pool mode)")
+    ap.add_argument("--max-pending", type=int, default=16, help="queue bound (pool mode)")
+    ap.add_argument("--rounds", type=int, default=12)
+    args = ap.parse_args()
+
+    password_hash = bcrypt.using(rounds=args.rounds).hash("admin123")
+
+    for mode in ("none", "inline", "pool"):
+        asyncio.run(run(mode, args, password_hash))
+
+
+if __name__ == "__main__":
+    main()
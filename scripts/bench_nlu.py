@@ -0,0 +1,106 @@
+"""
+Intent detection micro-benchmark over 10k utterances.
+
+Compares the old linear keyword scan with the compiled intent engine, with
+and without a set of synthetic FAQ intents loaded. No database needed.
+
+    python scripts/bench_nlu.py --utterances 10000 --faqs 200
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# --- ensure "app" is importable when running this file directly ---
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.services.nlu import IntentEngine
+
+
+def legacy_detect_intent(text: str) -> str:
+    # The keyword scan detect_intent used before the compiled engine
+    t = (text or "").lower()
+    if any(k in t for k in ["where", "direction", "locate", "how to get"]):
+        return "ask_directions"
+    if any(k in t for k in ["open", "hour", "time"]):
+        return "clinic_hours"
+    if any(k in t for k in ["check my appointment", "my appointment", "appointment status", "check appointment"]):
+        return "check_appointment"
+    return "fallback"
+
+
+TOPICS = ["parking", "visiting", "pharmacy", "billing", "insurance", "canteen", "wifi", "xray",
+          "laboratory", "vaccination", "blood test", "wheelchair", "lost item", "prayer room"]
+
+TEMPLATES = [
+    "what time is my appointment",
+    "where is the {topic} counter",
+    "is the {topic} open on sunday",
+    "how much is {topic}",
+    "can you check my appointment please",
+    "I need help with {topic}",
+    "ID: MRN{n:06d}",
+    "hello there",
+    "how to get to the {topic} desk",
+    "what are the {topic} hours",
+]
+
+
+def make_faqs(n: int) -> list[tuple[str, str, str]]:
+    faqs = []
+    for i in range(n):
+        topic = TOPICS[i % len(TOPICS)]
+        key = f"{topic.replace(' ', '_')}_{i}"
+        faqs.append((key, f"How does {topic} service {i} work?", f"Answer about {topic} {i}."))
+    return faqs
+
+
+def make_utterances(n: int) -> list[str]:
+    rnd = random.Random(7)
+    return [
+        rnd.choice(TEMPLATES).format(topic=rnd.choice(TOPICS), n=rnd.randrange(1_000_000))
+        for _ in range(n)
+    ]
+
+
+def bench(label: str, fn, utterances: list[str], repeat: int) -> None:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for u in utterances:
+            fn(u)
+        best = min(best, time.perf_counter() - t0)
+    per = best / len(utterances) * 1e6
+    print(f"{label:>28}: {best * 1000:8.1f}ms total  {per:6.2f}us/utterance")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--utterances", type=int, default=10_000)
+    ap.add_argument("--faqs", type=int, default=200)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    utterances = make_utterances(args.utterances)
+
+    builtin = IntentEngine()
+    with_faqs = IntentEngine()
+    t0 = time.perf_counter()
+    with_faqs.set_faqs(make_faqs(args.faqs))
+    print(f"compiled {args.faqs} FAQ intents in {(time.perf_counter() - t0) * 1000:.1f}ms")
+
+    bench("legacy keyword scan", legacy_detect_intent, utterances, args.repeat)
+    bench("compiled (built-ins)", builtin.detect, utterances, args.repeat)
+    bench(f"compiled (+{args.faqs} FAQs)", with_faqs.detect, utterances, args.repeat)
+
+    changed = sum(legacy_detect_intent(u) != builtin.detect(u) for u in utterances)
+    print(f"{changed} of {len(utterances)} utterances routed differently from the legacy scan")
+
+
+if __name__ == "__main__":
+    main()
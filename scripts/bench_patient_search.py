@@ -0,0 +1,153 @@
+"""
+Patient name search on a synthetic 500k-patient table: B-tree only vs pg_trgm GIN.
+
+Builds `bench_trgm.patients` (same columns as public.patients) in a scratch
+schema, fills it with synthetic MRNs and names, then runs the exact queries
+from app/services/patient_search.py against it twice: once with only the
+B-tree indexes the init schema had, once with ix_patients_full_name_trgm.
+The scratch schema is dropped afterwards unless --keep is given.
+
+    python scripts/bench_patient_search.py --rows 500000 --queries 200
+
+Needs a reachable Postgres (see .env) where pg_trgm can be created.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# --- ensure "app" is importable when running this file directly ---
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.config import settings
+from app.services.patient_search import find_patient_ids, name_match_stmt
+
+SCHEMA = "bench_trgm"
+
+FIRST = ["john", "jane", "michael", "sarah", "david", "emily", "daniel", "olivia", "james", "sophia",
+         "aung", "thiha", "su", "min", "kyaw", "hnin", "zaw", "ei", "nay", "wai"]
+LAST = ["smith", "johnson", "nguyen", "tan", "lee", "garcia", "brown", "wilson", "martin", "lim",
+        "soe", "htet", "win", "oo", "lwin", "myint", "naing", "aye", "thant", "maung"]
+
+
+def _terms(n: int) -> list[str]:
+    rnd = random.Random(42)
+    out: list[str] = []
+    for i in range(n):
+        kind = i % 4
+        if kind == 0:
+            out.append(f"{rnd.choice(FIRST)} {rnd.choice(LAST)}")       # full name
+        elif kind == 1:
+            out.append(rnd.choice(LAST)[:4])                             # fragment
+        elif kind == 2:
+            name = rnd.choice(FIRST) + " " + rnd.choice(LAST)            # typo
+            j = rnd.randrange(1, len(name) - 1)
+            out.append(name[:j] + name[j + 1:])
+        else:
+            out.append(f"MRN{rnd.randrange(1, 500_000):07d}")           # exact MRN
+    return out
+
+
+async def build(engine, rows: int) -> None:
+    first = "ARRAY[" + ",".join(f"'{n.title()}'" for n in FIRST) + "]"
+    last = "ARRAY[" + ",".join(f"'{n.title()}'" for n in LAST) + "]"
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm SCHEMA public"))
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        await conn.execute(text(f"CREATE TABLE {SCHEMA}.patients (LIKE public.patients INCLUDING DEFAULTS)"))
+        t0 = time.perf_counter()
+        await conn.execute(
+            text(
+                f"""
+                INSERT INTO {SCHEMA}.patients (id, external_patient_id, full_name, created_at)
+                SELECT gen_random_uuid(),
+                       'MRN' || lpad(i::text, 7, '0'),
+                       {first}[1 + floor(random() * 20)::int] || ' ' ||
+                       {last}[1 + floor(random() * 20)::int] || ' ' || i::text,
+                       now()
+                FROM generate_series(1, :n) AS i
+                """
+            ),
+            {"n": rows},
+        )
+        await conn.execute(text(f"ALTER TABLE {SCHEMA}.patients ADD PRIMARY KEY (id)"))
+        await conn.execute(text(f"CREATE UNIQUE INDEX ON {SCHEMA}.patients (external_patient_id)"))
+        await conn.execute(text(f"CREATE INDEX ON {SCHEMA}.patients (full_name)"))
+        await conn.execute(text(f"ANALYZE {SCHEMA}.patients"))
+        print(f"built {rows:,} patients in {time.perf_counter() - t0:.1f}s")
+
+
+async def add_trgm_index(engine) -> None:
+    t0 = time.perf_counter()
+    async with engine.begin() as conn:
+        await conn.execute(
+            text(
+                f"CREATE INDEX ix_patients_full_name_trgm ON {SCHEMA}.patients "
+                "USING gin (lower(full_name) gin_trgm_ops)"
+            )
+        )
+        await conn.execute(text(f"ANALYZE {SCHEMA}.patients"))
+    print(f"trigram index built in {time.perf_counter() - t0:.1f}s")
+
+
+async def measure(engine, label: str, terms: list[str]) -> None:
+    latencies: list[float] = []
+    async with AsyncSession(engine) as db:
+        await find_patient_ids(db, terms[0])  # warm cache / plan
+        for term in terms:
+            t0 = time.perf_counter()
+            await find_patient_ids(db, term)
+            latencies.append(time.perf_counter() - t0)
+
+        compiled = name_match_stmt("smith").compile(
+            dialect=engine.dialect, compile_kwargs={"literal_binds": True}
+        )
+        plan = (await db.execute(text(f"EXPLAIN {compiled}"))).scalars().all()
+
+    latencies.sort()
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)] * 1000
+    print(
+        f"{label:>12}: {len(terms)} lookups  mean={statistics.mean(latencies) * 1000:.2f}ms  "
+        f"p50={statistics.median(latencies) * 1000:.2f}ms  p95={p95:.2f}ms"
+    )
+    print("              plan: " + " | ".join(line.strip() for line in plan[:3]))
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=500_000)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--keep", action="store_true", help="keep the bench_trgm schema afterwards")
+    args = ap.parse_args()
+
+    # Unqualified "patients" in the app's queries resolves to the scratch table
+    engine = create_async_engine(
+        settings.postgres_async_url,
+        connect_args={"options": f"-csearch_path={SCHEMA},public"},
+    )
+    terms = _terms(args.queries)
+    try:
+        await build(engine, args.rows)
+        await measure(engine, "btree only", terms)
+        await add_trgm_index(engine)
+        await measure(engine, "pg_trgm gin", terms)
+    finally:
+        if not args.keep:
+            async with engine.begin() as conn:
+                await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
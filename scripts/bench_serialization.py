@@ -0,0 +1,127 @@
+"""
+Serialization cost per 500-row page: response_model path vs the fast path.
+
+For /info/doctors and /appointments/check, times what the handler does to
+turn rows into a response body:
+
+  models+response_model  build Pydantic models per row, then what FastAPI
+                         does with the return value (validate against
+                         response_model, encode to JSON-able, json.dumps)
+  adapter                the /info path with FAST_JSON_RESPONSES off
+                         (TypeAdapter validate + dump_json)
+  orjson (trusted rows)  FAST_JSON_RESPONSES on: rows go straight to orjson
+
+No database needed; rows are synthetic. Requires orjson for the last line.
+
+    python scripts/bench_serialization.py --rows 500 --repeat 200
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable
+
+# --- ensure "app" is importable when running this file directly ---
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.models.appointment import AppointmentStatus
+from app.routers.info import DoctorPublic
+from app.schemas.appointment import AppointmentCheckResponse, AppointmentItem
+
+
+def make_doctors(rnd: random.Random, n: int) -> list[dict]:
+    deps = [uuid.uuid4() for _ in range(12)]
+    return [
+        {
+            "id": uuid.uuid4(),
+            "name": f"Dr. Doctor {i:04d}",
+            "specialty": rnd.choice(["Cardiology", "Dermatology", "Pediatrics", None]),
+            "room": f"R-{rnd.randrange(100, 999)}",
+            "departmentId": rnd.choice(deps),
+        }
+        for i in range(n)
+    ]
+
+
+def make_appointments(rnd: random.Random, n: int) -> list[dict]:
+    now = datetime.now(timezone.utc)
+    rows = []
+    for _ in range(n):
+        start = now + timedelta(minutes=15 * rnd.randrange(-5000, 5000))
+        rows.append({
+            "id": uuid.uuid4(),
+            "doctorName": f"Dr. Doctor {rnd.randrange(100):04d}",
+            "start_time": start,
+            "end_time": start + timedelta(minutes=15) if rnd.random() < 0.8 else None,
+            "status": rnd.choice(list(AppointmentStatus)),
+        })
+    return rows
+
+
+def fastapi_serialize(adapter: TypeAdapter, value) -> bytes:
+    # fastapi.routing.serialize_response + JSONResponse.render
+    validated = adapter.validate_python(value, from_attributes=True)
+    return json.dumps(
+        jsonable_encoder(adapter.dump_python(validated, mode="json")),
+        ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+    ).encode()
+
+
+def bench(label: str, fn: Callable[[], bytes], repeat: int) -> None:
+    best = float("inf")
+    size = len(fn())
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    print(f"{label:>40}: {best * 1000:7.3f}ms/page  ({size} bytes)")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=500)
+    ap.add_argument("--repeat", type=int, default=200)
+    args = ap.parse_args()
+
+    rnd = random.Random(7)
+    doctors = make_doctors(rnd, args.rows)
+    appts = make_appointments(rnd, args.rows)
+
+    try:
+        from app.services import fast_json
+        fast_json._backend()
+    except RuntimeError as e:
+        fast_json = None
+        print(f"(skipping orjson rows: {e})")
+
+    doctors_adapter = TypeAdapter(list[DoctorPublic])
+    print(f"/info/doctors, {args.rows} rows")
+    bench("models+response_model", lambda: fastapi_serialize(
+        doctors_adapter, [DoctorPublic(**d) for d in doctors]), args.repeat)
+    bench("adapter", lambda: doctors_adapter.dump_json(doctors_adapter.validate_python(doctors)), args.repeat)
+    if fast_json:
+        bench("orjson (trusted rows)", lambda: fast_json.dumps(doctors), args.repeat)
+
+    check_adapter = TypeAdapter(AppointmentCheckResponse)
+    print(f"/appointments/check, {args.rows} rows")
+    bench("models+response_model", lambda: fastapi_serialize(
+        check_adapter,
+        AppointmentCheckResponse(items=[AppointmentItem.model_validate(a) for a in appts]),
+    ), args.repeat)
+    if fast_json:
+        bench("orjson (trusted rows)", lambda: fast_json.dumps({"items": appts, "nextCursor": None}), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Bulk-load an HIS extract (CSV or NDJSON) of patients or appointments.
+
+Streams the file, validates in chunks, COPYs each chunk into a staging
+table and upserts it (see app/services/bulk_import.py). Import patients
+before the appointments that reference them.
+
+    python scripts/import_his.py patients extracts/patients.csv
+    python scripts/import_his.py appointments extracts/appts.ndjson --rejects rejects.json
+    gunzip -c patients.csv.gz | python scripts/import_his.py patients - --format csv
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# --- ensure "app" is importable when running this file directly ---
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.config import settings
+from app.db.pg import engine
+from app.services.bulk_import import FORMATS, SPECS, ImportReport, detect_format, run_import, text_stream
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("entity", choices=sorted(SPECS))
+    ap.add_argument("path", help="file to import, or - for stdin")
+    ap.add_argument("--format", choices=FORMATS, help="default: from the file extension (.ndjson/.jsonl, else csv)")
+    ap.add_argument("--chunk-size", type=int, default=settings.IMPORT_CHUNK_SIZE)
+    ap.add_argument("--rejects", help="write the report (with sample rejects) to this JSON file")
+    args = ap.parse_args()
+
+    fmt = args.format or ("csv" if args.path == "-" else detect_format(args.path))
+    binary = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+    t0 = time.perf_counter()
+
+    def progress(r: ImportReport) -> None:
+        rate = r.read / max(time.perf_counter() - t0, 1e-9)
+        print(
+            f"\r[..] read {r.read:,}  inserted {r.inserted:,}  updated {r.updated:,}  "
+            f"unchanged {r.unchanged:,}  rejected {r.rejected:,}  ({rate:,.0f} rows/s)",
+            end="", flush=True,
+        )
+
+    try:
+        with engine.connect() as conn:
+            report = run_import(conn, text_stream(binary), args.entity, fmt, args.chunk_size, progress)
+    finally:
+        if binary is not sys.stdin.buffer:
+            binary.close()
+    print()
+    print(f"[✓] {args.entity}: {report.read:,} rows in {time.perf_counter() - t0:.1f}s")
+    if report.rejected:
+        print(f"[!] {report.rejected:,} rejected; first: {report.rejects[:3]}")
+    if args.rejects:
+        Path(args.rejects).write_text(json.dumps(report.as_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
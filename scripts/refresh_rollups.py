@@ -0,0 +1,45 @@
+"""
+Backfill / repair the usage report rollups for an arbitrary date range.
+
+The API refreshes a rolling window in the background; use this after the
+first deploy (to cover history) or after bulk changes to old appointments.
+
+    python scripts/refresh_rollups.py --start 2024-01-01 --end 2025-12-31
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import date
+from pathlib import Path
+
+# --- ensure "app" is importable when running this file directly ---
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.db.pg import SessionLocal
+from app.services.rollups import default_window, refresh_rollups
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--start", type=date.fromisoformat, help="first day (default: rolling window start)")
+    ap.add_argument("--end", type=date.fromisoformat, help="last day (default: rolling window end)")
+    args = ap.parse_args()
+
+    start, end = default_window()
+    start, end = args.start or start, args.end or end
+
+    db = SessionLocal()
+    try:
+        if refresh_rollups(db, start, end):
+            print(f"[✓] Rollups refreshed for {start} .. {end}")
+        else:
+            print("[-] Another worker is refreshing rollups; try again shortly")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,6 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from sqlalchemy.orm import Session
-from passlib.hash import bcrypt
 
 from app.db.pg import SessionLocal
 from app.models.admin import AdminUser
@@ -18,6 +17,7 @@ from app.models.department import Department
 from app.models.doctor import Doctor
 from app.models.patient import Patient
 from app.models.appointment import Appointment, AppointmentStatus
+from app.services.passwords import hash_password_sync
 
 
 def seed_postgres() -> None:
@@ -29,7 +29,7 @@ def seed_postgres() -> None:
         if not admin:
             admin = AdminUser(
                 email=admin_email,
-                password_hash=bcrypt.hash("admin123"),
+                password_hash=hash_password_sync("admin123"),
                 role="SUPERADMIN",
             )
             db.add(admin)
@@ -0,0 +1,11 @@
+import os
+import sys
+from pathlib import Path
+
+# --- ensure "app" is importable when running pytest from anywhere ---
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# Settings are read at import time; JWT_SECRET has no default
+os.environ.setdefault("JWT_SECRET", "test-secret")
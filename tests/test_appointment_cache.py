@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from app.services.appointment_cache import AppointmentLookupCache
+
+
+def _item(minutes: int) -> dict:
+    start = datetime.now(timezone.utc) + timedelta(minutes=minutes)
+    return {"appointmentId": str(uuid4()), "start_time": start, "end_time": None}
+
+
+def test_lookup_is_cached_per_limit():
+    cache = AppointmentLookupCache(maxsize=10, ttl=60)
+    pid = uuid4()
+    items = [_item(60), _item(120)]
+    cache.put("MRN-1", True, 2, [pid], items, cache.generation)
+
+    hit = cache.get(" MRN-1 ", True, 2)
+    assert hit is not None and hit.patient_ids == (pid,)
+    assert hit.current_items() == items
+    # A larger page must not be served the truncated result
+    assert cache.get("MRN-1", True, 10) is None
+    assert cache.get("MRN-1", False, 2) is None
+
+
+def test_put_after_invalidate_is_dropped():
+    cache = AppointmentLookupCache(maxsize=10, ttl=60)
+    generation = cache.generation
+    cache.invalidate()  # an appointment write raced with the lookup
+    cache.put("MRN-1", True, 5, [uuid4()], [_item(60)], generation)
+    assert cache.get("MRN-1", True, 5) is None
+
+
+def test_started_appointments_drop_out_of_upcoming_hits():
+    cache = AppointmentLookupCache(maxsize=10, ttl=60)
+    started, later = _item(-1), _item(60)
+    cache.put("Jane Doe", True, 5, [uuid4()], [started, later], cache.generation)
+    assert cache.get("jane doe", True, 5) is None  # names keep their case
+    assert cache.get("Jane  Doe", True, 5).current_items() == [later]
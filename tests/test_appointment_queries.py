@@ -0,0 +1,35 @@
+"""The appointment read paths select columns over inner joins; no eager-loaded entities."""
+import re
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models.appointment import Appointment
+from app.routers.chat import CHAT_APPOINTMENT_LIMIT, _appointments_for_patients_stmt
+from app.services.appointment_queries import for_patients, item_select
+
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def _joins(sql: str) -> list:
+    return re.findall(r"\b((?:LEFT |RIGHT |FULL )?(?:OUTER |INNER )?JOIN)\b", sql)
+
+
+@pytest.mark.parametrize("stmt, tables", [
+    # /appointments/check
+    (lambda: for_patients(item_select(), [uuid4()], True), ["doctors"]),
+    # /appointments/{id}
+    (lambda: item_select().where(Appointment.id == uuid4()), ["doctors"]),
+    # chat check_appointment (the card also shows the patient's name)
+    (lambda: _appointments_for_patients_stmt([uuid4()], True, CHAT_APPOINTMENT_LIMIT), ["patients", "doctors"]),
+], ids=["check", "get", "chat"])
+def test_inner_joins_only(stmt, tables):
+    sql = _sql(stmt())
+    assert "OUTER" not in sql
+    assert _joins(sql) == ["JOIN"] * len(tables)
+    for table in tables:
+        assert re.search(rf"JOIN {table} ON", sql)
+    assert "FROM appointments JOIN" in sql
@@ -0,0 +1,60 @@
+import pytest
+
+from app.services.nlu import FALLBACK, IntentEngine
+
+# FAQs as an admin would enter them: (intent_key, question, answer)
+FAQS = [
+    ("cancel_appointment", "How do I cancel my appointment?", "Call the front desk or use the patient portal."),
+    ("parking", "Where can I park?", "Visitor parking is in Lot C, free for the first hour."),
+    ("visiting_hours", "What are the visiting hours?", "Visiting hours are 10am to 8pm daily."),
+]
+
+
+@pytest.fixture
+def engine():
+    e = IntentEngine()
+    e.set_faqs(FAQS)
+    return e
+
+
+@pytest.mark.parametrize("text, intent", [
+    ("what time is my appointment", "check_appointment"),
+    ("Can you check my appointment please", "check_appointment"),
+    ("ID: MRN-12345", "check_appointment"),
+    ("how to get to radiology", "ask_directions"),
+    ("when are you open", "clinic_hours"),
+    ("hello there", FALLBACK),
+])
+def test_builtin_intents(engine, text, intent):
+    assert engine.detect(text) == intent
+
+
+@pytest.mark.parametrize("text", [
+    "How do I cancel my appointment?",
+    "I want to cancel my appointment",
+    "cancel my appointment please",
+])
+def test_cancel_faq_beats_my_appointment(engine, text):
+    # "cancel" + "appointment" covers more than the built-in "my appointment"
+    assert engine.detect(text) == "cancel_appointment"
+
+
+@pytest.mark.parametrize("text", [
+    "Where can I park?",
+    "where is the parking",
+    "where do I park my car",
+])
+def test_parking_faq_beats_where(engine, text):
+    # The built-in "where" is a stopword; "park"/"parking" carries the question
+    assert engine.detect(text) == "parking"
+
+
+def test_faq_answers_served_from_memory(engine):
+    assert engine.answer_for("parking") == FAQS[1][2]
+    assert engine.answer_for("check_appointment") is None
+
+
+def test_set_faqs_replaces_previous_phrases(engine):
+    engine.set_faqs([])
+    assert engine.detect("I want to cancel my appointment") == "check_appointment"
+    assert engine.answer_for("parking") is None
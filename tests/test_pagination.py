@@ -0,0 +1,70 @@
+import base64
+import json
+from datetime import datetime
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.models.appointment import Appointment
+from app.services.pagination import apply_keyset, encode_cursor, page_sorted_list
+
+
+def _keys(n: int):
+    ids = sorted(uuid4() for _ in range(n))
+    return [(f"name {i:02d}", ids[i]) for i in range(n)]
+
+
+def _raw_cursor(values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def test_cursor_pages_through_sorted_list():
+    keys = _keys(5)
+    page, cursor = page_sorted_list(keys, keys, cursor=None, limit=2)
+    assert page == keys[:2]
+    page, cursor = page_sorted_list(keys, keys, cursor=cursor, limit=2)
+    assert page == keys[2:4]
+    page, cursor = page_sorted_list(keys, keys, cursor=cursor, limit=2)
+    assert page == keys[4:] and cursor is None
+
+
+@pytest.mark.parametrize("values", [
+    ["name 01", "not-a-uuid"],  # str vs UUID on a name tie would raise TypeError
+    ["name 09", "not-a-uuid"],  # no tie: would silently land at the end
+    [1, {"$uuid": str(UUID(int=0))}],
+    [{"$dt": datetime(2025, 1, 1).isoformat()}, {"$uuid": str(UUID(int=0))}],
+])
+def test_mistyped_cursor_is_400(values):
+    keys = _keys(3)
+    with pytest.raises(HTTPException) as e:
+        page_sorted_list(keys, keys, cursor=_raw_cursor(values), limit=2)
+    assert e.value.status_code == 400
+    assert e.value.detail == "Invalid cursor"
+
+
+@pytest.mark.parametrize("values", [
+    ["x", 1],
+    [{"$dt": datetime(2025, 1, 1).isoformat()}, "not-a-uuid"],
+    [{"$uuid": str(UUID(int=0))}, {"$uuid": str(UUID(int=0))}],
+    [None, {"$uuid": str(UUID(int=0))}],
+])
+def test_mistyped_cursor_is_400_before_sql(values):
+    # (start_time, id) as /appointments/check pages it; Postgres would 500 on the comparison
+    with pytest.raises(HTTPException) as e:
+        apply_keyset(
+            select(Appointment.id), [Appointment.start_time, Appointment.id],
+            cursor=_raw_cursor(values), limit=10, descending=True,
+        )
+    assert e.value.status_code == 400
+    assert e.value.detail == "Invalid cursor"
+
+
+def test_typed_cursor_is_applied():
+    cursor = encode_cursor([datetime(2025, 1, 1), UUID(int=1)])
+    stmt = apply_keyset(
+        select(Appointment.id), [Appointment.start_time, Appointment.id],
+        cursor=cursor, limit=10, descending=True,
+    )
+    assert "(appointments.start_time, appointments.id) <" in str(stmt)
@@ -0,0 +1,63 @@
+from uuid import uuid4
+
+import pytest
+from starlette.datastructures import Headers
+
+from app.services import rate_limit
+from app.services.devices import DeviceInfo, DeviceRegistry, hash_device_code
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    reg = DeviceRegistry(max_age=30, flush_interval=5, offline_after=45)
+    active = DeviceInfo(uuid4(), "Lobby kiosk", "Lobby", True)
+    retired = DeviceInfo(uuid4(), "Old kiosk", None, False)
+    reg._devices = {active.id: active, retired.id: retired}
+    reg._by_hash = {hash_device_code("good-code"): active.id, hash_device_code("old-code"): retired.id}
+    monkeypatch.setattr(rate_limit, "device_registry", reg)
+    return reg, active
+
+
+def _key(code=None, session_id=None, **headers):
+    if code:
+        headers["x-device-code"] = code
+    return rate_limit.client_key(Headers(headers), ("10.0.0.7", 51234), session_id)
+
+
+def test_registered_device_gets_its_own_bucket(registry):
+    _, active = registry
+    assert _key("good-code") == f"dev:{active.id}"
+
+
+@pytest.mark.parametrize("code", ["made-up-1", "made-up-2", "old-code"])
+def test_unknown_or_inactive_code_falls_back_to_address(registry, code):
+    assert _key(code) == "ip:10.0.0.7"
+
+
+def test_no_code_is_limited_by_address(registry):
+    assert _key() == "ip:10.0.0.7"
+
+
+SESSION = "65f1c2a9e4b0a1b2c3d4e5f6"
+
+
+def test_unregistered_kiosk_turns_are_keyed_by_session(registry):
+    assert _key(session_id=SESSION) == "sess:" + SESSION
+    assert _key("made-up", session_id=SESSION) == "sess:" + SESSION
+    # A registered device keeps one bucket across its sessions
+    _, active = registry
+    assert _key("good-code", session_id=SESSION) == f"dev:{active.id}"
+
+
+def test_chat_message_rule_captures_the_session():
+    rule = next(r for r in rate_limit.default_rules("/api") if r.name == "chat_message")
+    assert rule.session_of(f"/api/chat/sessions/{SESSION.upper()}/messages") == SESSION
+    assert rule.session_of(f"/api/chat/sessions/{SESSION}/messages/stream") == SESSION
+    assert not rule.matches("POST", "/api/chat/sessions/not-an-id/messages")
+
+
+def test_forwarded_for_uses_the_proxy_hop(registry, monkeypatch):
+    monkeypatch.setattr(rate_limit.settings, "RATE_LIMIT_TRUST_PROXY", True)
+    # The client controls everything left of what the proxy appended
+    assert _key(**{"x-forwarded-for": "1.2.3.4, 203.0.113.9"}) == "ip:203.0.113.9"
+    assert _key(**{"x-forwarded-for": "5.6.7.8, 203.0.113.9"}) == "ip:203.0.113.9"
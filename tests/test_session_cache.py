@@ -0,0 +1,79 @@
+import asyncio
+from typing import Dict, Optional
+
+from bson import ObjectId
+
+from app.services.session_cache import RedisSessionBackend, SessionCache
+
+
+class FakeRedis:
+    """The slice of redis.asyncio the session backend uses (decode_responses=True)."""
+
+    def __init__(self):
+        self.data: Dict[str, str] = {}
+        self.expiry: Dict[str, Optional[int]] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        return self.data.get(key)
+
+    async def set(self, key: str, value: str, ex: Optional[int] = None) -> bool:
+        assert isinstance(value, str)
+        self.data[key] = value
+        self.expiry[key] = ex
+        return True
+
+    async def delete(self, *keys: str) -> int:
+        return sum(self.data.pop(k, None) is not None for k in keys)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_redis_round_trip_keeps_turn_state():
+    client = FakeRedis()
+    cache = SessionCache(RedisSessionBackend(client, ttl=300))
+    sid = ObjectId()
+    patient_id = "0b8f4f7e-6f1c-4d5e-9a3b-2c1d0e9f8a7b"
+    sess = {
+        "_id": sid,
+        "status": "active",
+        "deviceId": "kiosk-1",
+        "patientRef": {"token": "MRN-12345", "patientIds": [patient_id], "attachedAt": "ignored"},
+    }
+
+    state = run(cache.put(sid, sess))
+
+    assert state == {"status": "active", "patientRef": {"token": "MRN-12345", "patientIds": [patient_id]}}
+    assert client.expiry["chat:sess:" + str(sid)] == 300
+    assert run(cache.get(sid)) == state
+
+
+def test_redis_hits_misses_and_invalidate():
+    cache = SessionCache(RedisSessionBackend(FakeRedis(), ttl=60))
+    sid = ObjectId()
+
+    assert run(cache.get(sid)) is None
+    run(cache.put(sid, {"status": "active"}))
+    assert run(cache.get(sid)) == {"status": "active", "patientRef": None}
+    run(cache.invalidate(sid))
+    assert run(cache.get(sid)) is None
+
+    stats = cache.stats()
+    assert stats["backend"] == "redis"
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+    assert stats["hit_rate"] == round(1 / 3, 4)
+
+
+def test_redis_backend_is_shared_between_workers():
+    client = FakeRedis()
+    worker_a = SessionCache(RedisSessionBackend(client, ttl=60))
+    worker_b = SessionCache(RedisSessionBackend(client, ttl=60))
+    sid = ObjectId()
+
+    run(worker_a.put(sid, {"status": "active", "patientRef": {"token": "Jane Doe"}}))
+    assert run(worker_b.get(sid))["patientRef"] == {"token": "Jane Doe"}
+
+    # Ended on worker B: worker A no longer serves it as active
+    run(worker_b.invalidate(sid))
+    assert run(worker_a.get(sid)) is None